@@ -0,0 +1,116 @@
+"""Benchmarked operations, each one set up for a number of samples N."""
+from pathlib import Path
+from typing import Callable
+import sys
+import numpy as np
+
+# the pipeline modules import the core package as "core"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from core import (  # noqa: E402
+    Angle,
+    Referential,
+    TransformationContext,
+    Vector3D,
+    get_rotation_matrix_x,
+    get_rotation_matrix_y,
+    get_rotation_matrix_z,
+    vector_time_derivative,
+)
+from bumblebee_kinematic_model import bumblebee_kinematics_model  # noqa: E402
+from forces_model import force_TC, force_TD, force_RC, force_RD, force_AMx, force_AMz  # noqa: E402
+from kinematics_evaluations import solve_kinematics  # noqa: E402
+
+ANGLE_NAMES = ("phi", "alpha", "theta", "eta", "psi", "beta", "gamma")
+
+
+def _angles(N: int, rng: np.random.Generator) -> dict[str, Angle]:
+    return {name: Angle(rng.uniform(-np.pi, np.pi, N), "rad") for name in ANGLE_NAMES}
+
+
+def _context(N: int, rng: np.random.Generator) -> TransformationContext:
+    context = TransformationContext()
+    context.initialize(**_angles(N, rng))
+    return context
+
+
+def _vector(N: int, rng: np.random.Generator, referential: Referential, context: TransformationContext) -> Vector3D:
+    return Vector3D(rng.normal(size=(3, N)), referential, context)
+
+
+def rotation_matrix(builder: Callable) -> Callable:
+    def setup(N, rng):
+        angle = Angle(rng.uniform(-np.pi, np.pi, N), "rad")
+        return lambda: builder(angle)
+
+    return setup
+
+
+def initialize(N, rng):
+    """initialize is lazy, the benchmark includes building the GLOBAL -> WING transformation."""
+    angles = _angles(N, rng)
+    context = TransformationContext()
+
+    def run():
+        context.initialize(**angles)
+        context.get_matrix(Referential.GLOBAL, Referential.WING)
+
+    return run
+
+
+def set_referential(N, rng):
+    context = _context(N, rng)
+    coords = rng.normal(size=(3, N))
+    return lambda: Vector3D(coords, Referential.GLOBAL, context).set_referential(Referential.WING)
+
+
+def time_derivative(N, rng):
+    time = np.linspace(0.0, 1.0, N)
+    vector = _vector(N, rng, Referential.GLOBAL, None)
+    return lambda: vector_time_derivative(time, vector)
+
+
+def kinematics_model(N, rng):
+    return lambda: bumblebee_kinematics_model(N, derivatives=True)
+
+
+def forces(function: Callable, arguments: str) -> Callable:
+    """Force of forces_model, arguments: c for a coefficient array, g or w for a GLOBAL or WING vector."""
+
+    def setup(N, rng):
+        context = _context(N, rng)
+        values = []
+        for argument in arguments:
+            if argument == "c":
+                values.append(rng.normal(size=N))
+            else:
+                referential = Referential.GLOBAL if argument == "g" else Referential.WING
+                values.append(_vector(N, rng, referential, context))
+
+        return lambda: function(*values, *([1.0] * (function.__code__.co_argcount - len(values))))
+
+    return setup
+
+
+def pipeline(N, rng):
+    """Every stage of main(), from the angles to the forces, without the plots."""
+    return lambda: solve_kinematics(N, TransformationContext())
+
+
+# Name -> setup(N, rng) returning the function to time
+CASES = {
+    "get_rotation_matrix_x": rotation_matrix(get_rotation_matrix_x),
+    "get_rotation_matrix_y": rotation_matrix(get_rotation_matrix_y),
+    "get_rotation_matrix_z": rotation_matrix(get_rotation_matrix_z),
+    "initialize": initialize,
+    "set_referential": set_referential,
+    "vector_time_derivative": time_derivative,
+    "bumblebee_kinematics_model": kinematics_model,
+    "force_TC": forces(force_TC, "cwg"),
+    "force_TD": forces(force_TD, "cwg"),
+    "force_RC": forces(force_RC, "gwg"),
+    "force_RD": forces(force_RD, "wg"),
+    "force_AMx": forces(force_AMx, "wg"),
+    "force_AMz": forces(force_AMz, "wwg"),
+    "pipeline": pipeline,
+}
@@ -0,0 +1,62 @@
+"""Compare the "stacked" (3,3,N) and "batched" (N,3,3) matrix layouts at large N.
+
+Usage: python benchmarks/matrix_layout.py [N ...]
+"""
+from pathlib import Path
+from timeit import repeat
+import sys
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.core import Angle, Referential, TransformationContext, Vector3D, global_to_wing_matrix, compose, rotate  # noqa: E402
+
+
+def best_time(function, number: int = 3) -> float:
+    """Best time of one call, in seconds."""
+    return min(repeat(function, number=number, repeat=3)) / number
+
+
+def benchmark(N: int) -> dict[str, dict[str, float]]:
+    rng = np.random.default_rng(0)
+    angles = dict(
+        zip(
+            ("phi", "alpha", "theta", "eta", "psi", "beta", "gamma"),
+            (Angle(rng.uniform(-np.pi, np.pi, N), "rad") for _ in range(7)),
+        )
+    )
+    coords = rng.normal(size=(3, N))
+
+    timings = {}
+    for layout in ("stacked", "batched"):
+        matrix = global_to_wing_matrix(**angles, layout=layout)
+
+        context = TransformationContext(layout=layout)
+        context.initialize(**angles)
+
+        def round_trip():
+            vector = Vector3D(coords, Referential.GLOBAL, context)
+            vector.set_referential(Referential.WING).set_referential(Referential.BODY)
+
+        timings[layout] = {
+            "build": best_time(lambda: global_to_wing_matrix(**angles, layout=layout)),
+            "compose": best_time(lambda: compose(matrix, matrix, layout=layout)),
+            "rotate": best_time(lambda: rotate(matrix, coords, layout)),
+            "set_referential": best_time(round_trip),
+        }
+
+    return timings
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'N':>9} {'operation':>16} {'stacked [ms]':>13} {'batched [ms]':>13} {'speedup':>8}")
+    for N in sizes:
+        timings = benchmark(N)
+        for operation in timings["stacked"]:
+            stacked = timings["stacked"][operation]
+            batched = timings["batched"][operation]
+            print(f"{N:>9} {operation:>16} {1e3 * stacked:>13.2f} {1e3 * batched:>13.2f} {stacked / batched:>8.2f}")
+
+
+if __name__ == "__main__":
+    main([int(float(size)) for size in sys.argv[1:]] or [10**4, 10**5, 10**6])
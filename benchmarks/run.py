@@ -0,0 +1,158 @@
+"""Time the benchmark cases at several sizes, write a JSON report and compare it to a baseline.
+
+Usage: python -m benchmarks.run [--sizes N ...] [--cases NAME ...] [--output FILE]
+                                [--baseline FILE] [--threshold RATIO] [--save-baseline]
+
+The exit code is 1 if a case is slower, or uses more memory, than the baseline by more than
+the threshold (0.25 means 25 %).
+"""
+from pathlib import Path
+from timeit import Timer
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+import numpy as np
+
+from benchmarks.cases import CASES
+
+DEFAULT_SIZES = (400, 10**4, 10**5, 10**6)
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+DEFAULT_THRESHOLD = 0.25
+
+# Measures compared with the baseline, lower is better
+COMPARED_MEASURES = ("time", "peak_memory")
+
+
+def best_time(function, repeat: int = 3) -> float:
+    """Best time of one call in seconds, each measure lasting at least 0.2 s."""
+    timer = Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def peak_memory(function) -> int:
+    """Memory allocated at the peak of one call, in bytes (NumPy reports its buffers to tracemalloc)."""
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak - start
+
+
+def run(sizes=DEFAULT_SIZES, cases=tuple(CASES), repeat: int = 3) -> dict:
+    """Benchmark every case at every size.
+
+    Raises:
+        ValueError: If a case is unknown.
+
+    Returns:
+        dict: Report with the environment and one result per case and size.
+    """
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        raise ValueError(f"Unknown cases {sorted(unknown)}. Expected {tuple(CASES)}.")
+
+    results = []
+    for name in cases:
+        for N in sizes:
+            function = CASES[name](N, np.random.default_rng(0))
+            function()  # warm up
+
+            time = best_time(function, repeat)
+            results.append(
+                {
+                    "case": name,
+                    "N": N,
+                    "time": time,
+                    "peak_memory": peak_memory(function),
+                    "throughput": N / time,
+                }
+            )
+            print(f"{name:>28} {N:>9} {1e3 * time:>11.3f} ms {results[-1]['peak_memory'] / 2**20:>9.1f} MiB")
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """Cases of the report worse than in the baseline by more than threshold.
+
+    Returns:
+        list[dict]: case, N, measure, value, baseline and ratio of each regression.
+    """
+    reference = {(result["case"], result["N"]): result for result in baseline["results"]}
+
+    regressions = []
+    for result in report["results"]:
+        previous = reference.get((result["case"], result["N"]))
+        if previous is None:
+            continue
+
+        for measure in COMPARED_MEASURES:
+            if previous[measure] <= 0:
+                continue
+
+            ratio = result[measure] / previous[measure]
+            if ratio > 1 + threshold:
+                regressions.append(
+                    {
+                        "case": result["case"],
+                        "N": result["N"],
+                        "measure": measure,
+                        "value": result[measure],
+                        "baseline": previous[measure],
+                        "ratio": ratio,
+                    }
+                )
+
+    return regressions
+
+
+def main(arguments: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=lambda size: int(float(size)), default=DEFAULT_SIZES)
+    parser.add_argument("--cases", nargs="+", default=tuple(CASES), choices=tuple(CASES), metavar="NAME")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="JSON report to write")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--save-baseline", action="store_true", help="store the report as the baseline")
+    options = parser.parse_args(arguments)
+
+    report = run(options.sizes, options.cases, options.repeat)
+
+    if options.output is not None:
+        options.output.write_text(json.dumps(report, indent=2))
+
+    if options.save_baseline:
+        options.baseline.write_text(json.dumps(report, indent=2))
+        return 0
+
+    if not options.baseline.exists():
+        print(f"No baseline at {options.baseline}, run with --save-baseline to store one.")
+        return 0
+
+    regressions = compare(report, json.loads(options.baseline.read_text()), options.threshold)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['case']} N={regression['N']} {regression['measure']}: "
+            f"{regression['value']:.4g} vs {regression['baseline']:.4g} ({regression['ratio']:.2f}x)"
+        )
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,118 @@
+from inspect import signature
 from core import Scalar
 from core import Angle
 import numpy as np
 
 
+def _sine_ramp(s: np.ndarray, width: Scalar, derivative: int) -> np.ndarray:
+    """Ramp s - width / (2 pi) * sin(2 pi s / width) or one of its first two derivatives."""
+    pi = np.pi
+
+    if derivative == 0:
+        return s - (width / 2.0 / pi) * np.sin(2.0 * pi * s / width)
+    elif derivative == 1:
+        return 1.0 - np.cos(2.0 * pi * s / width)
+    else:
+        return (2.0 * pi / width) * np.sin(2.0 * pi * s / width)
+
+
+def feathering_angle(
+    time: np.ndarray,
+    alpha_down: Scalar = 70.0,
+    alpha_up: Scalar = -40.0,
+    tau: Scalar = 0.22,
+    derivative: int = 0,
+) -> np.ndarray:
+    """
+    Piecewise feathering angle of the bumblebee model, before the dTau shift.
+
+    Alpha is constant during each half stroke and goes from one value to the other with a
+    sine ramp of duration tau centered on stroke reversal. The time is taken modulo 1, so the
+    function can be evaluated on any grid. Parameters may be arrays, they are broadcast against time.
+
+    Parameters:
+        time : np.ndarray
+            Time values (in periods)
+        alpha_down : float, scalar or np.ndarray
+            Feathering angle during downstroke (deg)
+        alpha_up : float, scalar or np.ndarray
+            Feathering angle during upstroke (deg)
+        tau : float, scalar or np.ndarray
+            Duration of wing rotation
+        derivative : int, optional
+            Order of the time derivative to evaluate (0, 1 or 2)
+
+    Returns:
+        alpha : np.ndarray
+            Feathering angle (deg) or its time derivative (deg per period^derivative),
+            broadcast shape of time and parameters
+    """
+    if derivative not in (0, 1, 2):
+        raise ValueError("derivative must be 0, 1 or 2")
+
+    t = np.mod(time, 1.0)
+
+    alpha_tau = tau  # fixed parameters (rotation duration) upstroke->downstroke
+    alpha_tau1 = tau  # downstroke->upstroke
+
+    T1 = alpha_tau1 / 2.0
+    T2 = 0.5 - alpha_tau / 2.0
+    T3 = T2 + alpha_tau
+    T4 = 1.0 - alpha_tau1 / 2.0
+
+    a = (alpha_up - alpha_down) / alpha_tau
+    a1 = (alpha_up - alpha_down) / alpha_tau1
+
+    # the constant parts vanish for the derivatives
+    down = alpha_down if derivative == 0 else 0.0
+    up = alpha_up if derivative == 0 else 0.0
+
+    # the conditions are evaluated in order, the first one that holds selects the branch
+    conditions = [t < T1, t < T2, t < T3, t < T4]
+    branches = [
+        down - a1 * _sine_ramp(t - alpha_tau1 / 2.0, alpha_tau1, derivative),
+        down,
+        down + a * _sine_ramp(t - T2, alpha_tau, derivative),
+        up,
+    ]
+    last_branch = up - a1 * _sine_ramp(t - T4, alpha_tau1, derivative)
+
+    return np.select(conditions, branches, default=last_branch)
+
+
+def stroke_angle(
+    time: np.ndarray, PHI: Scalar = 115.0, phi_m: Scalar = 24.0, derivative: int = 0
+) -> np.ndarray:
+    """
+    Sinusoidal stroke angle of the bumblebee model, or one of its time derivatives.
+
+    Parameters:
+        time : np.ndarray
+            Time values (in periods)
+        PHI : float, scalar or np.ndarray
+            Stroke amplitude (deg)
+        phi_m : float, scalar or np.ndarray
+            Mean stroke angle (deg)
+        derivative : int, optional
+            Order of the time derivative to evaluate (0, 1 or 2)
+
+    Returns:
+        phi : np.ndarray
+            Stroke angle (deg) or its time derivative (deg per period^derivative)
+    """
+    if derivative not in (0, 1, 2):
+        raise ValueError("derivative must be 0, 1 or 2")
+
+    phase = 2.0 * np.pi * (time + 0.25)
+
+    if derivative == 0:
+        return phi_m + (PHI / 2.0) * np.sin(phase)
+    elif derivative == 1:
+        return (PHI / 2.0) * 2.0 * np.pi * np.cos(phase)
+    else:
+        return -(PHI / 2.0) * (2.0 * np.pi) ** 2 * np.sin(phase)
+
+
 def bumblebee_kinematics_model(
     number_time_steps: int,
     PHI: Scalar = 115.0,
@@ -12,6 +122,7 @@ def bumblebee_kinematics_model(
     alpha_up: Scalar = -40.0,
     tau: Scalar = 0.22,
     theta: Scalar = 12.55 / 2,
+    derivatives: bool = False,
 ) -> (np.array, Angle, Angle, Angle):
     """
     Kinematics model for a bumblebee bombus terrestris [Engels et al PRL 2016, PRF 2019]
@@ -37,6 +148,8 @@ def bumblebee_kinematics_model(
             duration of wing rotation
         theta :
             constant deviation angle_rad (deg)
+        derivatives : bool, optional
+            Also return the exact first and second time derivatives of the angles
 
 
     Returns:
@@ -45,6 +158,9 @@ def bumblebee_kinematics_model(
         alpha : Angle
         phi : Angle
         theta : Angle
+        derivatives : dict[str, Angle], only if derivatives is True
+            "alpha_dt", "phi_dt", "theta_dt", "alpha_ddt", "phi_ddt" and "theta_ddt",
+            per unit of time (one period)
     """
 
     if not isinstance(number_time_steps, int):
@@ -53,54 +169,14 @@ def bumblebee_kinematics_model(
     time = np.linspace(0.0, 1.0, endpoint=False, num=number_time_steps)
 
     # phi is sinusoidal function with fixed phase (variable amplitude+offset)
-    phi = phi_m + (PHI / 2.0) * np.sin(2.0 * np.pi * (time + 0.25))
+    phi = stroke_angle(time, PHI, phi_m)
     # theta is a constant value
     theta = np.zeros_like(time) + theta
 
     # alpha is a new function
     # d_tau is the timing of pronation and supination, which Muijres2016 identified as important parameter in the compensation
     # degrees
-    alpha_tau = tau  # fixed parameters (rotation duration) upstroke->downstroke
-    alpha_tau1 = tau  # downstroke->upstroke
-
-    T1 = alpha_tau1 / 2.0
-    T2 = 0.5 - alpha_tau / 2.0
-    T3 = T2 + alpha_tau
-    T4 = 1.0 - alpha_tau1 / 2.0
-
-    pi = np.pi
-    a = (alpha_up - alpha_down) / alpha_tau
-    a1 = (alpha_up - alpha_down) / alpha_tau1
-
-    alpha = np.zeros_like(time)
-
-    for it, t in enumerate(time):
-        if t < T1:
-            alpha[it] = alpha_down - a1 * (
-                t
-                - alpha_tau1 / 2.0
-                - (alpha_tau1 / 2.0 / pi)
-                * np.sin(2.0 * pi * (t - alpha_tau1 / 2.0) / alpha_tau1)
-            )
-
-        elif t >= T1 and t < T2:
-            alpha[it] = alpha_down
-
-        elif t >= T2 and t < T3:
-            alpha[it] = alpha_down + a * (
-                t - T2 - (alpha_tau / 2 / pi) * np.sin(2 * pi * (t - T2) / alpha_tau)
-            )
-
-        elif t >= T3 and t < T4:
-            alpha[it] = alpha_up
-
-        elif t >= T4:
-            TT = 1.0 - alpha_tau1 / 2.0
-            alpha[it] = alpha_up - a1 * (
-                t
-                - TT
-                - (alpha_tau1 / 2 / pi) * np.sin(2 * pi * ((t - TT) / alpha_tau1))
-            )
+    alpha = feathering_angle(time, alpha_down, alpha_up, tau)
 
     # this now is the important part that circularily shifts the entire vector.
     # it thus changes the "timing of pronation and supination"
@@ -113,4 +189,114 @@ def bumblebee_kinematics_model(
     phi = Angle(phi, "deg")
     theta = Angle(theta, "deg")
 
-    return time, alpha, phi, theta
+    if not derivatives:
+        return time, alpha, phi, theta
+
+    # exact derivatives from the same formulas, alpha ones are shifted like alpha
+    derivatives = {}
+    for order, suffix in ((1, "_dt"), (2, "_ddt")):
+        alpha_derivative = feathering_angle(time, alpha_down, alpha_up, tau, order)
+        derivatives["alpha" + suffix] = Angle(np.roll(alpha_derivative, shift), "deg")
+        derivatives["phi" + suffix] = Angle(stroke_angle(time, PHI, phi_m, order), "deg")
+        derivatives["theta" + suffix] = Angle(np.zeros_like(time), "deg")
+
+    return time, alpha, phi, theta, derivatives
+
+
+def _smootherstep(s: np.ndarray) -> np.ndarray:
+    """6 s^5 - 15 s^4 + 10 s^3 on [0, 1], with zero first and second derivatives at both ends."""
+    s = np.clip(s, 0.0, 1.0)
+    return s * s * s * (s * (6.0 * s - 15.0) + 10.0)
+
+
+def cycle_parameter(time: np.ndarray, values: np.ndarray, transition: Scalar = 0.2) -> np.ndarray:
+    """
+    Parameter taking one value per wingbeat, blended smoothly from one cycle to the next.
+
+    The change between the values of cycles k - 1 and k happens over a window of duration
+    transition centered on t = k, with a smootherstep so the angles stay twice differentiable.
+
+    Parameters:
+        time : np.ndarray
+            Time values (in periods), cycle k is [k, k + 1)
+        values : np.ndarray
+            Value of each cycle, of shape (C,)
+        transition : float, scalar
+            Duration of the blending window (in periods), between 0 and 1
+
+    Returns:
+        parameter : np.ndarray
+            Parameter at each time, of the shape of time
+    """
+    values = np.atleast_1d(np.asarray(values, dtype=float))
+
+    if values.size == 1:
+        return np.full(np.shape(time), values[0])
+
+    if not 0.0 < transition <= 1.0:
+        raise ValueError("transition must be in (0, 1]")
+
+    # nearest cycle boundary, between cycles boundary - 1 and boundary
+    boundary = np.clip(np.round(time).astype(int), 1, values.size - 1)
+    weight = _smootherstep((time - boundary) / transition + 0.5)
+
+    return values[boundary - 1] + (values[boundary] - values[boundary - 1]) * weight
+
+
+def maneuver_kinematics_model(
+    number_time_steps: int,
+    transition: Scalar = 0.2,
+    **cycle_parameters,
+) -> (np.array, Angle, Angle, Angle):
+    """
+    Kinematics model of several wingbeats whose parameters change from one cycle to the next.
+
+    Each parameter of bumblebee_kinematics_model can be given per cycle (array of shape (C,))
+    or once for all cycles (scalar). The parameters are blended smoothly between cycles with
+    cycle_parameter and all cycles are evaluated at once. The delay dTau is applied to the time
+    of the feathering angle, alpha(t - dTau), instead of a circular shift of whole samples.
+
+    Parameters:
+        number_time_steps : int
+            Number of time steps per cycle
+        transition : float, scalar
+            Duration of the blending between cycles (in periods)
+        **cycle_parameters :
+            PHI, phi_m, dTau, alpha_down, alpha_up, tau, theta, scalars or arrays of shape (C,)
+
+    Returns:
+        time : np.array
+            Time vector of shape (C * number_time_steps,), in periods
+        alpha : Angle
+        phi : Angle
+        theta : Angle
+    """
+    if not isinstance(number_time_steps, int):
+        raise TypeError("number_time_steps must be an integer")
+
+    defaults = {
+        name: parameter.default
+        for name, parameter in signature(bumblebee_kinematics_model).parameters.items()
+        if name not in ("number_time_steps", "derivatives")
+    }
+
+    unknown = set(cycle_parameters) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters {sorted(unknown)}. Expected {tuple(defaults)}.")
+
+    values = {name: np.atleast_1d(cycle_parameters.get(name, default)) for name, default in defaults.items()}
+
+    lengths = {array.size for array in values.values()}
+    number_cycles = max(lengths)
+
+    if not lengths <= {1, number_cycles}:
+        raise ValueError("Parameter arrays must either be of length 1 or same length")
+
+    time = np.linspace(0.0, number_cycles, endpoint=False, num=number_cycles * number_time_steps)
+    p = {name: cycle_parameter(time, array, transition) for name, array in values.items()}
+
+    phi = stroke_angle(time, p["PHI"], p["phi_m"])
+    alpha = feathering_angle(time - p["dTau"], p["alpha_down"], p["alpha_up"], p["tau"])
+    theta = p["theta"]
+
+    return time, Angle(alpha, "deg"), Angle(phi, "deg"), Angle(theta, "deg")
@@ -1,8 +1,18 @@
 from .angle import Angle
-from .referentials import Referential, Transformations
+from .profiling import profile, profiling, Profiler
+from .conversion_trace import tracing, ConversionTrace
+from .referentials import Referential, Transformations, TransformationContext
 from .types import UFunc, ArrayLike, Scalar
-from .vector import Vector3D
+from .vector import Vector3D, CachedVector3D
 from .math_utils import dot, cross, normalize, vector_time_derivative, angle_time_derivative
+from .differentiation import (
+    time_derivative,
+    central_difference,
+    periodic_central_difference,
+    spectral_derivative,
+    DERIVATIVE_METHODS,
+    DEFAULT_PERIODIC_ORDER,
+)
 from .transform_func import (
     stroke_to_wing_matrix,
     global_to_body_matrix,
@@ -11,6 +21,25 @@ from .transform_func import (
     get_rotation_matrix_y,
     get_rotation_matrix_z,
     transpose,
+    compose,
+    rotate,
+    MATRIX_LAYOUTS,
+)
+from .quaternion import (
+    stroke_to_wing_quaternion,
+    global_to_body_quaternion,
+    global_to_wing_quaternion,
+    get_rotation_quaternion_x,
+    get_rotation_quaternion_y,
+    get_rotation_quaternion_z,
+    quaternion_multiply,
+    quaternion_conjugate,
+    quaternion_compose,
+    quaternion_to_matrix,
+    matrix_to_quaternion,
+    rotate_vectors,
+    slerp,
+    interpolate_quaternions,
 )
 
 __all__ = [
@@ -20,11 +49,16 @@ __all__ = [
     "ArrayLike",
     "Scalar",
     "Vector3D",
+    "CachedVector3D",
     "cross",
     "dot",
     "Transformations",
+    "TransformationContext",
     "normalize",
     "transpose",
+    "compose",
+    "rotate",
+    "MATRIX_LAYOUTS",
     "stroke_to_wing_matrix",
     "global_to_body_matrix",
     "global_to_wing_matrix",
@@ -33,4 +67,29 @@ __all__ = [
     "get_rotation_matrix_z",
     "vector_time_derivative",
     "angle_time_derivative",
+    "time_derivative",
+    "central_difference",
+    "periodic_central_difference",
+    "spectral_derivative",
+    "DERIVATIVE_METHODS",
+    "DEFAULT_PERIODIC_ORDER",
+    "stroke_to_wing_quaternion",
+    "global_to_body_quaternion",
+    "global_to_wing_quaternion",
+    "get_rotation_quaternion_x",
+    "get_rotation_quaternion_y",
+    "get_rotation_quaternion_z",
+    "quaternion_multiply",
+    "quaternion_conjugate",
+    "quaternion_compose",
+    "quaternion_to_matrix",
+    "matrix_to_quaternion",
+    "rotate_vectors",
+    "slerp",
+    "interpolate_quaternions",
+    "profile",
+    "profiling",
+    "Profiler",
+    "tracing",
+    "ConversionTrace",
 ]
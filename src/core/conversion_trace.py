@@ -0,0 +1,164 @@
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+import json
+import sys
+import weakref
+
+# Directory of the core package, its frames are skipped when looking for the call site
+_CORE_DIRECTORY = str(Path(__file__).resolve().parent)
+
+# Trace collecting the conversions, None when tracing is disabled
+_active = None
+
+
+def current():
+    """Active ConversionTrace, None when tracing is disabled."""
+    return _active
+
+
+@lru_cache(maxsize=None)
+def _in_core(filename: str) -> bool:
+    return str(Path(filename).resolve().parent) == _CORE_DIRECTORY
+
+
+def _call_site() -> str:
+    """First frame outside the core package, as "file.py:line (function)"."""
+    frame = sys._getframe(2)
+    while frame is not None and _in_core(frame.f_code.co_filename):
+        frame = frame.f_back
+
+    if frame is None:
+        return "<core>"
+
+    return f"{Path(frame.f_code.co_filename).name}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+
+def _pair(source, target) -> str:
+    return f"{source.name}->{target.name}"
+
+
+class ConversionTrace:
+    """Referential conversions of the vectors and matrix requests made while it is active, see tracing.
+
+    Each conversion is counted per (source, target) pair and per call site, with the number of
+    samples rotated and the time of the rotation (including building the transformation the first
+    time). Conversions served by the cache of a CachedVector3D are counted apart. A conversion is
+    a round trip when it undoes the previous conversion of the same vector (A -> B then B -> A),
+    and a repeat when the vector has already been in the target referential: both could reuse
+    coordinates computed earlier. Cached conversions already do, they are never flagged.
+    """
+
+    def __init__(self):
+        self.conversions = {}  # (pair, site) -> totals
+        self.matrix_requests = {}  # (pair, site) -> totals
+        self.round_trips = {}  # (pair, first site, second site) -> count
+        self.repeats = {}  # (pair, site) -> count
+        self._history = {}  # id of the vector -> (weak reference, referentials visited, last pair and site)
+
+    def record_conversion(self, vector, source, target, samples: int, seconds: float, cached: bool = False) -> None:
+        """Record the conversion of vector from source to target."""
+        site = _call_site()
+        pair = _pair(source, target)
+
+        totals = self.conversions.setdefault((pair, site), {"count": 0, "cached": 0, "samples": 0, "seconds": 0.0})
+        totals["count"] += 1
+        totals["cached"] += cached
+        totals["samples"] += samples
+        totals["seconds"] += seconds
+
+        reference, visited, last = self._history.get(id(vector), (None, None, None))
+        if reference is None or reference() is not vector:
+            # first conversion of this vector (or its id belonged to a vector that no longer exists)
+            reference, visited, last = weakref.ref(vector), {source}, None
+
+        if cached:
+            pass  # served from the cache, nothing to remove
+        elif last is not None and last[0] == (target, source):
+            key = (pair, last[1], site)
+            self.round_trips[key] = self.round_trips.get(key, 0) + 1
+        elif target in visited:
+            self.repeats[(pair, site)] = self.repeats.get((pair, site), 0) + 1
+
+        visited.add(target)
+        self._history[id(vector)] = (reference, visited, ((source, target), site))
+
+    def record_matrix_request(self, source, target, seconds: float) -> None:
+        """Record a request of the source -> target matrix."""
+        key = (_pair(source, target), _call_site())
+        totals = self.matrix_requests.setdefault(key, {"count": 0, "seconds": 0.0})
+        totals["count"] += 1
+        totals["seconds"] += seconds
+
+    def pairs(self) -> dict[str, dict]:
+        """Totals per (source, target) pair, over every call site."""
+        pairs = {}
+        for (pair, _), totals in self.conversions.items():
+            total = pairs.setdefault(pair, {"count": 0, "cached": 0, "samples": 0, "seconds": 0.0})
+            for name, value in totals.items():
+                total[name] += value
+
+        return pairs
+
+    def report(self) -> dict:
+        """Conversions per pair and per call site (slowest first), matrix requests, round trips and repeats."""
+        return {
+            "pairs": self.pairs(),
+            "sites": sorted(
+                ({"pair": pair, "site": site, **totals} for (pair, site), totals in self.conversions.items()),
+                key=lambda entry: entry["seconds"],
+                reverse=True,
+            ),
+            "matrix_requests": [
+                {"pair": pair, "site": site, **totals} for (pair, site), totals in self.matrix_requests.items()
+            ],
+            "round_trips": [
+                {"pair": pair, "first_site": first, "second_site": second, "count": count}
+                for (pair, first, second), count in self.round_trips.items()
+            ],
+            "repeats": [{"pair": pair, "site": site, "count": count} for (pair, site), count in self.repeats.items()],
+        }
+
+    def summary(self) -> str:
+        """Readable report, the round trips and repeats come first as they are the removable conversions."""
+        lines = []
+
+        for (pair, first, second), count in self.round_trips.items():
+            lines.append(f"round trip {pair:>16} x{count:<4} {first} undone at {second}")
+        for (pair, site), count in self.repeats.items():
+            lines.append(f"repeat     {pair:>16} x{count:<4} {site}")
+
+        for entry in self.report()["sites"]:
+            lines.append(
+                f"conversion {entry['pair']:>16} x{entry['count']:<4} ({entry['cached']} cached) "
+                f"{1e3 * entry['seconds']:9.3f} ms {entry['samples']:>10} samples  {entry['site']}"
+            )
+
+        return "\n".join(lines)
+
+    def to_json(self, path: str | Path) -> None:
+        """Write the report to a JSON file."""
+        Path(path).write_text(json.dumps(self.report(), indent=2))
+
+
+@contextmanager
+def tracing():
+    """Trace the referential conversions made inside the block.
+
+    Raises:
+        ValueError: If tracing is already enabled.
+
+    Yields:
+        ConversionTrace: Conversions, filled as they happen.
+    """
+    global _active
+
+    if _active is not None:
+        raise ValueError("Tracing is already enabled.")
+
+    _active = ConversionTrace()
+    try:
+        yield _active
+    finally:
+        _active = None
+
@@ -0,0 +1,151 @@
+import numpy as np
+
+# Coefficients of the periodic centered stencils, for offsets 1..m (antisymmetric)
+_CENTRAL_STENCILS = {
+    2: (1 / 2,),
+    4: (2 / 3, -1 / 12),
+    6: (3 / 4, -3 / 20, 1 / 60),
+}
+
+DERIVATIVE_METHODS = ("central", "periodic", "spectral")
+
+# Order of the periodic scheme unless given, the same for every entry point
+DEFAULT_PERIODIC_ORDER = 2
+
+
+def central_difference(values: np.ndarray, dt: float, axis: int = -1) -> np.ndarray:
+    """Time derivative of a sampled signal along an axis. A centered difference scheme of order 2
+    is used in the interior, first and last points are computed with a forward and backward
+    difference scheme of order 1.
+
+    Args:
+        values (np.ndarray): Samples of the signal, time along axis.
+        dt (float): Time step.
+        axis (int, optional): Time axis. Defaults to -1.
+
+    Raises:
+        ValueError: If there are less than two samples.
+
+    Returns:
+        np.ndarray: Time derivative, same shape as values.
+    """
+    values = np.moveaxis(np.asarray(values, dtype=float), axis, -1)
+
+    if values.shape[-1] < 2:
+        raise ValueError("At least two samples are needed to compute a derivative.")
+
+    derivative = np.empty_like(values)
+
+    # First point
+    derivative[..., 0] = (values[..., 1] - values[..., 0]) / dt
+
+    # Middle points
+    derivative[..., 1:-1] = (values[..., 2:] - values[..., :-2]) / (2 * dt)
+
+    # Last point
+    derivative[..., -1] = (values[..., -1] - values[..., -2]) / dt
+
+    return np.moveaxis(derivative, -1, axis)
+
+
+def periodic_central_difference(
+    values: np.ndarray, dt: float, order: int = DEFAULT_PERIODIC_ORDER, axis: int = -1
+) -> np.ndarray:
+    """Time derivative of a periodic sampled signal (sampled without its endpoint) along an axis,
+    with a centered difference scheme of order 2, 4 or 6 wrapping around the period.
+
+    Args:
+        values (np.ndarray): Samples of one period of the signal, time along axis.
+        dt (float): Time step.
+        order (int, optional): Order of the scheme, 2, 4 or 6. Defaults to DEFAULT_PERIODIC_ORDER (2).
+        axis (int, optional): Time axis. Defaults to -1.
+
+    Raises:
+        ValueError: If the order is not supported or if the signal is shorter than the stencil.
+
+    Returns:
+        np.ndarray: Time derivative, same shape as values.
+    """
+    if order not in _CENTRAL_STENCILS:
+        raise ValueError(f"Unsupported order {order}. Expected one of {tuple(_CENTRAL_STENCILS)}.")
+
+    coefficients = _CENTRAL_STENCILS[order]
+    half_width = len(coefficients)
+
+    values = np.moveaxis(np.asarray(values, dtype=float), axis, -1)
+    N = values.shape[-1]
+
+    if N <= 2 * half_width:
+        raise ValueError(f"At least {2 * half_width + 1} samples are needed for order {order}.")
+
+    # wrap the signal around so every point sees a full stencil
+    padded = np.concatenate(
+        (values[..., N - half_width :], values, values[..., :half_width]), axis=-1
+    )
+
+    derivative = np.zeros_like(values)
+    for offset, coefficient in enumerate(coefficients, start=1):
+        forward = padded[..., half_width + offset : half_width + offset + N]
+        backward = padded[..., half_width - offset : half_width - offset + N]
+        derivative += coefficient * (forward - backward)
+
+    derivative /= dt
+
+    return np.moveaxis(derivative, -1, axis)
+
+
+def spectral_derivative(values: np.ndarray, dt: float, axis: int = -1) -> np.ndarray:
+    """Time derivative of a periodic sampled signal (sampled without its endpoint) along an axis,
+    computed with the FFT. Exact for trigonometric polynomials resolved by the grid.
+
+    Args:
+        values (np.ndarray): Samples of one period of the signal, time along axis.
+        dt (float): Time step.
+        axis (int, optional): Time axis. Defaults to -1.
+
+    Returns:
+        np.ndarray: Time derivative, same shape as values.
+    """
+    values = np.moveaxis(np.asarray(values, dtype=float), axis, -1)
+    N = values.shape[-1]
+
+    wavenumbers = 2.0 * np.pi * np.fft.rfftfreq(N, d=dt)
+
+    # the Nyquist mode of an even grid has no well defined derivative
+    if N % 2 == 0:
+        wavenumbers[-1] = 0.0
+
+    spectrum = np.fft.rfft(values, axis=-1)
+    derivative = np.fft.irfft(1j * wavenumbers * spectrum, n=N, axis=-1)
+
+    return np.moveaxis(derivative, -1, axis)
+
+
+def time_derivative(
+    values: np.ndarray, dt: float, method: str = "central", order: int = DEFAULT_PERIODIC_ORDER, axis: int = -1
+) -> np.ndarray:
+    """Time derivative of a sampled signal along an axis.
+
+    Args:
+        values (np.ndarray): Samples of the signal, time along axis.
+        dt (float): Time step.
+        method (str, optional): "central" (order 2, one-sided ends), "periodic" (centered
+            stencil wrapping around the period) or "spectral" (FFT). Defaults to "central".
+        order (int, optional): Order of the "periodic" scheme, 2, 4 or 6. Defaults to
+            DEFAULT_PERIODIC_ORDER (2), as periodic_central_difference.
+        axis (int, optional): Time axis. Defaults to -1.
+
+    Raises:
+        ValueError: If the method is unknown.
+
+    Returns:
+        np.ndarray: Time derivative, same shape as values.
+    """
+    if method == "central":
+        return central_difference(values, dt, axis)
+    elif method == "periodic":
+        return periodic_central_difference(values, dt, order, axis)
+    elif method == "spectral":
+        return spectral_derivative(values, dt, axis)
+    else:
+        raise ValueError(f"Unknown method '{method}'. Expected one of {DERIVATIVE_METHODS}.")
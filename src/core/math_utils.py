@@ -2,16 +2,20 @@ from .vector import Vector3D
 import numpy as np
 from .referentials import Referential
 from .angle import Angle
+from .differentiation import time_derivative, DEFAULT_PERIODIC_ORDER
 
 
-def vector_time_derivative(time, vector: Vector3D) -> Vector3D:
+def vector_time_derivative(time, vector: Vector3D, method: str = "central", order: int = DEFAULT_PERIODIC_ORDER) -> Vector3D:
     """Get the time derivative of a Vector3D object of shape (3,N),
-    assuming it's a time series on N. A centered difference scheme of order 2 is used.
-    First and last points are computed with a forward and backward difference scheme of order 1.
+    assuming it's a time series on N. By default a centered difference scheme of order 2 is used,
+    first and last points are computed with a forward and backward difference scheme of order 1.
+    Periodic signals (sampled without endpoint) can use the "periodic" or "spectral" methods.
 
     Args:
         time (np.ndarray): Time array of shape (N,)
         vector (Vector3D): Vector3D object of shape (3,N)
+        method (str, optional): "central", "periodic" or "spectral". Defaults to "central".
+        order (int, optional): Order of the "periodic" scheme (2, 4 or 6). Defaults to 2.
 
     Returns:
         Vector3D: Time derivative of the input vector
@@ -30,30 +34,22 @@ def vector_time_derivative(time, vector: Vector3D) -> Vector3D:
         raise ValueError("The vector must be in the GLOBAL referential.")
 
     dt = time[1] - time[0]  # Time step
-    N = time.shape[0]  # Number of time steps
-    vector_coords = np.empty((3, N))  # Empty array to store the time derivative
+    vector_coords = time_derivative(vector.coords, dt, method, order, axis=1)
 
-    # First point
-    vector_coords[:, 0] = (vector.coords[:, 1] - vector.coords[:, 0]) / dt
+    return Vector3D(vector_coords, Referential.GLOBAL, vector.context)
 
-    # Middle points
-    for i in range(1, N - 1):
-        vector_coords[:, i] = (vector.coords[:, i + 1] - vector.coords[:, i - 1]) / (2 * dt)
 
-    # Last point
-    vector_coords[:, N - 1] = (vector.coords[:, N - 1] - vector.coords[:, N - 2]) / dt
-
-    return Vector3D(vector_coords, Referential.GLOBAL)
-
-
-def angle_time_derivative(time, angle: Angle) -> Angle:
+def angle_time_derivative(time, angle: Angle, method: str = "central", order: int = DEFAULT_PERIODIC_ORDER) -> Angle:
     """Get the time derivative of an Angle object of shape (N,),
-    assuming it's a time series on N. A centered difference scheme of order 2 is used.
-    First and last points are computed with a forward and backward difference scheme of order 1.
+    assuming it's a time series on N. By default a centered difference scheme of order 2 is used,
+    first and last points are computed with a forward and backward difference scheme of order 1.
+    Periodic signals (sampled without endpoint) can use the "periodic" or "spectral" methods.
 
     Args:
         time (np.ndarray): Time array of shape (N,)
         angle (Angle): Angle object of shape (N,)
+        method (str, optional): "central", "periodic" or "spectral". Defaults to "central".
+        order (int, optional): Order of the "periodic" scheme (2, 4 or 6). Defaults to 2.
     Returns:
         Angle: Time derivative of the input angle
     """
@@ -67,18 +63,7 @@ def angle_time_derivative(time, angle: Angle) -> Angle:
         raise ValueError("Time and angle shape mismatch.")
 
     dt = time[1] - time[0]  # Time step
-    N = time.shape[0]  # Number of time steps
-    angle_values = np.empty(N)  # Empty array to store the time derivative
-
-    # First point
-    angle_values[0] = (angle._values[1] - angle._values[0]) / dt
-
-    # Middle points
-    for i in range(1, N - 1):
-        angle_values[i] = (angle._values[i + 1] - angle._values[i - 1]) / (2 * dt)
-
-    # Last point
-    angle_values[N - 1] = (angle._values[N - 1] - angle._values[N - 2]) / dt
+    angle_values = time_derivative(angle._values, dt, method, order)
 
     return Angle(angle_values, angle._unit)
 
@@ -101,7 +86,7 @@ def cross(u: Vector3D, v: Vector3D) -> Vector3D:
 
     vec_coords = np.cross(u.coords, v.coords, axis=0)
 
-    return Vector3D(vec_coords, u.referential)
+    return Vector3D(vec_coords, u.referential, u.context)
 
 
 def dot(u: Vector3D, v: Vector3D) -> np.ndarray:
@@ -138,4 +123,4 @@ def normalize(u: Vector3D) -> Vector3D:
     
     vec_coords = u.coords / u.norm()
         
-    return Vector3D(vec_coords, u.referential)
+    return Vector3D(vec_coords, u.referential, u.context)
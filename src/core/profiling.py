@@ -0,0 +1,207 @@
+from contextlib import contextmanager
+from functools import wraps
+from inspect import signature
+from pathlib import Path
+from time import perf_counter, process_time
+import csv
+import json
+import tracemalloc
+import numpy as np
+
+# Columns of the CSV report
+RECORD_FIELDS = ("stack", "name", "wall_time", "cpu_time", "net_bytes", "peak_bytes", "produced_bytes")
+
+# Profiler collecting the records, None when profiling is disabled
+_active = None
+
+
+def _nbytes(value) -> int:
+    """Size of the data of a holder field (Vector3D, Angle or array), 0 for other objects."""
+    if hasattr(value, "coords"):
+        value = value.coords
+    elif hasattr(value, "_values"):
+        value = value._values
+
+    return value.nbytes if isinstance(value, np.ndarray) else 0
+
+
+class _Frame:
+    """Measures of a profiled call in progress."""
+
+    __slots__ = ("name", "wall", "cpu", "memory", "peak", "fields")
+
+    def __init__(self, name: str, fields: dict | None):
+        self.name = name
+        self.fields = fields
+        self.wall = perf_counter()
+        self.cpu = process_time()
+        self.memory = 0
+        self.peak = 0
+
+
+class Profiler:
+    """Records of the profiled calls made while it is active, see profiling.
+
+    Each record holds the stack of profiled calls ("a;b;c"), the wall and CPU times in seconds,
+    the memory allocated and not freed by the call (net_bytes) and at its peak (peak_bytes),
+    measured with tracemalloc when memory is True, and the size of the holder fields the call
+    produced or replaced (produced, by field name, for the functions given a holder).
+    """
+
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        self.records = []
+        self._stack = []
+
+    def _enter(self, name: str, holder) -> _Frame:
+        # the values themselves, not their ids: a replaced value freed during the call may leave its id to the new one
+        fields = None if holder is None else dict(vars(holder))
+        frame = _Frame(name, fields)
+
+        if self.memory:
+            memory, peak = tracemalloc.get_traced_memory()
+            # the peak reached so far belongs to the calling frame, the new one starts its own
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            frame.memory = memory
+
+        self._stack.append(frame)
+        return frame
+
+    def _exit(self, frame: _Frame, holder) -> None:
+        wall = perf_counter() - frame.wall
+        cpu = process_time() - frame.cpu
+        self._stack.pop()
+
+        net_bytes = peak_bytes = 0
+        if self.memory:
+            memory, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame.peak)
+            net_bytes, peak_bytes = memory - frame.memory, peak - frame.memory
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, peak)
+
+        produced = {}
+        if frame.fields is not None:
+            for field, value in vars(holder).items():
+                if field not in frame.fields or frame.fields[field] is not value:
+                    produced[field] = _nbytes(value)
+
+        self.records.append(
+            {
+                "stack": ";".join([*(parent.name for parent in self._stack), frame.name]),
+                "name": frame.name,
+                "wall_time": wall,
+                "cpu_time": cpu,
+                "net_bytes": net_bytes,
+                "peak_bytes": peak_bytes,
+                "produced": produced,
+            }
+        )
+
+    def summary(self) -> dict[str, dict]:
+        """Totals per profiled function: calls, wall_time, cpu_time, peak_bytes, produced_bytes."""
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(
+                record["name"], {"calls": 0, "wall_time": 0.0, "cpu_time": 0.0, "peak_bytes": 0, "produced_bytes": 0}
+            )
+            total["calls"] += 1
+            total["wall_time"] += record["wall_time"]
+            total["cpu_time"] += record["cpu_time"]
+            total["peak_bytes"] = max(total["peak_bytes"], record["peak_bytes"])
+            total["produced_bytes"] += sum(record["produced"].values())
+
+        return totals
+
+    def folded(self) -> str:
+        """Self wall times in the folded stacks format of flame graph tools ("a;b;c microseconds")."""
+        self_times = {}
+        for record in self.records:
+            self_times[record["stack"]] = self_times.get(record["stack"], 0.0) + record["wall_time"]
+
+            parent = record["stack"].rpartition(";")[0]
+            if parent:
+                self_times[parent] = self_times.get(parent, 0.0) - record["wall_time"]
+
+        return "\n".join(f"{stack} {max(round(1e6 * time), 0)}" for stack, time in self_times.items())
+
+    def to_json(self, path: str | Path) -> None:
+        """Write the records and the summary to a JSON file."""
+        Path(path).write_text(json.dumps({"records": self.records, "summary": self.summary()}, indent=2))
+
+    def to_csv(self, path: str | Path) -> None:
+        """Write the records to a CSV file, one row per call."""
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, RECORD_FIELDS)
+            writer.writeheader()
+            for record in self.records:
+                row = {field: record[field] for field in RECORD_FIELDS if field != "produced_bytes"}
+                writer.writerow({**row, "produced_bytes": sum(record["produced"].values())})
+
+
+def profile(function=None, *, name: str = None, holder: str = None):
+    """Decorator recording the calls of a function while profiling is enabled.
+
+    When profiling is disabled the function is called directly, after a single check.
+
+    Args:
+        name (str, optional): Name of the records. Defaults to the name of the function.
+        holder (str, optional): Name of the argument holding the solution, the fields the call
+            produced on it are recorded. Defaults to none.
+    """
+
+    def decorator(function):
+        label = name or function.__name__
+        parameters = signature(function) if holder else None
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return function(*args, **kwargs)
+
+            target = parameters.bind_partial(*args, **kwargs).arguments.get(holder) if holder else None
+            frame = profiler._enter(label, target)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler._exit(frame, target)
+
+        return wrapper
+
+    return decorator if function is None else decorator(function)
+
+
+@contextmanager
+def profiling(memory: bool = True):
+    """Enable profiling of the decorated functions inside the block.
+
+    Args:
+        memory (bool, optional): Measure the allocations with tracemalloc, which slows the
+            allocations down. Defaults to True.
+
+    Raises:
+        ValueError: If profiling is already enabled.
+
+    Yields:
+        Profiler: Records of the calls, filled as they return.
+    """
+    global _active
+
+    if _active is not None:
+        raise ValueError("Profiling is already enabled.")
+
+    profiler = Profiler(memory)
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+
+    _active = profiler
+    try:
+        yield profiler
+    finally:
+        _active = None
+        if started:
+            tracemalloc.stop()
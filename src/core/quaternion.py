@@ -0,0 +1,341 @@
+import numpy as np
+from .angle import Angle
+from .transform_func import _common_length, _matrix_stack, _squeeze as _squeeze_matrices, _check_layout
+
+# Unit quaternions are stored as [w, x, y, z] along the first axis, shape (4,) or (4,N).
+# A quaternion q stands for the same change of coordinates as the matrix R of transform_func,
+# R @ v == q * v * conj(q). Those matrices rotate the frame, not the vector, so the quaternion
+# of a rotation of angle a around an axis is the one of the vector rotation of angle -a.
+
+
+def _squeeze(quaternions: np.ndarray) -> np.ndarray:
+    """Return a (4,) quaternion if the stack holds a single one, the (4,N) stack otherwise."""
+    if quaternions.ndim == 2 and quaternions.shape[1] == 1:
+        return quaternions[:, 0]
+
+    return quaternions
+
+
+def _axis_quaternion(angle: Angle, axis: int, out: np.ndarray = None) -> np.ndarray:
+    if not isinstance(angle, Angle):
+        raise ValueError("angle must be an Angle object.")
+
+    half_angle = angle.radians / 2.0
+    N = len(angle)
+
+    if out is None:
+        out = np.empty((4, N))
+    elif out.shape != (4, N):
+        raise ValueError(f"out must be of shape (4, {N}), got {out.shape}.")
+
+    out[:] = 0.0
+    out[0] = np.cos(half_angle)
+    out[axis] = -np.sin(half_angle)
+
+    return _squeeze(out)
+
+
+def get_rotation_quaternion_x(angle: Angle, out: np.ndarray = None) -> np.ndarray:
+    """Get the quaternion of get_rotation_matrix_x.
+
+    Args:
+        angle (Angle): Angle object representing the rotation around the x-axis.
+        out (np.ndarray, optional): Preallocated (4,N) buffer to write the quaternions into.
+
+    Raises:
+        ValueError: If the angle is not an Angle object.
+
+    Returns:
+        np.ndarray: Quaternion of shape (4,) or (4,N) depending on the number of angles.
+    """
+    return _axis_quaternion(angle, 1, out)
+
+
+def get_rotation_quaternion_y(angle: Angle, out: np.ndarray = None) -> np.ndarray:
+    """Get the quaternion of get_rotation_matrix_y.
+
+    Args:
+        angle (Angle): Angle object representing the rotation around the y-axis.
+        out (np.ndarray, optional): Preallocated (4,N) buffer to write the quaternions into.
+
+    Raises:
+        ValueError: If the angle is not an Angle object.
+
+    Returns:
+        np.ndarray: Quaternion of shape (4,) or (4,N) depending on the number of angles.
+    """
+    return _axis_quaternion(angle, 2, out)
+
+
+def get_rotation_quaternion_z(angle: Angle, out: np.ndarray = None) -> np.ndarray:
+    """Get the quaternion of get_rotation_matrix_z.
+
+    Args:
+        angle (Angle): Angle object representing the rotation around the z-axis.
+        out (np.ndarray, optional): Preallocated (4,N) buffer to write the quaternions into.
+
+    Raises:
+        ValueError: If the angle is not an Angle object.
+
+    Returns:
+        np.ndarray: Quaternion of shape (4,) or (4,N) depending on the number of angles.
+    """
+    return _axis_quaternion(angle, 3, out)
+
+
+def quaternion_multiply(p: np.ndarray, q: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """Hamilton product p * q, the quaternion of the matrix product R_p @ R_q.
+    (4,) quaternions are broadcast against (4,N) ones.
+
+    Args:
+        p (np.ndarray): Quaternion of shape (4,) or (4,N).
+        q (np.ndarray): Quaternion of shape (4,) or (4,N).
+        out (np.ndarray, optional): Preallocated buffer of the broadcast shape.
+
+    Returns:
+        np.ndarray: Product of shape (4,) or (4,N).
+    """
+    pw, px, py, pz = p
+    qw, qx, qy, qz = q
+
+    if out is None:
+        # only the samples axes are broadcast, a (4,) quaternion is a single sample
+        out = np.empty((4, *np.broadcast_shapes(p.shape[1:], q.shape[1:])))
+
+    out[0] = pw * qw - px * qx - py * qy - pz * qz
+    out[1] = pw * qx + px * qw + py * qz - pz * qy
+    out[2] = pw * qy - px * qz + py * qw + pz * qx
+    out[3] = pw * qz + px * qy - py * qx + pz * qw
+
+    return out
+
+
+def quaternion_conjugate(q: np.ndarray) -> np.ndarray:
+    """Conjugate of a quaternion, the inverse of a unit quaternion (transposed matrix).
+
+    Args:
+        q (np.ndarray): Quaternion of shape (4,) or (4,N).
+
+    Returns:
+        np.ndarray: Conjugate of shape (4,) or (4,N).
+    """
+    conjugate = -q
+    conjugate[0] = q[0]
+    return conjugate
+
+
+def quaternion_compose(*quaternions: np.ndarray) -> np.ndarray:
+    """Product q1 * q2 * ... of unit quaternions, the quaternion of R1 @ R2 @ ...
+
+    Args:
+        *quaternions (np.ndarray): Quaternions of shape (4,) or (4,N), at least one.
+
+    Raises:
+        ValueError: If no quaternion is given.
+
+    Returns:
+        np.ndarray: Product of shape (4,) or (4,N).
+    """
+    if not quaternions:
+        raise ValueError("At least one quaternion is needed.")
+
+    product = quaternions[0]
+    for quaternion in quaternions[1:]:
+        product = quaternion_multiply(product, quaternion)
+
+    return product
+
+
+def stroke_to_wing_quaternion(phi: Angle, alpha: Angle, theta: Angle) -> np.ndarray:
+    """Get the quaternion of stroke_to_wing_matrix, q_y(alpha) * q_z(theta) * q_x(phi).
+
+    Raises:
+        ValueError: If the angles are not Angle objects or if the angles arrays are not of the same length.
+
+    Returns:
+        np.ndarray: Quaternion of shape (4,) or (4,N) depending on the number of angles.
+    """
+    _common_length(phi, alpha, theta)
+
+    return quaternion_compose(
+        get_rotation_quaternion_y(alpha), get_rotation_quaternion_z(theta), get_rotation_quaternion_x(phi)
+    )
+
+
+def global_to_body_quaternion(psi: Angle, beta: Angle, gamma: Angle) -> np.ndarray:
+    """Get the quaternion of global_to_body_matrix, q_x(psi) * q_y(beta) * q_z(gamma).
+
+    Raises:
+        ValueError: If the angles are not Angle objects or if the angles arrays are not of the same length.
+
+    Returns:
+        np.ndarray: Quaternion of shape (4,) or (4,N) depending on the number of angles.
+    """
+    _common_length(psi, beta, gamma)
+
+    return quaternion_compose(
+        get_rotation_quaternion_x(psi), get_rotation_quaternion_y(beta), get_rotation_quaternion_z(gamma)
+    )
+
+
+def global_to_wing_quaternion(phi, alpha, theta, eta, psi, beta, gamma) -> np.ndarray:
+    """Get the quaternion of global_to_wing_matrix, q_s2w * q_b2s * q_g2b.
+
+    Raises:
+        ValueError: If the angles are not Angle objects or if the angles arrays are not of the same length.
+
+    Returns:
+        np.ndarray: Quaternion of shape (4,) or (4,N) depending on the number of angles.
+    """
+    _common_length(phi, alpha, theta, eta, psi, beta, gamma)
+
+    return quaternion_compose(
+        stroke_to_wing_quaternion(phi, alpha, theta),
+        get_rotation_quaternion_y(eta),
+        global_to_body_quaternion(psi, beta, gamma),
+    )
+
+
+def rotate_vectors(q: np.ndarray, coords: np.ndarray) -> np.ndarray:
+    """Apply the change of coordinates of a unit quaternion to vectors, q * v * conj(q).
+
+    Args:
+        q (np.ndarray): Quaternion of shape (4,) or (4,N).
+        coords (np.ndarray): Coordinates of shape (3,1) or (3,N).
+
+    Raises:
+        ValueError: If the shapes of the quaternion and the coordinates do not match.
+
+    Returns:
+        np.ndarray: Coordinates of shape (3,N) (or (3,1) if both are single).
+    """
+    if q.ndim == 2 and coords.shape[1] not in (1, q.shape[1]):
+        raise ValueError(
+            "Invalid shape for transformation quaternion. Allowed shapes: (4,) and (4,N) for quaternions and (3,N) for vectors."
+        )
+
+    w = q[0]
+    u = q[1:] if q.ndim == 2 else q[1:, np.newaxis]
+
+    # v' = v + 2 w (u x v) + 2 u x (u x v)
+    t = 2.0 * np.cross(u, coords, axis=0)
+    return coords + w * t + np.cross(u, t, axis=0)
+
+
+def quaternion_to_matrix(q: np.ndarray, layout: str = "stacked") -> np.ndarray:
+    """Rotation matrix of a unit quaternion.
+
+    Args:
+        q (np.ndarray): Quaternion of shape (4,) or (4,N).
+        layout (str, optional): "stacked" for (3,3,N) or "batched" for (N,3,3). Defaults to "stacked".
+
+    Returns:
+        np.ndarray: Matrix of shape (3,3), or (3,3,N) or (N,3,3) depending on the layout.
+    """
+    q = q if q.ndim == 2 else q[:, np.newaxis]
+    w, x, y, z = q
+
+    matrix = _matrix_stack(q.shape[1], layout=layout)
+    matrix[0, 0] = 1.0 - 2.0 * (y * y + z * z)
+    matrix[0, 1] = 2.0 * (x * y - w * z)
+    matrix[0, 2] = 2.0 * (x * z + w * y)
+    matrix[1, 0] = 2.0 * (x * y + w * z)
+    matrix[1, 1] = 1.0 - 2.0 * (x * x + z * z)
+    matrix[1, 2] = 2.0 * (y * z - w * x)
+    matrix[2, 0] = 2.0 * (x * z - w * y)
+    matrix[2, 1] = 2.0 * (y * z + w * x)
+    matrix[2, 2] = 1.0 - 2.0 * (x * x + y * y)
+
+    return _squeeze_matrices(matrix, layout)
+
+
+def matrix_to_quaternion(matrix: np.ndarray, layout: str = "stacked") -> np.ndarray:
+    """Unit quaternion of a rotation matrix (Shepperd's method, with a positive w).
+
+    Args:
+        matrix (np.ndarray): Rotation matrix of shape (3,3), or (3,3,N) or (N,3,3) depending on the layout.
+        layout (str, optional): "stacked" for (3,3,N) or "batched" for (N,3,3). Defaults to "stacked".
+
+    Raises:
+        ValueError: If the matrix is not of shape (3,3) or a stack of 3x3 matrices.
+
+    Returns:
+        np.ndarray: Quaternion of shape (4,) or (4,N).
+    """
+    _check_layout(layout)
+
+    if matrix.ndim == 3 and layout == "batched":
+        matrix = matrix.transpose(1, 2, 0)
+
+    if matrix.shape[:2] != (3, 3) or matrix.ndim not in (2, 3):
+        raise ValueError("Input matrix must be of shape (3,3) or (3,3,N).")
+
+    m = matrix if matrix.ndim == 3 else matrix[:, :, np.newaxis]
+    trace = m[0, 0] + m[1, 1] + m[2, 2]
+
+    # 4 w^2, 4 x^2, 4 y^2, 4 z^2, the largest one gives the best conditioned formula
+    squares = np.stack(
+        [1.0 + trace, 1.0 + 2.0 * m[0, 0] - trace, 1.0 + 2.0 * m[1, 1] - trace, 1.0 + 2.0 * m[2, 2] - trace]
+    )
+    largest = np.argmax(squares, axis=0)
+    scale = np.sqrt(np.maximum(np.take_along_axis(squares, largest[np.newaxis], axis=0)[0], 0.0))
+
+    # each row holds 4 * q * q_largest
+    products = np.empty((4, 4, m.shape[2]))
+    products[0] = [squares[0], m[2, 1] - m[1, 2], m[0, 2] - m[2, 0], m[1, 0] - m[0, 1]]
+    products[1] = [m[2, 1] - m[1, 2], squares[1], m[0, 1] + m[1, 0], m[0, 2] + m[2, 0]]
+    products[2] = [m[0, 2] - m[2, 0], m[0, 1] + m[1, 0], squares[2], m[1, 2] + m[2, 1]]
+    products[3] = [m[1, 0] - m[0, 1], m[0, 2] + m[2, 0], m[1, 2] + m[2, 1], squares[3]]
+
+    q = np.take_along_axis(products, largest[np.newaxis, np.newaxis], axis=0)[0] / (2.0 * scale)
+    q *= np.where(q[0] < 0.0, -1.0, 1.0)
+
+    return q if matrix.ndim == 3 else q[:, 0]
+
+
+def slerp(q0: np.ndarray, q1: np.ndarray, fraction: np.ndarray) -> np.ndarray:
+    """Spherical linear interpolation between unit quaternions, along the shortest arc.
+
+    Args:
+        q0 (np.ndarray): Start quaternions of shape (4,) or (4,N).
+        q1 (np.ndarray): End quaternions of shape (4,) or (4,N).
+        fraction (np.ndarray): Interpolation fraction in [0, 1], scalar or of shape (N,).
+
+    Returns:
+        np.ndarray: Interpolated quaternions of shape (4,) or (4,N).
+    """
+    cosine = np.sum(q0 * q1, axis=0)
+
+    # q and -q are the same rotation, take the closest one
+    q1 = np.where(cosine < 0.0, -q1, q1)
+    cosine = np.abs(cosine)
+
+    angle = np.arccos(np.clip(cosine, -1.0, 1.0))
+    sine = np.sin(angle)
+
+    # nearly identical quaternions fall back to a linear interpolation
+    small = sine < 1e-12
+    safe_sine = np.where(small, 1.0, sine)
+    weight_0 = np.where(small, 1.0 - fraction, np.sin((1.0 - fraction) * angle) / safe_sine)
+    weight_1 = np.where(small, fraction, np.sin(fraction * angle) / safe_sine)
+
+    q = weight_0 * q0 + weight_1 * q1
+    return q / np.linalg.norm(q, axis=0)
+
+
+def interpolate_quaternions(time: np.ndarray, q: np.ndarray, new_time: np.ndarray) -> np.ndarray:
+    """Resample a time series of unit quaternions with SLERP between consecutive samples.
+
+    Args:
+        time (np.ndarray): Increasing sample times of shape (N,).
+        q (np.ndarray): Quaternions of shape (4,N).
+        new_time (np.ndarray): Times to evaluate of shape (M,), clipped to [time[0], time[-1]].
+
+    Returns:
+        np.ndarray: Quaternions of shape (4,M).
+    """
+    new_time = np.clip(new_time, time[0], time[-1])
+    index = np.clip(np.searchsorted(time, new_time, side="right") - 1, 0, time.size - 2)
+    fraction = (new_time - time[index]) / (time[index + 1] - time[index])
+
+    return slerp(q[:, index], q[:, index + 1], fraction)
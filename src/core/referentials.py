@@ -1,12 +1,31 @@
+from collections import deque
 from enum import Enum, auto
+from functools import lru_cache
+from time import perf_counter
 import numpy as np
 from .angle import Angle
+from .profiling import profile
+from . import conversion_trace
 from .transform_func import (
     stroke_to_wing_matrix,
     global_to_body_matrix,
     global_to_wing_matrix,
     get_rotation_matrix_y,
-    transpose
+    transpose,
+    compose,
+    rotate,
+    MATRIX_LAYOUTS,
+)
+from .quaternion import (
+    stroke_to_wing_quaternion,
+    global_to_body_quaternion,
+    global_to_wing_quaternion,
+    get_rotation_quaternion_y,
+    quaternion_conjugate,
+    quaternion_compose,
+    quaternion_to_matrix,
+    matrix_to_quaternion,
+    rotate_vectors,
 )
 
 
@@ -17,12 +36,160 @@ class Referential(Enum):
     STROKE = auto()
 
 
-class Transformations:
-    _transformations = {}
-    _is_initialized = False
+# Direct transformations between referentials, as (source, target, builder of the source -> target
+# matrix from the angles and the matrix layout, builder of the same transformation as a quaternion).
+# The transformation between any other pair is composed along the shortest path of this graph (edges
+# are walked in both directions, the inverse being the transpose), so adding a referential only
+# requires declaring one edge to a referential already connected. A matrix builder can also return a
+# dict {(source, target): matrix} with the other transformations it computed on the way, they are
+# memoized as well.
+# Edges listed first are preferred on paths of equal length.
+FRAME_EDGES = (
+    (
+        Referential.GLOBAL,
+        Referential.BODY,
+        lambda a, layout: global_to_body_matrix(a["psi"], a["beta"], a["gamma"], layout=layout),
+        lambda a: global_to_body_quaternion(a["psi"], a["beta"], a["gamma"]),
+    ),
+    (
+        Referential.BODY,
+        Referential.STROKE,
+        lambda a, layout: get_rotation_matrix_y(a["eta"], layout=layout),
+        lambda a: get_rotation_quaternion_y(a["eta"]),
+    ),
+    (
+        Referential.STROKE,
+        Referential.WING,
+        lambda a, layout: stroke_to_wing_matrix(a["phi"], a["alpha"], a["theta"], layout=layout),
+        lambda a: stroke_to_wing_quaternion(a["phi"], a["alpha"], a["theta"]),
+    ),
+    # shortcut, cheaper than composing the three edges above
+    (
+        Referential.GLOBAL,
+        Referential.WING,
+        lambda a, layout: dict(
+            zip(
+                [
+                    (Referential.GLOBAL, Referential.WING),
+                    (Referential.STROKE, Referential.WING),
+                    (Referential.GLOBAL, Referential.STROKE),
+                    (Referential.GLOBAL, Referential.BODY),
+                ],
+                global_to_wing_matrix(
+                    a["phi"], a["alpha"], a["theta"], a["eta"], a["psi"], a["beta"], a["gamma"],
+                    layout=layout, return_partials=True,
+                ),
+            )
+        ),
+        lambda a: global_to_wing_quaternion(a["phi"], a["alpha"], a["theta"], a["eta"], a["psi"], a["beta"], a["gamma"]),
+    ),
+)
+
+# Representations a context can store its transformations in
+BACKENDS = ("matrix", "quaternion")
+
+
+def _time_invariant(angle: Angle) -> Angle:
+    """Length 1 angle if all the values of the angle are equal, the angle itself otherwise."""
+    values = angle.radians
+
+    if values.size > 1 and np.all(values == values[0]):
+        return Angle(values[:1], "rad")
+
+    return angle
+
+
+@lru_cache(maxsize=None)
+def frame_path(source: Referential, target: Referential) -> tuple[Referential, ...] | None:
+    """Shortest sequence of referentials from source to target in the FRAME_EDGES graph.
+
+    Returns:
+        tuple[Referential, ...] | None: Referentials from source to target included, None if not connected.
+    """
+    neighbours = {}
+    for start, end, *_ in FRAME_EDGES:
+        neighbours.setdefault(start, []).append(end)
+        neighbours.setdefault(end, []).append(start)
+
+    previous = {source: None}
+    queue = deque([source])
+
+    while queue:
+        referential = queue.popleft()
+
+        if referential == target:
+            path = [target]
+            while previous[path[-1]] is not None:
+                path.append(previous[path[-1]])
+            return tuple(reversed(path))
+
+        for neighbour in neighbours.get(referential, ()):
+            if neighbour not in previous:
+                previous[neighbour] = referential
+                queue.append(neighbour)
+
+    return None
+
 
-    @staticmethod
+class TransformationContext:
+    """Transformations between the referentials of one kinematic case.
+
+    Each simulation can own its context, vectors attached to it are rotated with its transformations.
+    Contexts do not share any state, so several cases can be evaluated at the same time.
+
+    The transformations are stored as (3,3,N) matrices, or as (4,N) unit quaternions with the
+    "quaternion" backend, which takes 32 bytes per sample instead of 72. Both backends give the
+    matrices (get_matrix) and the quaternions (get_quaternion), converting them when needed.
+    The matrices are (3,3,N) stacks, or contiguous (N,3,3) arrays with the "batched" layout.
+
+    Angles whose values are all equal are kept as length 1 angles, so the transformations that
+    only depend on them stay single (3,3) matrices (or (4,) quaternions) instead of N copies.
+    """
+
+    def __init__(self, backend: str = "matrix", layout: str = "stacked"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Expected one of {BACKENDS}.")
+
+        if layout not in MATRIX_LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}'. Expected one of {MATRIX_LAYOUTS}.")
+
+        self._backend = backend
+        self._layout = layout
+        self._angles = {}
+        self._constant_angles = frozenset()
+        self._transformations = {}  # memoized transformations, computed on first request
+        self._is_initialized = False
+        self._version = 0
+
+    @property
+    def backend(self) -> str:
+        """Representation of the stored transformations, "matrix" or "quaternion"."""
+        return self._backend
+
+    @property
+    def layout(self) -> str:
+        """Layout of the matrices, "stacked" for (3,3,N) or "batched" for (N,3,3)."""
+        return self._layout
+
+    @property
+    def constant_angles(self) -> frozenset[str]:
+        """Names of the angles that do not vary in time."""
+        return self._constant_angles
+
+    @property
+    def is_initialized(self) -> bool:
+        """Whether the transformations have been computed."""
+        return self._is_initialized
+
+    @property
+    def version(self) -> int:
+        """Number of times the context has been initialized, coordinates computed with
+        an older version of the transformations are outdated."""
+        return self._version
+
+    @profile(name="TransformationContext.initialize")
     def initialize(
+        self,
         phi: Angle,
         alpha: Angle,
         theta: Angle,
@@ -43,36 +210,154 @@ class Transformations:
         ):
             raise ValueError("Arguments must be Angle objects.")
 
-        Transformations._transformations = {
-            (Referential.STROKE, Referential.WING): stroke_to_wing_matrix(phi, alpha, theta),
-            (Referential.GLOBAL, Referential.BODY): global_to_body_matrix(psi, beta, gamma),
-            (Referential.GLOBAL, Referential.WING): global_to_wing_matrix(phi, alpha, theta, eta, psi, beta, gamma),
-            (Referential.BODY, Referential.STROKE): get_rotation_matrix_y(eta)
+        self._angles = {
+            "phi": phi,
+            "alpha": alpha,
+            "theta": theta,
+            "eta": eta,
+            "psi": psi,
+            "beta": beta,
+            "gamma": gamma,
         }
-        Transformations._is_initialized = True
 
-    @staticmethod
-    def get_matrix(source: Referential, target: Referential):
+        # time-invariant angles are compressed to a single value
+        self._angles = {name: _time_invariant(angle) for name, angle in self._angles.items()}
+        self._constant_angles = frozenset(name for name, angle in self._angles.items() if len(angle) == 1)
+
+        # new angles, the memoized transformations are outdated
+        self._transformations = {}
+        self._is_initialized = True
+        self._version += 1
+
+    def _edge(self, source: Referential, target: Referential) -> np.ndarray:
+        """Transformation of a direct edge of FRAME_EDGES, or of its inverse, memoized."""
+        if (source, target) not in self._transformations:
+            for start, end, matrix_builder, quaternion_builder in FRAME_EDGES:
+                if (start, end) == (source, target):
+                    if self._backend == "quaternion":
+                        self._transformations[(source, target)] = quaternion_builder(self._angles)
+                        break
+
+                    built = matrix_builder(self._angles, self._layout)
+
+                    # the builder computed other transformations on the way, keep them
+                    if isinstance(built, dict):
+                        for key, matrix in built.items():
+                            self._transformations.setdefault(key, matrix)
+                        built = built[(source, target)]
+
+                    self._transformations[(source, target)] = built
+                    break
+            else:
+                inverse = self._edge(target, source)
+                self._transformations[(source, target)] = (
+                    transpose(inverse, self._layout) if self._backend == "matrix" else quaternion_conjugate(inverse)
+                )
+
+        return self._transformations[(source, target)]
+
+    def _transformation(self, source: Referential, target: Referential) -> np.ndarray:
+        """Transformation from source to target in the representation of the backend, composed along
+        the shortest path of the frame graph the first time it is requested and memoized."""
 
         # check if the transformations are initialized
-        if not Transformations._is_initialized:
+        if not self._is_initialized:
             raise ValueError("Transformations must be initialized first.")
-        
+
         # check if the referential is valid
         if not isinstance(source, Referential) or not isinstance(target, Referential):
             raise ValueError("Invalid referential type.")
-        
+
         # check if the referential is the same
         # maybe useless but it's here just in case
         if source == target:
-            return np.eye(3)
-        
-        # manage the inverse transformations
-        if (source, target) not in Transformations._transformations:
+            return np.eye(3) if self._backend == "matrix" else np.array([1.0, 0.0, 0.0, 0.0])
 
-            if (target, source) in Transformations._transformations:
-                return transpose(Transformations._transformations[(target, source)])
-            else:
+        # the inverse is already known, transposing it is cheaper than composing the path
+        if (source, target) not in self._transformations and (target, source) in self._transformations:
+            inverse = self._transformations[(target, source)]
+            self._transformations[(source, target)] = (
+                transpose(inverse, self._layout) if self._backend == "matrix" else quaternion_conjugate(inverse)
+            )
+
+        if (source, target) not in self._transformations:
+            path = frame_path(source, target)
+
+            if path is None:
                 raise ValueError("Transformation not available.")
 
-        return Transformations._transformations[(source, target)]
+            # the transformation of the first edge is applied first, so it comes last in the product
+            edges = [self._edge(start, end) for start, end in zip(path, path[1:])]
+            self._transformations[(source, target)] = (
+                compose(*reversed(edges), layout=self._layout)
+                if self._backend == "matrix"
+                else quaternion_compose(*reversed(edges))
+            )
+
+        return self._transformations[(source, target)]
+
+    def get_matrix(self, source: Referential, target: Referential):
+        """Get the matrix from source to target coordinates. With the matrix backend it is memoized
+        until the next initialize, with the quaternion backend it is converted on each request.
+
+        Raises:
+            ValueError: If the transformations are not initialized, if the referentials are invalid
+                or if no path connects them.
+
+        Returns:
+            np.ndarray: Matrix of shape (3,3), or (3,3,N) or (N,3,3) depending on the layout.
+        """
+        trace = conversion_trace.current()
+        start = perf_counter() if trace is not None else None
+
+        transformation = self._transformation(source, target)
+        if self._backend != "matrix":
+            transformation = quaternion_to_matrix(transformation, self._layout)
+
+        if trace is not None:
+            trace.record_matrix_request(source, target, perf_counter() - start)
+
+        return transformation
+
+    def get_quaternion(self, source: Referential, target: Referential):
+        """Get the unit quaternion from source to target coordinates, see get_matrix.
+
+        Raises:
+            ValueError: If the transformations are not initialized, if the referentials are invalid
+                or if no path connects them.
+
+        Returns:
+            np.ndarray: Quaternion of shape (4,) or (4,N).
+        """
+        transformation = self._transformation(source, target)
+
+        if self._backend == "quaternion":
+            return transformation
+
+        return matrix_to_quaternion(transformation, self._layout)
+
+    def transform(self, coords: np.ndarray, source: Referential, target: Referential) -> np.ndarray:
+        """Express coordinates given in source in the target referential.
+
+        Args:
+            coords (np.ndarray): Coordinates of shape (3,1) or (3,N).
+            source (Referential): Referential of the coordinates.
+            target (Referential): Referential to express them in.
+
+        Raises:
+            ValueError: If the transformations are not initialized, if the referentials are invalid,
+                if no path connects them or if the shapes do not match.
+
+        Returns:
+            np.ndarray: New coordinates of shape (3,N) (or (3,1)).
+        """
+        transformation = self._transformation(source, target)
+
+        if self._backend == "matrix":
+            return rotate(transformation, coords, self._layout)
+
+        return rotate_vectors(transformation, coords)
+
+
+# Default context, used by the vectors and holders that are not given one explicitly
+Transformations = TransformationContext()
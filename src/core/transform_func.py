@@ -1,107 +1,226 @@
 import numpy as np
 from .angle import Angle
+from .profiling import profile
 
+# Memory layouts of the matrix stacks: "stacked" is (3,3,N), the historical layout where the entries
+# of one matrix are N elements apart, "batched" is a C-contiguous (N,3,3) array, one matrix after
+# the other, the layout np.matmul works on. A single matrix is (3,3) in both layouts.
+MATRIX_LAYOUTS = ("stacked", "batched")
 
-def get_rotation_matrix_z(angle: Angle) -> np.ndarray:
+
+def _common_length(*angles: Angle) -> int:
+    """Check that the angles are either of length 1 or of the same length N and return N.
+
+    Raises:
+        ValueError: If the angles arrays are not of length 1 or of the same length.
+    """
+    lengths = [len(angle) for angle in angles]
+    max_len = max(lengths)
+
+    if not all(length in (1, max_len) for length in lengths):
+        raise ValueError("Angle arrays must either be of length 1 or same length")
+
+    return max_len
+
+
+def _check_layout(layout: str) -> None:
+    if layout not in MATRIX_LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}'. Expected one of {MATRIX_LAYOUTS}.")
+
+
+def _matrix_stack(N: int, out: np.ndarray = None, layout: str = "stacked") -> np.ndarray:
+    """Allocate (or validate) the buffer the builders write into. It is returned as a (3,3,N)
+    view in both layouts, so the entries are filled the same way.
+
+    Raises:
+        ValueError: If the layout is unknown or if the given output buffer is not of shape
+            (3,3,N) ("stacked") or (N,3,3) ("batched").
+    """
+    _check_layout(layout)
+    shape = (3, 3, N) if layout == "stacked" else (N, 3, 3)
+
+    if out is None:
+        out = np.empty(shape)
+    elif out.shape != shape:
+        raise ValueError(f"out must be of shape {shape}, got {out.shape}.")
+
+    return out if layout == "stacked" else out.transpose(1, 2, 0)
+
+
+def _squeeze(matrices: np.ndarray, layout: str = "stacked") -> np.ndarray:
+    """Return a (3,3) matrix if the (3,3,N) view holds a single matrix, the stack in its layout otherwise."""
+    if matrices.shape[2] == 1:
+        return matrices[:, :, 0]  # return the rotation matrix of shape (3,3)
+
+    if layout == "batched":
+        return matrices.transpose(2, 0, 1)  # back to the (N,3,3) array
+
+    return matrices  # return the rotation matrix of shape (3,3,N)
+
+
+def _fill_rotation_x(R: np.ndarray, cosine: np.ndarray, sine: np.ndarray) -> None:
+    R[0, 0] = 1.0
+    R[0, 1] = 0.0
+    R[0, 2] = 0.0
+    R[1, 0] = 0.0
+    R[1, 1] = cosine
+    R[1, 2] = sine
+    R[2, 0] = 0.0
+    R[2, 1] = -sine
+    R[2, 2] = cosine
+
+
+def _fill_rotation_y(R: np.ndarray, cosine: np.ndarray, sine: np.ndarray) -> None:
+    R[0, 0] = cosine
+    R[0, 1] = 0.0
+    R[0, 2] = -sine
+    R[1, 0] = 0.0
+    R[1, 1] = 1.0
+    R[1, 2] = 0.0
+    R[2, 0] = sine
+    R[2, 1] = 0.0
+    R[2, 2] = cosine
+
+
+def _fill_rotation_z(R: np.ndarray, cosine: np.ndarray, sine: np.ndarray) -> None:
+    R[0, 0] = cosine
+    R[0, 1] = sine
+    R[0, 2] = 0.0
+    R[1, 0] = -sine
+    R[1, 1] = cosine
+    R[1, 2] = 0.0
+    R[2, 0] = 0.0
+    R[2, 1] = 0.0
+    R[2, 2] = 1.0
+
+
+def _stroke_to_wing_entries(cx, sx, cy, sy, cz, sz) -> list[list[np.ndarray]]:
+    """Closed form of Ry(alpha) @ Rz(theta) @ Rx(phi), as rows of entries broadcast against N."""
+    return [
+        [cy * cz, cy * sz * cx + sy * sx, cy * sz * sx - sy * cx],
+        [-sz, cz * cx, cz * sx],
+        [sy * cz, sy * sz * cx - cy * sx, sy * sz * sx + cy * cx],
+    ]
+
+
+def _global_to_body_entries(cx, sx, cy, sy, cz, sz) -> list[list[np.ndarray]]:
+    """Closed form of Rx(psi) @ Ry(beta) @ Rz(gamma), as rows of entries broadcast against N."""
+    return [
+        [cy * cz, cy * sz, -sy],
+        [sx * sy * cz - cx * sz, sx * sy * sz + cx * cz, sx * cy],
+        [cx * sy * cz + sx * sz, cx * sy * sz - sx * cz, cx * cy],
+    ]
+
+
+def _global_to_stroke_entries(cosine, sine, body: list[list[np.ndarray]]) -> list[list[np.ndarray]]:
+    """Closed form of Ry(eta) @ R_g2b from the entries of R_g2b."""
+    return [
+        [cosine * body[0][j] - sine * body[2][j] for j in range(3)],
+        body[1],
+        [sine * body[0][j] + cosine * body[2][j] for j in range(3)],
+    ]
+
+
+def _fill(R: np.ndarray, entries: list[list[np.ndarray]]) -> None:
+    for i, row in enumerate(entries):
+        for j, entry in enumerate(row):
+            R[i, j] = entry
+
+
+def _fill_stroke_to_wing(R, cx, sx, cy, sy, cz, sz) -> None:
+    """Closed form of Ry(alpha) @ Rz(theta) @ Rx(phi), entries broadcast against N."""
+    _fill(R, _stroke_to_wing_entries(cx, sx, cy, sy, cz, sz))
+
+
+def _fill_global_to_body(R, cx, sx, cy, sy, cz, sz) -> None:
+    """Closed form of Rx(psi) @ Ry(beta) @ Rz(gamma), entries broadcast against N."""
+    _fill(R, _global_to_body_entries(cx, sx, cy, sy, cz, sz))
+
+
+def _cos_sin(angle: Angle) -> tuple[np.ndarray, np.ndarray]:
+    radians = angle.radians
+    return np.cos(radians), np.sin(radians)
+
+
+@profile
+def get_rotation_matrix_z(angle: Angle, out: np.ndarray = None, layout: str = "stacked") -> np.ndarray:
     """Get the rotation matrix around the z-axis. If multiple angles are given,
     the function returns a (3,3,N) array of rotation matrices.
 
     Args:
         angle (Angle): Angle object representing the rotation around the z-axis.
+        out (np.ndarray, optional): Preallocated (3,3,N) or (N,3,3) buffer to write the matrices into.
+        layout (str, optional): "stacked" for (3,3,N) or "batched" for (N,3,3). Defaults to "stacked".
 
     Raises:
         ValueError: If the angle is not an Angle object.
 
     Returns:
-        np.ndarray: Rotation matrix of shape (3,3) or (3,3,N) depending on the number of angles.
+        np.ndarray: Rotation matrix of shape (3,3), or (3,3,N) or (N,3,3) depending on the number of angles.
     """
     if not isinstance(angle, Angle):
         raise ValueError("angle must be an Angle object.")
 
-    cosine = np.cos(angle.radians)
-    sine = np.sin(angle.radians)
-
-    N = len(angle)
-    rotation_matrices = np.empty((3, 3, N))
-
-    for i in range(N):
-        rotation_matrices[:, :, i] = np.array(
-            [[cosine[i], sine[i], 0], [-sine[i], cosine[i], 0], [0, 0, 1]]
-        )
+    rotation_matrices = _matrix_stack(len(angle), out, layout)
+    _fill_rotation_z(rotation_matrices, *_cos_sin(angle))
 
-    if N == 1:
-        return rotation_matrices[:, :, 0]  # return the rotation matrix of shape (3,3)
+    return _squeeze(rotation_matrices, layout)
 
-    return rotation_matrices  # return the rotation matrix of shape (3,3,N)
 
-
-def get_rotation_matrix_y(angle: Angle) -> np.ndarray:
+@profile
+def get_rotation_matrix_y(angle: Angle, out: np.ndarray = None, layout: str = "stacked") -> np.ndarray:
     """Get the rotation matrix around the y-axis. If multiple angles are given,
     the function returns a (3,3,N) array of rotation matrices.
 
     Args:
         angle (Angle): Angle object representing the rotation around the y-axis.
+        out (np.ndarray, optional): Preallocated (3,3,N) or (N,3,3) buffer to write the matrices into.
+        layout (str, optional): "stacked" for (3,3,N) or "batched" for (N,3,3). Defaults to "stacked".
 
     Raises:
         ValueError: If the angle is not an Angle object.
 
     Returns:
-        np.ndarray: Rotation matrix of shape (3,3) or (3,3,N) depending on the number of angles.
+        np.ndarray: Rotation matrix of shape (3,3), or (3,3,N) or (N,3,3) depending on the number of angles.
     """
     if not isinstance(angle, Angle):
         raise ValueError("angle must be an Angle object.")
 
-    cosine = np.cos(angle.radians)
-    sine = np.sin(angle.radians)
-
-    N = len(angle)
-    rotation_matrices = np.empty((3, 3, N))
-
-    for i in range(N):
-        rotation_matrices[:, :, i] = np.array(
-            [[cosine[i], 0, -sine[i]], [0, 1, 0], [sine[i], 0, cosine[i]]]
-        )
-
-    if N == 1:
-        return rotation_matrices[:, :, 0]  # return the rotation matrix of shape (3,3)
+    rotation_matrices = _matrix_stack(len(angle), out, layout)
+    _fill_rotation_y(rotation_matrices, *_cos_sin(angle))
 
-    return rotation_matrices  # return the rotation matrix of shape (3,3,N)
+    return _squeeze(rotation_matrices, layout)
 
 
-def get_rotation_matrix_x(angle: Angle) -> np.ndarray:
+@profile
+def get_rotation_matrix_x(angle: Angle, out: np.ndarray = None, layout: str = "stacked") -> np.ndarray:
     """Get the rotation matrix around the x-axis. If multiple angles are given,
     the function returns a (3,3,N) array of rotation matrices.
 
     Args:
         angle (Angle): Angle object representing the rotation around the x-axis.
+        out (np.ndarray, optional): Preallocated (3,3,N) or (N,3,3) buffer to write the matrices into.
+        layout (str, optional): "stacked" for (3,3,N) or "batched" for (N,3,3). Defaults to "stacked".
 
     Raises:
         ValueError: If the angle is not an Angle object.
 
     Returns:
-        np.ndarray: Rotation matrix of shape (3,3) or (3,3,N) depending on the number of angles.
+        np.ndarray: Rotation matrix of shape (3,3), or (3,3,N) or (N,3,3) depending on the number of angles.
     """
     if not isinstance(angle, Angle):
         raise ValueError("angle must be an Angle object.")
 
-    cosine = np.cos(angle.radians)
-    sine = np.sin(angle.radians)
-
-    N = len(angle)
-    rotation_matrices = np.empty((3, 3, N))
-
-    for i in range(N):
-        rotation_matrices[:, :, i] = np.array(
-            [[1, 0, 0], [0, cosine[i], sine[i]], [0, -sine[i], cosine[i]]]
-        )
+    rotation_matrices = _matrix_stack(len(angle), out, layout)
+    _fill_rotation_x(rotation_matrices, *_cos_sin(angle))
 
-    if N == 1:
-        return rotation_matrices[:, :, 0]  # return the rotation matrix of shape (3,3)
+    return _squeeze(rotation_matrices, layout)
 
-    return rotation_matrices  # return the rotation matrix of shape (3,3,N)
 
-
-def stroke_to_wing_matrix(phi: Angle, alpha: Angle, theta: Angle) -> np.ndarray:
+@profile
+def stroke_to_wing_matrix(
+    phi: Angle, alpha: Angle, theta: Angle, out: np.ndarray = None, layout: str = "stacked"
+) -> np.ndarray:
     """Get the rotation matrix from the stroke referential to the wing referential.
     Computes the rotation matrix as Ry(alpha) @ Rz(theta) @ Rx(phi).
 
@@ -109,12 +228,14 @@ def stroke_to_wing_matrix(phi: Angle, alpha: Angle, theta: Angle) -> np.ndarray:
         phi (Angle): Rotation around the x-axis.
         alpha (Angle): Rotation around the y-axis.
         theta (Angle): Rotation around the z-axis.
+        out (np.ndarray, optional): Preallocated (3,3,N) or (N,3,3) buffer to write the matrices into.
+        layout (str, optional): "stacked" for (3,3,N) or "batched" for (N,3,3). Defaults to "stacked".
 
     Raises:
         ValueError: If the angles are not Angle objects or if the angles arrays are not of the same length.
 
     Returns:
-        np.ndarray: Rotation matrix of shape (3,3) or (3,3,N) depending on the number of angles.
+        np.ndarray: Rotation matrix of shape (3,3), or (3,3,N) or (N,3,3) depending on the number of angles.
     """
 
     # check if the angles are Angle objects
@@ -123,42 +244,19 @@ def stroke_to_wing_matrix(phi: Angle, alpha: Angle, theta: Angle) -> np.ndarray:
             raise ValueError(f"{name} must be an Angle object")
 
     # check if the angles are of length 1 or same length
-    lengths = [len(angle) for angle in (phi, alpha, theta)]
-    max_len = max(lengths)
-
-    if not all(length in (1, max_len) for length in lengths):
-        raise ValueError("Angle arrays must either be of length 1 or same length")
-
-    # broadcast the angles to the same length
-    def broadcast_to_max_len(angle: Angle) -> np.ndarray:
-        return np.broadcast_to(angle, (max_len,))
-
-    phi_broadcasted = phi.apply(broadcast_to_max_len)
-    alpha_broadcasted = alpha.apply(broadcast_to_max_len)
-    theta_broadcasted = theta.apply(broadcast_to_max_len)
+    max_len = _common_length(phi, alpha, theta)
 
-    # get the rotation matrices, at this point all matrices are of shape (3,3,max_len)
-    # and max_len is either 1 or the length of the angles
-    Rx = get_rotation_matrix_x(phi_broadcasted)
-    Ry = get_rotation_matrix_y(alpha_broadcasted)
-    Rz = get_rotation_matrix_z(theta_broadcasted)
+    # the product is written entry by entry, length 1 angles broadcast against max_len
+    output_matrix = _matrix_stack(max_len, out, layout)
+    _fill_stroke_to_wing(output_matrix, *_cos_sin(phi), *_cos_sin(alpha), *_cos_sin(theta))
 
-    if max_len == 1:
-        output_matrix = Ry @ Rz @ Rx
-    else:
-        output_matrix = np.empty((3, 3, max_len))
-
-        # Use np.einsum with a single string to handle all indices directly
-        output_matrix = np.einsum("ijn,jkn,kln->iln", Ry, Rz, Rx, optimize=True)
-
-        # equivalent to the following loop but way faster
-        # for i in range(max_len):
-        #    output_matrix[:, :, i] = Ry[:, :, i] @ Rz[:, :, i] @ Rx[:, :, i]
-
-    return output_matrix
+    return _squeeze(output_matrix, layout)
 
 
-def global_to_body_matrix(psi: Angle, beta: Angle, gamma: Angle) -> np.ndarray:
+@profile
+def global_to_body_matrix(
+    psi: Angle, beta: Angle, gamma: Angle, out: np.ndarray = None, layout: str = "stacked"
+) -> np.ndarray:
     """Get the rotation matrix from the global referential to the body referential.
     Computes the rotation matrix as Rx(psi) @ Ry(beta) @ Rz(gamma).
 
@@ -166,12 +264,14 @@ def global_to_body_matrix(psi: Angle, beta: Angle, gamma: Angle) -> np.ndarray:
         psi (Angle): Rotation around the x-axis.
         beta (Angle): Rotation around the y-axis.
         gamma (Angle): Rotation around the z-axis.
+        out (np.ndarray, optional): Preallocated (3,3,N) or (N,3,3) buffer to write the matrices into.
+        layout (str, optional): "stacked" for (3,3,N) or "batched" for (N,3,3). Defaults to "stacked".
 
     Raises:
         ValueError: If the angles are not Angle objects or if the angles arrays are not of the same length.
 
     Returns:
-        np.ndarray: Rotation matrix of shape (3,3) or (3,3,N) depending on the number of angles.
+        np.ndarray: Rotation matrix of shape (3,3), or (3,3,N) or (N,3,3) depending on the number of angles.
     """
 
     # check if the angles are Angle objects
@@ -180,45 +280,34 @@ def global_to_body_matrix(psi: Angle, beta: Angle, gamma: Angle) -> np.ndarray:
             raise ValueError(f"{name} must be an Angle object")
 
     # check if the angles are of length 1 or same length
-    lengths = [len(angle) for angle in (psi, beta, gamma)]
-    max_len = max(lengths)
-
-    if not all(length in (1, max_len) for length in lengths):
-        raise ValueError("Angle arrays must either be of length 1 or same length")
-
-    # broadcast the angles to the same length
-    def broadcast_to_max_len(angle: Angle) -> np.ndarray:
-        return np.broadcast_to(angle, (max_len,))
-
-    psi_broadcasted = psi.apply(broadcast_to_max_len)
-    beta_broadcasted = beta.apply(broadcast_to_max_len)
-    gamma_broadcasted = gamma.apply(broadcast_to_max_len)
-
-    # get the rotation matrices, at this point all matrices are of shape (3,3,max_len)
-    # and max_len is either 1 or the length of the angles
-    Rx = get_rotation_matrix_x(psi_broadcasted)
-    Ry = get_rotation_matrix_y(beta_broadcasted)
-    Rz = get_rotation_matrix_z(gamma_broadcasted)
-
-    if max_len == 1:
-        output_matrix = Rx @ Ry @ Rz
-    else:
-        output_matrix = np.empty((3, 3, max_len))
-
-        # Use np.einsum with a single string to handle all indices directly
-        output_matrix = np.einsum("ijn,jkn,kln->iln", Rx, Ry, Rz, optimize=True)
-
-        # equivalent to the following loop but way faster
-        # for i in range(max_len):
-        # output_matrix[:, :, i] = Rx[:, :, i] @ Ry[:, :, i] @ Rz[:, :, i]
-
-    return output_matrix
-
-
-def global_to_wing_matrix(phi, alpha, theta, eta, psi, beta, gamma) -> np.ndarray:
+    max_len = _common_length(psi, beta, gamma)
+
+    # the product is written entry by entry, length 1 angles broadcast against max_len
+    output_matrix = _matrix_stack(max_len, out, layout)
+    _fill_global_to_body(output_matrix, *_cos_sin(psi), *_cos_sin(beta), *_cos_sin(gamma))
+
+    return _squeeze(output_matrix, layout)
+
+
+@profile
+def global_to_wing_matrix(
+    phi,
+    alpha,
+    theta,
+    eta,
+    psi,
+    beta,
+    gamma,
+    out: np.ndarray = None,
+    layout: str = "stacked",
+    return_partials: bool = False,
+) -> np.ndarray | tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """Get the rotation matrix from the global referential to the wing referential.
     Computes the rotation matrix as R_s2w @ R_b2s @ R_g2b.
 
+    The nine entries are written in closed form from the sines and cosines of the angles, no
+    intermediate matrix stack is built. Angles of length 1 stay scalars in the computation.
+
     Args:
         phi (Angle): Rotation around the x-axis in the stroke referential.
         alpha (Angle): Rotation around the y-axis in the stroke referential.
@@ -227,12 +316,18 @@ def global_to_wing_matrix(phi, alpha, theta, eta, psi, beta, gamma) -> np.ndarra
         psi (Angle): Rotation around the x-axis in the body referential.
         beta (Angle): Rotation around the y-axis in the body referential.
         gamma (Angle): Rotation around the z-axis in the body referential.
+        out (np.ndarray, optional): Preallocated (3,3,N) or (N,3,3) buffer to write the matrices into.
+        layout (str, optional): "stacked" for (3,3,N) or "batched" for (N,3,3). Defaults to "stacked".
+        return_partials (bool, optional): Also return the factors computed on the way,
+            R_s2w, R_g2s = R_b2s @ R_g2b and R_g2b. Defaults to False.
 
     Raises:
         ValueError: If the angles are not Angle objects or if the angles arrays are not of the same length.
 
     Returns:
-        np.ndarray: Rotation matrix of shape (3,3) or (3,3,N) depending on the number of angles.
+        np.ndarray: Rotation matrix of shape (3,3), or (3,3,N) or (N,3,3) depending on the number of angles.
+            With return_partials, the tuple (R_g2w, R_s2w, R_g2s, R_g2b), each factor with the
+            length of its own angles.
     """
 
     # check if the angles are Angle objects
@@ -249,62 +344,146 @@ def global_to_wing_matrix(phi, alpha, theta, eta, psi, beta, gamma) -> np.ndarra
             raise ValueError(f"{name} must be an Angle object")
 
     # check if the angles are of length 1 or same length
-    lengths = [len(angle) for angle in (phi, alpha, theta, eta, psi, beta, gamma)]
-    max_len = max(lengths)
+    max_len = _common_length(phi, alpha, theta, eta, psi, beta, gamma)
 
-    if not all(length in (1, max_len) for length in lengths):
-        raise ValueError("Angle arrays must either be of length 1 or same length")
+    # entries of the factors, of length 1 or max_len depending on their own angles
+    W = _stroke_to_wing_entries(*_cos_sin(phi), *_cos_sin(alpha), *_cos_sin(theta))
+    B = _global_to_body_entries(*_cos_sin(psi), *_cos_sin(beta), *_cos_sin(gamma))
+    S = _global_to_stroke_entries(*_cos_sin(eta), B)
 
-    # broadcast the angles to the same length
-    def broadcast_to_max_len(angle: Angle) -> np.ndarray:
-        return np.broadcast_to(angle, (max_len,))
-
-    phi_broadcasted = phi.apply(broadcast_to_max_len)
-    alpha_broadcasted = alpha.apply(broadcast_to_max_len)
-    theta_broadcasted = theta.apply(broadcast_to_max_len)
-    eta_broadcasted = eta.apply(broadcast_to_max_len)
-    psi_broadcasted = psi.apply(broadcast_to_max_len)
-    beta_broadcasted = beta.apply(broadcast_to_max_len)
-    gamma_broadcasted = gamma.apply(broadcast_to_max_len)
-
-    # get the rotation matrices, at this point all matrices are of shape (3,3,max_len)
-    # and max_len is either 1 or the length of the angles
-    R_s2w = stroke_to_wing_matrix(phi_broadcasted, alpha_broadcasted, theta_broadcasted)
-    R_g2b = global_to_body_matrix(psi_broadcasted, beta_broadcasted, gamma_broadcasted)
-    R_b2s = get_rotation_matrix_y(eta_broadcasted)
-
-    if max_len == 1:
-        output_matrix = R_s2w @ R_b2s @ R_g2b
-    else:
-        output_matrix = np.empty((3, 3, max_len))
+    if not return_partials:
+        del B  # rows 0 and 2 are not needed anymore
 
-        # Use np.einsum with a single string to handle all indices directly
-        output_matrix = np.einsum(
-            "ijn,jkn,kln->iln", R_s2w, R_b2s, R_g2b, optimize=True
-        )
+    output_matrix = _matrix_stack(max_len, out, layout)
+
+    # R_g2w = R_s2w @ R_g2s, one entry at a time
+    for i in range(3):
+        for j in range(3):
+            output_matrix[i, j] = W[i][0] * S[0][j] + W[i][1] * S[1][j] + W[i][2] * S[2][j]
+
+    if not return_partials:
+        return _squeeze(output_matrix, layout)
+
+    partials = []
+    for entries, angles in [(W, (phi, alpha, theta)), (S, (eta, psi, beta, gamma)), (B, (psi, beta, gamma))]:
+        partial = _matrix_stack(max(len(angle) for angle in angles), layout=layout)
+        _fill(partial, entries)
+        partials.append(_squeeze(partial, layout))
+
+    return (_squeeze(output_matrix, layout), *partials)
+
+
+def compose(*matrices: np.ndarray, layout: str = "stacked") -> np.ndarray:
+    """Matrix product M1 @ M2 @ ... of rotation matrices of shape (3,3), (3,3,N) or (N,3,3),
+    computed with a batched matmul. (3,3) matrices are broadcast against the stacks.
+
+    Args:
+        *matrices (np.ndarray): Matrices of shape (3,3) or stacks in the layout, at least one.
+        layout (str, optional): "stacked" for (3,3,N) or "batched" for (N,3,3). Defaults to "stacked".
+
+    Raises:
+        ValueError: If the matrices are not of shape (3,3) or stacks of 3x3 matrices.
+
+    Returns:
+        np.ndarray: Product of shape (3,3) if all the matrices are (3,3), a stack in the layout otherwise.
+    """
+    _check_layout(layout)
+
+    if not matrices:
+        raise ValueError("At least one matrix is needed.")
+
+    batched = []
+    for matrix in matrices:
+        if matrix.shape == (3, 3):
+            batched.append(matrix)
+        elif layout == "stacked" and matrix.ndim == 3 and matrix.shape[:2] == (3, 3):
+            batched.append(np.moveaxis(matrix, 2, 0))  # (N,3,3) view for matmul
+        elif layout == "batched" and matrix.ndim == 3 and matrix.shape[1:] == (3, 3):
+            batched.append(matrix)
+        else:
+            raise ValueError("Input matrix must be of shape (3,3) or (3,3,N).")
 
-        # equivalent to the following loop but way faster
-        # for i in range(max_len):
-        #    output_matrix[:, :, i] = R_s2w[:, :, i] @ R_b2s[:, :, i] @ R_g2b[:, :, i]
+    # fold the consecutive (3,3) matrices together first, so they are applied once to the stacks
+    folded = []
+    for matrix in batched:
+        if folded and matrix.ndim == 2 and folded[-1].ndim == 2:
+            folded[-1] = folded[-1] @ matrix
+        else:
+            folded.append(matrix)
 
-    return output_matrix
+    product = folded[0]
+    for matrix in folded[1:]:
+        product = np.matmul(product, matrix)
 
-def transpose(matrix: np.ndarray) -> np.ndarray:
-    """Transpose the input matrix. If the input matrix is of shape (3,3,N), the function
-    returns a matrix of shape (3,3,N).
+    if product.ndim == 3 and layout == "stacked":
+        return np.moveaxis(product, 0, 2)
+
+    return product
+
+
+def transpose(matrix: np.ndarray, layout: str = "stacked") -> np.ndarray:
+    """Transpose the input matrix. If the input matrix is a stack of matrices, each of them is
+    transposed and the stack keeps its layout.
 
     Args:
-        matrix (np.ndarray): Input matrix of shape (3,3) or (3,3,N).
+        matrix (np.ndarray): Input matrix of shape (3,3), or (3,3,N) or (N,3,3) depending on the layout.
+        layout (str, optional): "stacked" for (3,3,N) or "batched" for (N,3,3). Defaults to "stacked".
 
     Raises:
-        ValueError: If the input matrix is not of shape (3,3) or (3,3,N).
+        ValueError: If the input matrix is not of shape (3,3) or a stack of 3x3 matrices.
 
     Returns:
-        np.ndarray: Transposed matrix of shape (3,3) or (3,3,N).
+        np.ndarray: Transposed matrix of the same shape.
     """
+    _check_layout(layout)
+
     if matrix.shape == (3, 3):
         return matrix.T
-    elif matrix.ndim == 3:
+    elif matrix.ndim == 3 and layout == "stacked":
         return matrix.transpose((1, 0, 2))
+    elif matrix.ndim == 3:
+        return matrix.transpose((0, 2, 1))
     else:
         raise ValueError("Input matrix must be of shape (3,3) or (3,3,N).")
+
+
+def rotate(matrix: np.ndarray, coords: np.ndarray, layout: str = "stacked") -> np.ndarray:
+    """Apply a transformation matrix to coordinates.
+
+    Args:
+        matrix (np.ndarray): Matrix of shape (3,3), or (3,3,N) or (N,3,3) depending on the layout.
+        coords (np.ndarray): Coordinates of shape (3,1) or (3,N).
+        layout (str, optional): "stacked" for (3,3,N) or "batched" for (N,3,3). Defaults to "stacked".
+
+    Raises:
+        ValueError: If the shapes of the matrix and the coordinates do not match.
+
+    Returns:
+        np.ndarray: Coordinates of shape (3,N) (or (3,1) if both are single).
+    """
+    _check_layout(layout)
+
+    # If we have (3,3) and (3,1) or (3,N)
+    if matrix.shape == (3, 3):
+        return matrix @ coords
+
+    N = None
+    if matrix.ndim == 3:
+        N = matrix.shape[2] if layout == "stacked" else matrix.shape[0]
+
+    if N is None or coords.shape[1] not in (1, N):
+        raise ValueError(
+            "Invalid shape for transformation matrix. Allowed shapes: (3,3) and (3,3,N) for matrices and (3,N) for vectors."
+        )
+
+    # contiguous (N,3,3) against (3,N), a single vector is broadcast. np.matmul on (N,3,1)
+    # operands is about twice slower than einsum for this product, see benchmarks/matrix_layout.py
+    if layout == "batched":
+        return np.einsum("nij,jn->in", matrix, np.broadcast_to(coords, (3, N)))
+
+    # if we have (3,3,N) and (3,N)
+    if coords.shape[1] == N:
+        return np.einsum("ijk,jk->ik", matrix, coords)
+
+    # if we have (3,3,N) and (3,1)
+    return np.einsum("ijk,jl->ik", matrix, coords)
@@ -1,21 +1,32 @@
+from time import perf_counter
 import numpy as np
-from .referentials import Referential, Transformations
+from . import conversion_trace
+from .referentials import Referential, Transformations, TransformationContext
 from .types import ArrayLike, UFunc, Scalar
 
 
 class Vector3D:
-    def __init__(self, array: ArrayLike, referential: Referential):
+    def __init__(
+        self, array: ArrayLike, referential: Referential, context: TransformationContext = None, copy: bool = True
+    ):
         # check if we have a valid referential
         if isinstance(referential, Referential):
             self._referential = referential
         else:
             raise ValueError("Invalid Referential")
 
+        # check if we have a valid transformation context (None means the default one)
+        if context is not None and not isinstance(context, TransformationContext):
+            raise ValueError("Invalid TransformationContext")
+
+        self._context = context
+
         # check if we have an array_like
         if not isinstance(array, (list, tuple, np.ndarray)):
             raise ValueError("Invalid Type")
 
-        array = np.array(array, dtype=float)
+        # without copy, a float array is used as is: the vector is a view of the caller's buffer
+        array = np.array(array, dtype=float, copy=True if copy else None)
 
         if array.ndim == 1:  # If we have a 1D array
             if len(array) != 3:
@@ -57,8 +68,20 @@ class Vector3D:
         """
         return self._referential
 
+    @property
+    def context(self) -> TransformationContext:
+        """Transformation context used to change the referential of the vector.
+
+        Returns:
+            TransformationContext: The context given at construction, or the default one.
+        """
+        return self._context if self._context is not None else Transformations
+
     def set_referential(self, new_referential: Referential) -> "Vector3D":
-        """Change the referential of the vector by applying the corresponding transformation matrix.
+        """Change the referential of the vector by applying the corresponding transformation.
+
+        The transformation comes from the context of the vector, as a matrix or a quaternion
+        depending on its backend.
 
         Parameters:
             new_referential (Referential): The new referential desired.
@@ -66,7 +89,7 @@ class Vector3D:
         Raises:
             ValueError: If the new referential is not a Referential object.
             ValueError: If the transformations are not initialized.
-            ValueError: If the transformation matrix shape is invalid.
+            ValueError: If the transformation shape is invalid.
         
         Returns:    
             Vector3D: New vector in the new referential.
@@ -75,31 +98,21 @@ class Vector3D:
         if not isinstance(new_referential, Referential):
             raise ValueError("Invalid Referential")
         
-        if not Transformations._is_initialized:
+        if not self.context.is_initialized:
             raise ValueError("Transformations must be initialized first.")
         
         if new_referential == self.referential:
             return self
 
-        transformation_matrix = Transformations.get_matrix(self.referential, new_referential)
-
-        # If we have (3,3) and (3,1)
-        if transformation_matrix.shape == (3, 3) and len(self) == 1:
-            self._coords = transformation_matrix @ self.coords
-            self._referential = new_referential
-        
-        # if we have (3,3,N) and (3,N)
-        elif transformation_matrix.shape[2] == len(self):
-            self._coords = np.einsum("ijk,jk->ik", transformation_matrix, self.coords)
-            self._referential = new_referential
+        trace = conversion_trace.current()
+        start = perf_counter() if trace is not None else None
 
-        # if we have (3,3,N) and (3,1)
-        elif transformation_matrix.ndim == 3 and len(self) == 1:
-            self._coords = np.einsum("ijk,jl->ik", transformation_matrix, self.coords)
-            self._referential = new_referential
+        source = self.referential
+        self._coords = self.context.transform(self.coords, source, new_referential)
+        self._referential = new_referential
 
-        else:
-            raise ValueError("Invalid shape for transformation matrix. Allowed shapes: (3,3) and (3,3,N) for matrices and (3,N) for vectors.")
+        if trace is not None:
+            trace.record_conversion(self, source, new_referential, self._coords.shape[-1], perf_counter() - start)
 
         return self    
 
@@ -124,7 +137,7 @@ class Vector3D:
             raise ValueError("Invalid scalar type.")
 
         new_coords = self.coords * scalar
-        return Vector3D(new_coords, self.referential)
+        return Vector3D(new_coords, self.referential, self._context)
 
     def __truediv__(self, scalar: Scalar) -> "Vector3D":
         """Division of a vector by a scalar.
@@ -141,7 +154,7 @@ class Vector3D:
         if scalar == 0:
             raise ValueError("Division by zero.")
 
-        return Vector3D(self.coords / scalar, referential=self.referential)
+        return Vector3D(self.coords / scalar, referential=self.referential, context=self._context)
 
     def __sub__(self, vector: "Vector3D") -> "Vector3D":
         """Substraction of two vectors.
@@ -158,7 +171,7 @@ class Vector3D:
         if self.referential != vector.referential:
             raise ValueError("Referentials mismatch.")
 
-        return Vector3D(self.coords - vector.coords, referential=self.referential)
+        return Vector3D(self.coords - vector.coords, referential=self.referential, context=self._context)
 
     def __add__(self, vector: "Vector3D") -> "Vector3D":
         """Addition of two vectors.
@@ -176,7 +189,7 @@ class Vector3D:
         if self.referential != vector.referential:  
             raise ValueError("Referentials mismatch.")
 
-        return Vector3D(self.coords + vector.coords, referential=self.referential)
+        return Vector3D(self.coords + vector.coords, referential=self.referential, context=self._context)
 
     def __repr__(self) -> str:
         """Representation of the vector.
@@ -219,5 +232,88 @@ class Vector3D:
         coords = [arg.coords if isinstance(arg, Vector3D) else arg for arg in inputs]
         result = getattr(ufunc, method)(*coords, **kwargs)
         if isinstance(result, np.ndarray) and result.ndim >= 2 and result.shape[0] == 3:
-            return Vector3D(result, referential=self.referential)
+            return Vector3D(result, referential=self.referential, context=self._context)
         return result
+
+
+class CachedVector3D(Vector3D):
+    """Vector3D that remembers its coordinates in every referential it has been expressed in.
+
+    Changing back to a referential already computed returns the cached coordinates instead of
+    rotating them again, which saves the matrix product and the round-off of the round trip.
+    The cached arrays are read-only: assigning new coordinates (or re-initializing the context)
+    invalidates the cache.
+    """
+
+    def __init__(
+        self, array: ArrayLike, referential: Referential, context: TransformationContext = None, copy: bool = True
+    ):
+        super().__init__(array, referential, context, copy)
+        # a view of its own, so that a buffer shared with the caller stays writeable
+        self._coords = self._coords.view()
+        self._coords.flags.writeable = False
+        self._cache = {}
+        self._cache_version = None
+
+    @classmethod
+    def from_vector(cls, vector: Vector3D) -> "CachedVector3D":
+        """Cached copy of a vector, with the same referential and context."""
+        return cls(vector.coords, vector.referential, vector._context)
+
+    @property
+    def coords(self) -> np.ndarray:
+        """Coordinates of the vector in its current referential (read-only array).
+
+        Returns:
+            np.ndarray: Array of coordinates.
+        """
+        return self._coords
+
+    @coords.setter
+    def coords(self, array: ArrayLike) -> None:
+        """Replace the coordinates in the current referential, the other referentials are dropped."""
+        self._coords = Vector3D(array, self._referential).coords.view()
+        self._coords.flags.writeable = False
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop the coordinates cached for the other referentials."""
+        self._cache = {}
+        self._cache_version = None
+
+    def set_referential(self, new_referential: Referential) -> "CachedVector3D":
+        """Change the referential of the vector, reusing the cached coordinates if they exist.
+
+        Parameters:
+            new_referential (Referential): The new referential desired.
+
+        Returns:
+            CachedVector3D: The vector, in the new referential.
+        """
+        if not isinstance(new_referential, Referential):
+            raise ValueError("Invalid Referential")
+
+        if new_referential == self.referential:
+            return self
+
+        # the context has been re-initialized since the coordinates were cached
+        if self._cache_version != self.context.version:
+            self._cache = {}
+            self._cache_version = self.context.version
+
+        self._cache[self._referential] = self._coords
+
+        if new_referential in self._cache:
+            trace = conversion_trace.current()
+            if trace is not None:
+                trace.record_conversion(self, self._referential, new_referential, 0, 0.0, cached=True)
+
+            self._coords = self._cache[new_referential]
+            self._referential = new_referential
+        else:
+            super().set_referential(new_referential)
+            self._coords = self._coords.view()
+            self._coords.flags.writeable = False
+            self._cache[new_referential] = self._coords
+
+        return self
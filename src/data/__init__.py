@@ -1,8 +1,11 @@
 from .wing_contour import WING_CONTOUR_W_X, WING_CONTOUR_W_Y
 from .kinematics_solution_holder import KinematicsSolutionHolder
+from .packed_solution_holder import PackedKinematicsSolutionHolder, PACKED_FIELDS
 
 __all__ = [
     "WING_CONTOUR_W_X",
     "WING_CONTOUR_W_Y",
     "KinematicsSolutionHolder",
+    "PackedKinematicsSolutionHolder",
+    "PACKED_FIELDS",
 ]
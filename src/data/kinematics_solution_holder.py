@@ -1,14 +1,23 @@
 from dataclasses import dataclass
-from core import Angle, Vector3D
+from pathlib import Path
+import json
+from core import Angle, Vector3D, CachedVector3D, Referential, TransformationContext, Transformations
 import numpy as np
 
+# Version of the on-disk format written by KinematicsSolutionHolder.save
+FORMAT_VERSION = 1
+
+# Angles the transformations of a loaded solution are initialized from
+CONTEXT_ANGLES = ("phi", "alpha", "theta", "eta", "psi", "beta", "gamma")
+
 
 @dataclass
 class KinematicsSolutionHolder:
     # Time Vector
     time: np.array
 
-    # Angles
+    # Angles, the stroke plane (eta) and body (psi, beta, gamma) angles
+    # are either of length 1 (constant) or of shape (N,)
     phi: Angle
     alpha: Angle
     theta: Angle
@@ -23,6 +32,11 @@ class KinematicsSolutionHolder:
     alpha_dt: Angle
     theta_dt: Angle
 
+    # Angles second time derivatives (only set when the model provides them)
+    phi_ddt: Angle
+    alpha_ddt: Angle
+    theta_ddt: Angle
+
     # Unit vectors
     ex: Vector3D
     ey: Vector3D
@@ -51,14 +65,147 @@ class KinematicsSolutionHolder:
     force_AMx: Vector3D
     force_AMz: Vector3D
     force_QSM: Vector3D
+
+    # Transformations between referentials of this solution
+    context: TransformationContext
     
-    def __init__(self):
-        pass
+    def __init__(self, context: TransformationContext = None):
+        # the default context is shared, give each concurrent solution its own one
+        self.context = context if context is not None else Transformations
+
+    def set_angles(self, unit: str = "deg", **angles) -> None:
+        """Set angles of the solution from Angle objects, scalars or (N,) arrays.
+
+        Args:
+            unit (str, optional): Unit of the angles not given as Angle objects. Defaults to "deg".
+            **angles: Angle name -> Angle, scalar or array of shape (N,).
+
+        Raises:
+            ValueError: If an angle is neither of length 1 nor of the length of the time vector.
+        """
+        N = getattr(self, "time", np.empty(0)).size
+
+        for name, value in angles.items():
+            angle = value if isinstance(value, Angle) else Angle(value, unit)
+
+            if N and len(angle) not in (1, N):
+                raise ValueError(f"{name} must either be of length 1 or of the length of time ({N}), got {len(angle)}.")
+
+            setattr(self, name, angle)
 
     # todo : add the other important quantities to be computed
 
-    def save(file_name: str):
-        pass  # todo save as csv, or npy (binary)
+    def _field_names(self) -> list[str]:
+        """Names of the fields set on the solution, loaded from disk or not."""
+        stored = self.__dict__.get("_stored", {})
+        names = [name for name in vars(self) if not name.startswith("_") and name != "context"]
+        return names + [name for name in stored if name not in names]
+
+    def save(self, directory: str | Path) -> None:
+        """Save the solution as a directory holding one <field>.npy file per field and a manifest.json
+        with their types, shapes, dtypes, referentials and angle units, see load.
+
+        Vectors are saved in their current referential, angles in their current unit.
+
+        Args:
+            directory (str | Path): Directory to write, created if needed.
+
+        Raises:
+            ValueError: If a field is not an array, an Angle or a Vector3D.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        fields = {}
+        for name in self._field_names():
+            value = getattr(self, name)
+
+            if isinstance(value, Vector3D):
+                kind = "cached_vector" if isinstance(value, CachedVector3D) else "vector"
+                values, entry = value.coords, {"referential": value.referential.name}
+            elif isinstance(value, Angle):
+                kind, values, entry = "angle", value._values, {"unit": value._unit}
+            elif isinstance(value, np.ndarray):
+                kind, values, entry = "array", value, {}
+            else:
+                raise ValueError(f"Cannot save field {name} of type {type(value).__name__}.")
+
+            np.save(directory / f"{name}.npy", values)
+            fields[name] = {"type": kind, "shape": list(values.shape), "dtype": values.dtype.str, **entry}
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "backend": self.context.backend,
+            "layout": self.context.layout,
+            "fields": fields,
+        }
+        (directory / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+    @classmethod
+    def load(cls, directory: str | Path, context: TransformationContext = None) -> "KinematicsSolutionHolder":
+        """Open a solution written by save. Only the manifest is read: each field is memory-mapped
+        from its file the first time it is accessed and stays memory-mapped.
+
+        The transformations are initialized from the stored angles when the first vector is accessed.
+
+        Args:
+            directory (str | Path): Directory written by save.
+            context (TransformationContext, optional): Context of the solution. Defaults to a new
+                context with the backend and layout of the saved solution.
+
+        Raises:
+            ValueError: If the directory does not hold a solution of a supported format version.
+
+        Returns:
+            KinematicsSolutionHolder: Solution whose fields are loaded on access.
+        """
+        directory = Path(directory)
+
+        try:
+            manifest = json.loads((directory / "manifest.json").read_text())
+        except FileNotFoundError:
+            raise ValueError(f"No manifest.json in {directory}.") from None
+
+        if manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported format version {manifest.get('format_version')}, expected {FORMAT_VERSION}.")
+
+        if context is None:
+            context = TransformationContext(manifest["backend"], manifest["layout"])
+
+        Holder = cls(context)
+        Holder._directory = directory
+        Holder._stored = manifest["fields"]
+        Holder._context_pending = True
+
+        return Holder
+
+    def _initialize_context(self) -> None:
+        """Initialize the transformations of a loaded solution from its angles, once."""
+        self._context_pending = False
+
+        angles = {name: getattr(self, name, None) for name in CONTEXT_ANGLES}
+        if all(isinstance(angle, Angle) for angle in angles.values()):
+            self.context.initialize(**angles)
+
+    def __getattr__(self, name: str):
+        # only called for the attributes not set yet: the fields of a loaded solution not accessed so far
+        stored = self.__dict__.get("_stored", {})
+        if name not in stored:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        entry = stored[name]
+        values = np.load(self._directory / f"{name}.npy", mmap_mode="r")
+
+        if entry["type"] in ("vector", "cached_vector"):
+            if self._context_pending:
+                self._initialize_context()
+
+            vector_type = CachedVector3D if entry["type"] == "cached_vector" else Vector3D
+            value = vector_type(values, Referential[entry["referential"]], self.context, copy=False)
+        elif entry["type"] == "angle":
+            value = Angle(values, entry["unit"])
+        else:
+            value = values
 
-    def load(file_name: str):
-        pass  # todo : load a csv, or npy (binary)
+        setattr(self, name, value)
+        return value
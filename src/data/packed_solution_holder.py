@@ -0,0 +1,182 @@
+from pathlib import Path
+import numpy as np
+from core import Angle, Vector3D, CachedVector3D, Referential, TransformationContext
+from .kinematics_solution_holder import KinematicsSolutionHolder
+
+# Fields stored in the block of a PackedKinematicsSolutionHolder, as (name, number of rows).
+# Fields of shape (N,) take one row, vectors of shape (3,N) take three. The constant unit vectors
+# and the stroke plane and body angles, which may be of length 1, are kept out of the block.
+PACKED_FIELDS = (
+    ("time", 1),
+    ("phi", 1),
+    ("alpha", 1),
+    ("theta", 1),
+    ("phi_dt", 1),
+    ("alpha_dt", 1),
+    ("theta_dt", 1),
+    ("phi_ddt", 1),
+    ("alpha_ddt", 1),
+    ("theta_ddt", 1),
+    ("angle_of_attack", 1),
+    ("lift_coeff", 1),
+    ("drag_coeff", 1),
+    ("omega", 3),
+    ("u_tip", 3),
+    ("omega_planar", 3),
+    ("omega_dt", 3),
+    ("u_tip_dt", 3),
+    ("e_drag", 3),
+    ("e_lift", 3),
+    ("force_TC", 3),
+    ("force_TD", 3),
+    ("force_RC", 3),
+    ("force_RD", 3),
+    ("force_AMx", 3),
+    ("force_AMz", 3),
+    ("force_QSM", 3),
+)
+
+
+class _BlockVector:
+    """Vector whose coordinates stay in its rows of the block, whatever its referential: changing
+    the referential writes the new coordinates into the rows."""
+
+    def _attach(self, rows: np.ndarray) -> None:
+        self._rows = rows  # writeable view of the rows
+        self._view = self._coords  # view of the rows used as coordinates (read-only if cached)
+
+    def set_referential(self, new_referential: Referential):
+        if new_referential == self._referential or not isinstance(new_referential, Referential):
+            return super().set_referential(new_referential)
+
+        if isinstance(self, CachedVector3D):
+            # the coordinates left are cached, they must not be the rows overwritten below
+            self._coords = self._coords.copy()
+            self._coords.flags.writeable = False
+
+        super().set_referential(new_referential)
+        np.copyto(self._rows, self._coords)
+        self._coords = self._view
+
+        return self
+
+
+class _BlockVector3D(_BlockVector, Vector3D):
+    pass
+
+
+class _BlockCachedVector3D(_BlockVector, CachedVector3D):
+    @CachedVector3D.coords.setter
+    def coords(self, array) -> None:
+        np.copyto(self._rows, Vector3D(array, self._referential).coords)
+        self._coords = self._view
+        self.invalidate()
+
+
+def field_slices(fields: tuple = PACKED_FIELDS) -> dict[str, slice]:
+    """Rows of each field in the block, in the order of the schema."""
+    slices, row = {}, 0
+    for name, rows in fields:
+        slices[name] = slice(row, row + rows)
+        row += rows
+
+    return slices
+
+
+class PackedKinematicsSolutionHolder(KinematicsSolutionHolder):
+    """KinematicsSolutionHolder whose fields are views of one contiguous float64 block.
+
+    The block has one row per (N,) field and three per vector, laid out from the schema (see
+    PACKED_FIELDS). Assigning a field copies its values into its rows and stores an Angle,
+    vector or array viewing them, so the whole solution is a single (rows, N) array: it can be
+    a np.memmap or a shared memory buffer and exported to other processes without copy, and
+    giving the block of a previous solution to a new one reuses its memory.
+
+    Vectors keep their coordinates in the block whatever their referential: changing the
+    referential of a vector field writes the new coordinates into its rows (see referentials).
+    Fields outside of the schema are set as on a KinematicsSolutionHolder.
+    """
+
+    def __init__(
+        self,
+        number_time_steps: int,
+        context: TransformationContext = None,
+        block: np.ndarray = None,
+        fields: tuple = PACKED_FIELDS,
+    ):
+        """
+        Args:
+            number_time_steps (int): Number of samples N of the fields.
+            context (TransformationContext, optional): Transformations of the solution.
+                Defaults to the shared default context.
+            block (np.ndarray, optional): float64 C-contiguous buffer of shape (rows, N) to store
+                the fields in, allocated if not given.
+            fields (tuple, optional): Schema of the block. Defaults to PACKED_FIELDS.
+
+        Raises:
+            ValueError: If the block is not a C-contiguous float64 array of shape (rows, N).
+        """
+        slices = field_slices(fields)
+        shape = (sum(rows for _, rows in fields), number_time_steps)
+
+        if block is None:
+            block = np.empty(shape)
+        elif block.shape != shape or block.dtype != np.float64 or not block.flags.c_contiguous:
+            raise ValueError(f"block must be a C-contiguous float64 array of shape {shape}.")
+
+        object.__setattr__(self, "_block", block)
+        object.__setattr__(self, "_slices", slices)
+        super().__init__(context)
+
+    @property
+    def block(self) -> np.ndarray:
+        """Buffer of shape (rows, N) holding the fields."""
+        return self._block
+
+    @property
+    def slices(self) -> dict[str, slice]:
+        """Rows of each field in the block."""
+        return dict(self._slices)
+
+    @property
+    def referentials(self) -> dict:
+        """Referential of the coordinates of each vector stored in the block."""
+        return {
+            name: value.referential
+            for name in self._slices
+            if isinstance(value := vars(self).get(name), Vector3D)
+        }
+
+    def view(self, name: str) -> np.ndarray:
+        """Rows of a field in the block, of shape (N,) or (3,N) for vectors."""
+        rows = self._block[self._slices[name]]
+        return rows[0] if rows.shape[0] == 1 else rows
+
+    def __setattr__(self, name: str, value) -> None:
+        if name not in self._slices:
+            object.__setattr__(self, name, value)
+            return
+
+        view = self.view(name)
+
+        if isinstance(value, Vector3D):
+            if view.ndim != 2:
+                raise ValueError(f"{name} is not a vector field.")
+            np.copyto(view, value.coords)
+            vector_type = _BlockCachedVector3D if isinstance(value, CachedVector3D) else _BlockVector3D
+            value = vector_type(view, value.referential, value._context, copy=False)
+            value._attach(self.view(name))
+        elif isinstance(value, Angle):
+            np.copyto(view, value._values)
+            value = Angle(view, value._unit)
+        else:
+            np.copyto(view, value)
+            value = view
+
+        object.__setattr__(self, name, value)
+
+    @classmethod
+    def load(cls, directory: str | Path, context: TransformationContext = None) -> KinematicsSolutionHolder:
+        """Open a saved solution, as a KinematicsSolutionHolder with memory-mapped fields, see
+        KinematicsSolutionHolder.load."""
+        return KinematicsSolutionHolder.load(directory, context)
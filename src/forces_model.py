@@ -12,7 +12,7 @@ def force_TC(
         0.5 * lift_coeff * omega_planar_wing.norm() ** 2 * e_lift_global.coords
     )
 
-    return Vector3D(force_components, Referential.GLOBAL)
+    return Vector3D(force_components, Referential.GLOBAL, e_lift_global.context)
 
 
 def force_TD(
@@ -25,7 +25,7 @@ def force_TD(
         0.5 * drag_coeff * omega_planar_wing.norm() ** 2 * e_drag_global.coords
     )
 
-    return Vector3D(force_components, Referential.GLOBAL)
+    return Vector3D(force_components, Referential.GLOBAL, e_drag_global.context)
 
 
 def force_RC(
@@ -38,7 +38,7 @@ def force_RC(
         C_RC * u_tip_global.norm() * omega_wing.coords[1, :] * ez_global.coords
     )
 
-    return Vector3D(force_components, Referential.GLOBAL)
+    return Vector3D(force_components, Referential.GLOBAL, ez_global.context)
 
 
 def force_RD(omega_wing: Vector3D, ez_global: Vector3D, C_RD: Scalar):
@@ -53,7 +53,7 @@ def force_RD(omega_wing: Vector3D, ez_global: Vector3D, C_RD: Scalar):
         * ez_global.coords
     )
 
-    return Vector3D(force_components, Referential.GLOBAL)
+    return Vector3D(force_components, Referential.GLOBAL, ez_global.context)
 
 
 def force_AMx(
@@ -63,7 +63,7 @@ def force_AMx(
         C_AMX1 * u_tip_dt_wing.coords[0, :] + C_AMX2 * u_tip_dt_wing.coords[2, :]
     ) * ex_global.coords
 
-    return Vector3D(force_components, Referential.GLOBAL)
+    return Vector3D(force_components, Referential.GLOBAL, ex_global.context)
 
 
 def force_AMz(
@@ -89,4 +89,4 @@ def force_AMz(
         + C_AMZ6 * omega_dt_wing.coords[2, :]
     ) * ez_global.coords
 
-    return Vector3D(force_components, Referential.GLOBAL)
+    return Vector3D(force_components, Referential.GLOBAL, ez_global.context)
@@ -1,15 +1,35 @@
 from data import KinematicsSolutionHolder
-from core import Transformations
 from core import Angle
 
-def initialize_transformations(Holder: KinematicsSolutionHolder) -> None:
-    
-    # Initialize some of the angles to zero, this may change 
-    # and another implementation may be used.
-    Holder.eta = Angle(0.0, "rad")
-    Holder.psi = Angle(0.0, "rad")
-    Holder.beta = Angle(0.0, "rad")
-    Holder.gamma = Angle(0.0, "rad")
+# Angles of the stroke plane and of the body, zero unless given
+ATTITUDE_ANGLES = ("eta", "psi", "beta", "gamma")
+
+
+def initialize_transformations(Holder: KinematicsSolutionHolder, unit: str = "deg", **attitude) -> None:
+    """Initialize the transformations of the holder context from its angles.
+
+    The stroke plane angle eta and the body angles psi, beta and gamma can be given as Angle
+    objects, scalars or (N,) arrays (in unit). Each of them can be constant or time-varying
+    independently, constant ones stay of length 1 and cost nothing more than before.
+    Angles not given keep the value already set on the holder, or zero.
+
+    Args:
+        Holder (KinematicsSolutionHolder): Holder for the kinematic solution
+        unit (str, optional): Unit of the angles not given as Angle objects. Defaults to "deg".
+        **attitude: eta, psi, beta, gamma.
+
+    Raises:
+        ValueError: If an angle is unknown or if its length is neither 1 nor the number of time steps.
+    """
+    unknown = set(attitude) - set(ATTITUDE_ANGLES)
+    if unknown:
+        raise ValueError(f"Unknown angles {sorted(unknown)}. Expected {ATTITUDE_ANGLES}.")
+
+    for name in ATTITUDE_ANGLES:
+        if attitude.get(name) is None and getattr(Holder, name, None) is None:
+            attitude[name] = Angle(0.0, "rad")
+
+    Holder.set_angles(unit, **{name: value for name, value in attitude.items() if value is not None})
 
     angles = {
         "phi": Holder.phi,
@@ -20,6 +40,6 @@ def initialize_transformations(Holder: KinematicsSolutionHolder) -> None:
         "beta": Holder.beta,
         "gamma": Holder.gamma,
     }
-    
-    Transformations.initialize(**angles)
-    return None
\ No newline at end of file
+
+    Holder.context.initialize(**angles)
+    return None
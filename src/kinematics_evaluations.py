@@ -1,27 +1,94 @@
-from bumblebee_kinematic_model import bumblebee_kinematics_model
+from bumblebee_kinematic_model import bumblebee_kinematics_model, maneuver_kinematics_model
 from aerodynamic_model import drag_coefficient, lift_coefficient
 from core import angle_time_derivative
 from core import vector_time_derivative
 from data import KinematicsSolutionHolder
 from core import Vector3D
+from core import CachedVector3D
 from core import Referential
 from core import cross
 from core import normalize
 from core import Angle
+from core import TransformationContext
+from core import profile
+from core import DEFAULT_PERIODIC_ORDER
+from initialize_transformations import ATTITUDE_ANGLES
 import numpy as np
 from forces_model import force_RC, force_AMx, force_AMz, force_RD, force_TC, force_TD
 
-def evaluate_angles_kinematics(number_time_steps: int, Holder: KinematicsSolutionHolder) -> KinematicsSolutionHolder:
+# Constants of the aerodynamic coefficients model (Dickinson 1999)
+AERODYNAMIC_CONSTANTS = {"K1": 1, "K2": 1, "K3": 1, "K4": 1}
+
+# Constants of the quasi-steady forces model
+FORCE_CONSTANTS = {
+    "C_RC": 1,
+    "C_RD": 1,
+    "C_AMX1": 1,
+    "C_AMX2": 1,
+    "C_AMZ1": 1,
+    "C_AMZ2": 1,
+    "C_AMZ3": 1,
+    "C_AMZ4": 1,
+    "C_AMZ5": 1,
+    "C_AMZ6": 1,
+}
+
+@profile(holder="Holder")
+def evaluate_angles_kinematics(
+    number_time_steps: int,
+    Holder: KinematicsSolutionHolder,
+    analytic_derivatives: bool = True,
+    **model_parameters,
+) -> KinematicsSolutionHolder:
     """Evaluate the kinematics of the bumblebee model
 
     Args:
         number_time_steps (int): Number of time steps
         Holder (KinematicsSolutionHolder): Holder for the kinematic solution
+        analytic_derivatives (bool, optional): Use the exact angles time derivatives of the model
+            instead of finite differences. Defaults to True.
+        **model_parameters: PHI, phi_m, dTau, alpha_down, alpha_up, tau, theta, forwarded to
+            bumblebee_kinematics_model. Defaults to the model defaults.
 
     Returns:
         KinematicsSolutionHolder: Holder for the kinematic solution
     """
-    Holder.time, Holder.alpha, Holder.phi, Holder.theta = bumblebee_kinematics_model(number_time_steps)
+    if analytic_derivatives:
+        Holder.time, Holder.alpha, Holder.phi, Holder.theta, derivatives = bumblebee_kinematics_model(
+            number_time_steps, derivatives=True, **model_parameters
+        )
+        for name, derivative in derivatives.items():
+            setattr(Holder, name, derivative)
+    else:
+        Holder.time, Holder.alpha, Holder.phi, Holder.theta = bumblebee_kinematics_model(
+            number_time_steps, **model_parameters
+        )
+        Holder.alpha_dt = angle_time_derivative(Holder.time, Holder.alpha)
+        Holder.phi_dt = angle_time_derivative(Holder.time, Holder.phi)
+        Holder.theta_dt = angle_time_derivative(Holder.time, Holder.theta)
+
+    return Holder
+
+
+@profile(holder="Holder")
+def evaluate_maneuver_angles(
+    number_time_steps: int, Holder: KinematicsSolutionHolder, transition: float = 0.2, **cycle_parameters
+) -> KinematicsSolutionHolder:
+    """Evaluate the kinematics of several wingbeats with per-cycle parameters, see maneuver_kinematics_model.
+    The angles time derivatives are taken over the whole record.
+
+    Args:
+        number_time_steps (int): Number of time steps per cycle
+        Holder (KinematicsSolutionHolder): Holder for the kinematic solution
+        transition (float, optional): Duration of the blending between cycles. Defaults to 0.2.
+        **cycle_parameters: Parameters of bumblebee_kinematics_model, scalars or arrays of shape (C,).
+
+    Returns:
+        KinematicsSolutionHolder: Holder for the kinematic solution
+    """
+    Holder.time, Holder.alpha, Holder.phi, Holder.theta = maneuver_kinematics_model(
+        number_time_steps, transition, **cycle_parameters
+    )
     Holder.alpha_dt = angle_time_derivative(Holder.time, Holder.alpha)
     Holder.phi_dt = angle_time_derivative(Holder.time, Holder.phi)
     Holder.theta_dt = angle_time_derivative(Holder.time, Holder.theta)
@@ -29,6 +96,7 @@ def evaluate_angles_kinematics(number_time_steps: int, Holder: KinematicsSolutio
     return Holder
 
 
+@profile(holder="Holder")
 def define_unit_vectors(Holder: KinematicsSolutionHolder) -> KinematicsSolutionHolder:
     """Define the unit vectors of the bumblebee model
 
@@ -38,15 +106,60 @@ def define_unit_vectors(Holder: KinematicsSolutionHolder) -> KinematicsSolutionH
     Returns:
         KinematicsSolutionHolder: Holder for the kinematic solution
     """
-    Holder.ex = Vector3D([1, 0, 0], Referential.WING)
-    Holder.ey = Vector3D([0, 1, 0], Referential.WING)
-    Holder.ez = Vector3D([0, 0, 1], Referential.WING)
+    Holder.ex = CachedVector3D([1, 0, 0], Referential.WING, Holder.context)
+    Holder.ey = CachedVector3D([0, 1, 0], Referential.WING, Holder.context)
+    Holder.ez = CachedVector3D([0, 0, 1], Referential.WING, Holder.context)
 
     return Holder
 
 
+def attitude_angular_velocity(Holder: KinematicsSolutionHolder) -> np.ndarray | None:
+    """Angular velocity of the stroke plane relative to the global referential, in the stroke
+    referential: the rate of the stroke plane angle eta plus the one of the body angles psi,
+    beta, gamma. The rates of the time-varying angles are taken with central differences.
+
+    Args:
+        Holder (KinematicsSolutionHolder): Holder for the kinematic solution
+
+    Returns:
+        np.ndarray | None: Angular velocity of shape (3,N), None if the angles are all constant.
+    """
+    angles = {name: getattr(Holder, name, None) for name in ATTITUDE_ANGLES}
+    if all(angle is None or len(angle) == 1 for angle in angles.values()):
+        return None
+
+    values, rates = {}, {}
+    for name, angle in angles.items():
+        if angle is None:
+            values[name], rates[name] = 0.0, 0.0
+        elif len(angle) == 1:
+            values[name], rates[name] = angle.radians, 0.0
+        else:
+            values[name], rates[name] = angle.radians, angle_time_derivative(Holder.time, angle).radians
+
+    cos_eta, sin_eta = np.cos(values["eta"]), np.sin(values["eta"])
+    cos_psi, sin_psi = np.cos(values["psi"]), np.sin(values["psi"])
+    cos_beta, sin_beta = np.cos(values["beta"]), np.sin(values["beta"])
+
+    # body relative to global, in the body referential (global_to_body_matrix is Rx(psi) @ Ry(beta) @ Rz(gamma))
+    omega_x = rates["psi"] - sin_beta * rates["gamma"]
+    omega_y = cos_psi * rates["beta"] + sin_psi * cos_beta * rates["gamma"]
+    omega_z = -sin_psi * rates["beta"] + cos_psi * cos_beta * rates["gamma"]
+
+    # rotated to the stroke referential by Ry(eta), plus the stroke plane relative to the body
+    omega_attitude = np.empty((3, Holder.time.size))
+    omega_attitude[0, :] = cos_eta * omega_x - sin_eta * omega_z
+    omega_attitude[1, :] = omega_y + rates["eta"]
+    omega_attitude[2, :] = sin_eta * omega_x + cos_eta * omega_z
+
+    return omega_attitude
+
+
+@profile(holder="Holder")
 def evaluate_angular_velocity(Holder: KinematicsSolutionHolder) -> KinematicsSolutionHolder:
-    """Evaluate the angular velocity of the bumblebee model
+    """Evaluate the angular velocity of the bumblebee model, the one of the wing relative to the
+    stroke plane plus, when the stroke plane or body angles vary, the one of the stroke plane
+    relative to the global referential (see attitude_angular_velocity).
 
     Args:
         Holder (KinematicsSolutionHolder): Holder for the kinematic solution
@@ -59,11 +172,16 @@ def evaluate_angular_velocity(Holder: KinematicsSolutionHolder) -> KinematicsSol
     omega_stroke[1, :] = np.cos(Holder.phi.radians) * np.cos(Holder.theta.radians) * Holder.alpha_dt.radians - np.sin(Holder.phi.radians) * Holder.theta_dt.radians
     omega_stroke[2, :] = np.sin(Holder.phi.radians) * np.cos(Holder.theta.radians) * Holder.alpha_dt.radians + np.cos(Holder.phi.radians) * Holder.theta_dt.radians
 
-    Holder.omega = Vector3D(omega_stroke, Referential.STROKE)
+    omega_attitude = attitude_angular_velocity(Holder)
+    if omega_attitude is not None:
+        omega_stroke += omega_attitude
+
+    Holder.omega = CachedVector3D(omega_stroke, Referential.STROKE, Holder.context)
 
     return Holder
 
 
+@profile(holder="Holder")
 def evaluate_tip_velocity(Holder: KinematicsSolutionHolder) -> KinematicsSolutionHolder:
     """Evaluate the velocities of the bumblebee model
 
@@ -76,11 +194,12 @@ def evaluate_tip_velocity(Holder: KinematicsSolutionHolder) -> KinematicsSolutio
     Holder.omega.set_referential(Referential.WING)
     Holder.ey.set_referential(Referential.WING)
 
-    Holder.u_tip = cross(Holder.omega, Holder.ey)
+    Holder.u_tip = CachedVector3D.from_vector(cross(Holder.omega, Holder.ey))
 
     return Holder
 
 
+@profile(holder="Holder")
 def define_aero_unit_vectors(Holder: KinematicsSolutionHolder) -> KinematicsSolutionHolder:
     """Define the aerodynamic unit vectors
 
@@ -95,7 +214,7 @@ def define_aero_unit_vectors(Holder: KinematicsSolutionHolder) -> KinematicsSolu
     ey_global = Holder.ey.set_referential(Referential.GLOBAL)
     
     u_tip_global_opposite_coords = - u_tip_global.coords
-    u_tip_global_opposite = Vector3D(u_tip_global_opposite_coords, Referential.GLOBAL)
+    u_tip_global_opposite = Vector3D(u_tip_global_opposite_coords, Referential.GLOBAL, Holder.context)
 
     e_drag_global = normalize(u_tip_global_opposite)
     e_lift_global = cross(ey_global, e_drag_global)
@@ -104,11 +223,12 @@ def define_aero_unit_vectors(Holder: KinematicsSolutionHolder) -> KinematicsSolu
     e_lift_global_coords = np.where(sign_alpha == -1, -e_lift_global.coords, e_lift_global.coords)
 
     Holder.e_drag = e_drag_global
-    Holder.e_lift = Vector3D(e_lift_global_coords, Referential.GLOBAL)
+    Holder.e_lift = Vector3D(e_lift_global_coords, Referential.GLOBAL, Holder.context)
 
     return Holder
 
 
+@profile(holder="Holder")
 def compute_angle_of_attack(Holder: KinematicsSolutionHolder) -> KinematicsSolutionHolder:
     """Compute the angle of attack as arctan²(-omega_wing_y, -omega_wing_z)
 
@@ -128,57 +248,74 @@ def compute_angle_of_attack(Holder: KinematicsSolutionHolder) -> KinematicsSolut
     return Holder
 
 
-def compute_aerodynamic_coefficients(Holder: KinematicsSolutionHolder) -> KinematicsSolutionHolder:
-    """Compute CL and CD"""
+@profile(holder="Holder")
+def compute_aerodynamic_coefficients(
+    Holder: KinematicsSolutionHolder, constants: dict = None
+) -> KinematicsSolutionHolder:
+    """Compute CL and CD
+
+    Args:
+        Holder (KinematicsSolutionHolder): Holder for the kinematic solution
+        constants (dict, optional): Values of K1..K4 overriding AERODYNAMIC_CONSTANTS.
 
-    K1 = 1
-    K2 = 1
-    K3 = 1
-    K4 = 1
-    # todo : constants needs to find their place in the holder (maybe a dictionnary)
+    Returns:
+        KinematicsSolutionHolder: Holder for the kinematic solution
+    """
+    K = {**AERODYNAMIC_CONSTANTS, **(constants or {})}
 
-    Holder.lift_coeff = lift_coefficient(Holder.angle_of_attack, K1, K2)
-    Holder.drag_coeff = drag_coefficient(Holder.angle_of_attack, K3, K4)
+    Holder.lift_coeff = lift_coefficient(Holder.angle_of_attack, K["K1"], K["K2"])
+    Holder.drag_coeff = drag_coefficient(Holder.angle_of_attack, K["K3"], K["K4"])
 
     return Holder
 
 
+@profile(holder="Holder")
 def define_planar_angular_velocity(Holder: KinematicsSolutionHolder) -> KinematicsSolutionHolder:
     """"""
     omega_wing = Holder.omega.set_referential(Referential.WING)
     omega_wing_planar_coords = omega_wing.coords.copy()
     omega_wing_planar_coords[1,:] = 0
 
-    Holder.omega_planar = Vector3D(omega_wing_planar_coords, Referential.WING)
+    Holder.omega_planar = Vector3D(omega_wing_planar_coords, Referential.WING, Holder.context)
     
     return Holder
 
 
-def compute_accelerations(Holder: KinematicsSolutionHolder) -> KinematicsSolutionHolder:
-    """"""
+@profile(holder="Holder")
+def compute_accelerations(
+    Holder: KinematicsSolutionHolder, method: str = "central", order: int = DEFAULT_PERIODIC_ORDER
+) -> KinematicsSolutionHolder:
+    """Compute the time derivatives of the tip velocity and of the angular velocity
+
+    Args:
+        Holder (KinematicsSolutionHolder): Holder for the kinematic solution
+        method (str, optional): Differentiation method, "central", "periodic" or "spectral".
+            The kinematics model samples one period, so the periodic methods apply. Defaults to "central".
+        order (int, optional): Order of the "periodic" scheme. Defaults to DEFAULT_PERIODIC_ORDER.
+
+    Returns:
+        KinematicsSolutionHolder: Holder for the kinematic solution
+    """
     Holder.u_tip.set_referential(Referential.GLOBAL)
-    Holder.u_tip_dt = vector_time_derivative(Holder.time, Holder.u_tip)
+    Holder.u_tip_dt = CachedVector3D.from_vector(vector_time_derivative(Holder.time, Holder.u_tip, method, order))
 
     Holder.omega.set_referential(Referential.GLOBAL)
-    Holder.omega_dt = vector_time_derivative(Holder.time, Holder.omega)
+    Holder.omega_dt = CachedVector3D.from_vector(vector_time_derivative(Holder.time, Holder.omega, method, order))
 
     return Holder
 
-def compute_forces(Holder: KinematicsSolutionHolder) -> KinematicsSolutionHolder:
-    """"""
+@profile(holder="Holder")
+def compute_forces(Holder: KinematicsSolutionHolder, constants: dict = None) -> KinematicsSolutionHolder:
+    """Compute the quasi-steady forces
 
-    C_RC = 1
-    C_RD = 1
-    
-    C_AMX1 = 1
-    C_AMX2 = 1
+    Args:
+        Holder (KinematicsSolutionHolder): Holder for the kinematic solution
+        constants (dict, optional): Values of C_RC, C_RD, C_AMX*, C_AMZ* overriding FORCE_CONSTANTS.
 
-    C_AMZ1 = 1
-    C_AMZ2 = 1
-    C_AMZ3 = 1
-    C_AMZ4 = 1
-    C_AMZ5 = 1
-    C_AMZ6 = 1
+    Returns:
+        KinematicsSolutionHolder: Holder for the kinematic solution
+    """
+    C = {**FORCE_CONSTANTS, **(constants or {})}
 
     omega_planar_wing = Holder.omega_planar.set_referential(Referential.WING)
     e_lift_global = Holder.e_lift.set_referential(Referential.GLOBAL)
@@ -195,11 +332,88 @@ def compute_forces(Holder: KinematicsSolutionHolder) -> KinematicsSolutionHolder
     Holder.force_TD = force_TD(Holder.drag_coeff, omega_planar_wing, e_drag_global)
     Holder.force_TC = force_TC(Holder.lift_coeff, omega_planar_wing, e_lift_global)
 
-    Holder.force_RC = force_RC(u_tip_global, omega_wing, ez_global, C_RC)
-    Holder.force_RD = force_RD(omega_wing, ez_global, C_RD)
-    Holder.force_AMx = force_AMx(u_tip_dt_wing, ex_global, C_AMX1, C_AMX2)
-    Holder.force_AMz = force_AMz(u_tip_dt_wing, omega_dt_wing, ez_global, C_AMZ1, C_AMZ2, C_AMZ3, C_AMZ4, C_AMZ5, C_AMZ6)
+    Holder.force_RC = force_RC(u_tip_global, omega_wing, ez_global, C["C_RC"])
+    Holder.force_RD = force_RD(omega_wing, ez_global, C["C_RD"])
+    Holder.force_AMx = force_AMx(u_tip_dt_wing, ex_global, C["C_AMX1"], C["C_AMX2"])
+    Holder.force_AMz = force_AMz(
+        u_tip_dt_wing, omega_dt_wing, ez_global,
+        C["C_AMZ1"], C["C_AMZ2"], C["C_AMZ3"], C["C_AMZ4"], C["C_AMZ5"], C["C_AMZ6"],
+    )
 
     Holder.force_QSM = Holder.force_AMx + Holder.force_AMz + Holder.force_RC + Holder.force_RD + Holder.force_TC + Holder.force_TD
 
-    return Holder
\ No newline at end of file
+    return Holder
+
+
+@profile
+def solve_kinematics(
+    number_time_steps: int,
+    context: TransformationContext = None,
+    attitude: dict = None,
+    Holder: KinematicsSolutionHolder = None,
+    **model_parameters,
+) -> KinematicsSolutionHolder:
+    """Run every stage of the kinematics pipeline, from the angles to the forces
+
+    Each call with its own context is independent of the others, so several cases can be
+    solved at the same time in a thread pool (NumPy releases the GIL in the heavy stages).
+
+    Args:
+        number_time_steps (int): Number of time steps
+        context (TransformationContext, optional): Transformations of the solution.
+            Defaults to the shared default context.
+        attitude (dict, optional): Stroke plane and body angles eta, psi, beta, gamma, as
+            Angle objects or values in degrees, constant or of shape (N,). Defaults to zero.
+        Holder (KinematicsSolutionHolder, optional): Holder to fill, for instance a
+            PackedKinematicsSolutionHolder whose block is reused from one evaluation to the next.
+            Defaults to a new holder with the given context.
+        **model_parameters: PHI, phi_m, dTau, alpha_down, alpha_up, tau, theta, forwarded to
+            bumblebee_kinematics_model. Defaults to the model defaults.
+
+    Raises:
+        ValueError: If a model parameter is unknown.
+
+    Returns:
+        KinematicsSolutionHolder: Holder for the kinematic solution
+    """
+    # the stages are described in pipeline, which imports this module
+    from pipeline import run_stages
+
+    if Holder is None:
+        Holder = KinematicsSolutionHolder(context)
+
+    return run_stages(Holder, number_time_steps=number_time_steps, attitude=attitude, **model_parameters)
+
+
+@profile
+def solve_maneuver(
+    number_time_steps: int,
+    cycle_parameters: dict,
+    context: TransformationContext = None,
+    attitude: dict = None,
+    transition: float = 0.2,
+) -> KinematicsSolutionHolder:
+    """Run every stage of the kinematics pipeline over a multi-wingbeat maneuver in one pass
+
+    Args:
+        number_time_steps (int): Number of time steps per cycle
+        cycle_parameters (dict): Parameters of bumblebee_kinematics_model, scalars or arrays of
+            shape (C,) with one value per wingbeat.
+        context (TransformationContext, optional): Transformations of the solution.
+            Defaults to the shared default context.
+        attitude (dict, optional): Stroke plane and body angles, see solve_kinematics.
+        transition (float, optional): Duration of the blending between cycles. Defaults to 0.2.
+
+    Returns:
+        KinematicsSolutionHolder: Holder for the kinematic solution, of C * number_time_steps samples
+    """
+    # the stages are described in pipeline, which imports this module
+    from pipeline import PIPELINE_STAGES, run_stages
+
+    Holder = KinematicsSolutionHolder(context)
+    Holder = evaluate_maneuver_angles(number_time_steps, Holder, transition, **cycle_parameters)
+
+    # the angles of the maneuver replace the ones of the model, the other stages are the same
+    stages = tuple(stage for stage in PIPELINE_STAGES if stage.name != "angles")
+
+    return run_stages(Holder, stages, attitude=attitude)
@@ -0,0 +1,143 @@
+import numpy as np
+from bumblebee_kinematic_model import stroke_angle, feathering_angle
+from pipeline import MODEL_PARAMETERS
+from streaming_evaluations import DEFAULT_CHUNK_SIZE, stream_kinematics
+
+# Statistics of each field in the summary of lean_kinematics
+STATISTICS = ("mean", "min", "max", "rms", "downstroke_mean", "upstroke_mean")
+
+
+class RunningStatistics:
+    """Mean, min, max, RMS and half-stroke means of a field, accumulated chunk by chunk.
+
+    Values are (n,) arrays, or (3,n) for vectors whose statistics are then per component.
+    The downstroke is where the stroke angle decreases (phi_dt < 0), the upstroke elsewhere.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.downstroke_count = 0
+        self._sum = self._sum_squares = self._downstroke_sum = 0.0
+        self._min = np.inf
+        self._max = -np.inf
+
+    def update(self, values: np.ndarray, downstroke: np.ndarray) -> None:
+        """Add the samples of a chunk, downstroke is the (n,) mask of the downstroke samples."""
+        self.count += values.shape[-1]
+        self.downstroke_count += np.count_nonzero(downstroke)
+
+        self._sum = self._sum + values.sum(axis=-1)
+        self._sum_squares = self._sum_squares + np.einsum("...i,...i->...", values, values)
+        self._downstroke_sum = self._downstroke_sum + values[..., downstroke].sum(axis=-1)
+        self._min = np.minimum(self._min, values.min(axis=-1))
+        self._max = np.maximum(self._max, values.max(axis=-1))
+
+    def result(self) -> dict[str, float | np.ndarray]:
+        """Statistics of the samples added so far, see STATISTICS (nan for an empty half stroke)."""
+        upstroke_count = self.count - self.downstroke_count
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return {
+                "mean": self._sum / self.count,
+                "min": self._min,
+                "max": self._max,
+                "rms": np.sqrt(self._sum_squares / self.count),
+                "downstroke_mean": self._downstroke_sum / self.downstroke_count,
+                "upstroke_mean": (self._sum - self._downstroke_sum) / upstroke_count,
+            }
+
+
+def _model_angles(number_time_steps: int, analytic_derivatives: bool, parameters: dict):
+    """Angles of bumblebee_kinematics_model for the samples first to last, in degrees."""
+    dt = 1.0 / number_time_steps
+    shift = int(np.round(parameters["dTau"] / dt))
+    feathering = (parameters["alpha_down"], parameters["alpha_up"], parameters["tau"])
+
+    def angles(first: int, last: int) -> dict[str, np.ndarray]:
+        indices = np.arange(first, last)
+        time = dt * indices
+        # alpha is shifted by whole samples, like np.roll in the model
+        alpha_time = dt * ((indices - shift) % number_time_steps)
+
+        chunk = {
+            "phi": stroke_angle(time, parameters["PHI"], parameters["phi_m"]),
+            "alpha": feathering_angle(alpha_time, *feathering),
+            "theta": np.full(time.shape, float(parameters["theta"])),
+        }
+
+        if analytic_derivatives:
+            chunk["phi_dt"] = stroke_angle(time, parameters["PHI"], parameters["phi_m"], 1)
+            chunk["alpha_dt"] = feathering_angle(alpha_time, *feathering, 1)
+            chunk["theta_dt"] = np.zeros(time.shape)
+
+        return chunk
+
+    return angles
+
+
+def lean_kinematics(
+    number_time_steps: int,
+    fields: tuple = ("force_QSM",),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    analytic_derivatives: bool = True,
+    attitude: dict = None,
+    aerodynamic_constants: dict = None,
+    force_constants: dict = None,
+    **model_parameters,
+) -> dict:
+    """Statistics of the kinematics pipeline fields over one wingbeat, without keeping the time series.
+
+    The angles of the model are evaluated chunk by chunk and streamed through the pipeline stages
+    (see stream_kinematics), which only run the stages the fields need and drop every intermediate
+    field once no later stage reads it. The statistics are accumulated on the fly, so the memory
+    depends on chunk_size and not on number_time_steps. The results are the ones of solve_kinematics.
+
+    Args:
+        number_time_steps (int): Number of time steps N.
+        fields (tuple, optional): Fields to summarize, keys of SWEEP_FIELDS. Defaults to ("force_QSM",).
+        chunk_size (int, optional): Samples per chunk. Defaults to DEFAULT_CHUNK_SIZE.
+        analytic_derivatives (bool, optional): Use the exact angles time derivatives of the model
+            instead of finite differences. Defaults to True.
+        attitude (dict, optional): Constant stroke plane and body angles eta, psi, beta, gamma in degrees.
+        aerodynamic_constants (dict, optional): Overrides of AERODYNAMIC_CONSTANTS.
+        force_constants (dict, optional): Overrides of FORCE_CONSTANTS.
+        **model_parameters: Scalar parameters of bumblebee_kinematics_model.
+
+    Raises:
+        ValueError: If a field or a model parameter is unknown.
+
+    Returns:
+        dict: number_time_steps, and field -> statistic -> value (see STATISTICS), a float or, for
+            vectors, a (3,) array of the GLOBAL components. Angles are in degrees.
+    """
+    if not isinstance(number_time_steps, int):
+        raise TypeError("number_time_steps must be an integer")
+
+    unknown = set(model_parameters) - set(MODEL_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown parameters {sorted(unknown)}. Expected {tuple(MODEL_PARAMETERS)}.")
+
+    parameters = {**MODEL_PARAMETERS, **model_parameters}
+    statistics = {name: RunningStatistics() for name in fields}
+
+    time = np.linspace(0.0, 1.0, endpoint=False, num=number_time_steps)
+
+    for start, stop, results in stream_kinematics(
+        time,
+        _model_angles(number_time_steps, analytic_derivatives, parameters),
+        fields,
+        chunk_size,
+        attitude,
+        aerodynamic_constants,
+        force_constants,
+    ):
+        phi_dt = stroke_angle(time[start:stop], parameters["PHI"], parameters["phi_m"], 1)
+        downstroke = phi_dt < 0
+
+        for name, values in results.items():
+            statistics[name].update(values, downstroke)
+
+    return {
+        "number_time_steps": number_time_steps,
+        **{name: statistics[name].result() for name in fields},
+    }
@@ -1,20 +1,11 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from data import KinematicsSolutionHolder
-from initialize_transformations import initialize_transformations
+from contextlib import nullcontext
+from pathlib import Path
+from core import profiling
 from plot_kinematics import plot_kinematics
-from kinematics_evaluations import (
-    evaluate_angles_kinematics,
-    define_unit_vectors,
-    evaluate_angular_velocity,
-    evaluate_tip_velocity,
-    compute_angle_of_attack,
-    compute_aerodynamic_coefficients,
-    define_aero_unit_vectors,
-    define_planar_angular_velocity,
-    compute_accelerations,
-    compute_forces
-)
+from pipeline import LazyKinematicsSolution
+from result_cache import ResultCache
 
 
 def main() -> None:
@@ -22,31 +13,21 @@ def main() -> None:
     NUMBER_TIME_STEPS = 400
     SHOW_FIGURES = False
     SAVE_FIGURES = True
+    CACHE_DIRECTORY = Path(__file__).parent.parent / "cache"
+    PROFILE = False  # write per-stage timings and memory to profile.json, .csv and .folded
+    PROFILE_PATH = Path(__file__).parent.parent / "profile"
 
-    Kinematics = KinematicsSolutionHolder()
+    # the fields are computed by the pipeline stages when the plots read them,
+    # or loaded from the cache when an earlier run already computed them
+    Kinematics = LazyKinematicsSolution(NUMBER_TIME_STEPS, cache=ResultCache(CACHE_DIRECTORY))
 
-    Kinematics = evaluate_angles_kinematics(NUMBER_TIME_STEPS, Kinematics)
-    initialize_transformations(Kinematics)
+    with profiling() if PROFILE else nullcontext() as profiler:
+        plot_kinematics(Kinematics, SAVE_FIGURES, SHOW_FIGURES)
 
-    Kinematics = define_unit_vectors(Kinematics)
-
-    Kinematics = evaluate_angular_velocity(Kinematics)
-
-    Kinematics = evaluate_tip_velocity(Kinematics)
-
-    Kinematics = compute_angle_of_attack(Kinematics)
-
-    Kinematics = compute_aerodynamic_coefficients(Kinematics)
-
-    Kinematics = define_aero_unit_vectors(Kinematics)
-
-    Kinematics = define_planar_angular_velocity(Kinematics)
-
-    Kinematics = compute_accelerations(Kinematics)
-
-    Kinematics = compute_forces(Kinematics)
-    
-    plot_kinematics(Kinematics, SAVE_FIGURES, SHOW_FIGURES)
+    if PROFILE:
+        profiler.to_json(PROFILE_PATH.with_suffix(".json"))
+        profiler.to_csv(PROFILE_PATH.with_suffix(".csv"))
+        PROFILE_PATH.with_suffix(".folded").write_text(profiler.folded())
 
 
 if __name__ == "__main__":
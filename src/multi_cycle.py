@@ -0,0 +1,141 @@
+from functools import lru_cache
+import numpy as np
+from core import DEFAULT_PERIODIC_ORDER
+from parameter_sweep import SWEEP_FIELDS, normalize_parameters, evaluate_sweep_chunk
+
+# Number of single-cycle solutions kept in memory
+CYCLE_CACHE_SIZE = 32
+
+
+def _frozen(constants: dict = None) -> tuple:
+    """Hashable form of a dict of constants, for the cache key."""
+    return tuple(sorted((constants or {}).items()))
+
+
+@lru_cache(maxsize=CYCLE_CACHE_SIZE)
+def _cycle_solution(
+    number_time_steps: int,
+    parameters: tuple,
+    fields: tuple,
+    derivative_method: str,
+    order: int,
+    aerodynamic_constants: tuple,
+    force_constants: tuple,
+) -> dict[str, np.ndarray]:
+    """Fields of one cycle for one parameter set, computed once and kept read-only."""
+    time = np.linspace(0.0, 1.0, endpoint=False, num=number_time_steps)
+
+    results = evaluate_sweep_chunk(
+        time,
+        {name: np.array([value]) for name, value in parameters},
+        fields,
+        None,
+        derivative_method,
+        order,
+        dict(aerodynamic_constants),
+        dict(force_constants),
+    )
+
+    solution = {}
+    for name, values in results.items():
+        values = values[0]  # single parameter set
+        values.flags.writeable = False  # shared by every caller
+        solution[name] = values
+
+    return solution
+
+
+def evaluate_cycle(
+    number_time_steps: int,
+    fields: tuple = tuple(SWEEP_FIELDS),
+    derivative_method: str = "periodic",
+    order: int = DEFAULT_PERIODIC_ORDER,
+    aerodynamic_constants: dict = None,
+    force_constants: dict = None,
+    **parameters,
+) -> dict[str, np.ndarray]:
+    """Fields of a single wingbeat, evaluated once per parameter set and then served from a cache.
+
+    Args:
+        number_time_steps (int): Number of time steps N of the cycle.
+        fields (tuple, optional): Fields to return, keys of SWEEP_FIELDS. Defaults to all.
+        derivative_method (str, optional): Method of the velocities time derivatives. Defaults to
+            "periodic", so the accelerations are continuous from one cycle to the next.
+        order (int, optional): Order of the "periodic" scheme. Defaults to DEFAULT_PERIODIC_ORDER.
+        aerodynamic_constants (dict, optional): Overrides of AERODYNAMIC_CONSTANTS.
+        force_constants (dict, optional): Overrides of FORCE_CONSTANTS.
+        **parameters: Scalar parameters of bumblebee_kinematics_model, see SWEEP_PARAMETERS.
+
+    Raises:
+        ValueError: If a field or a parameter is unknown, or if a parameter is not a scalar.
+
+    Returns:
+        dict[str, np.ndarray]: New dict of field -> read-only array of shape (N,), or (3, N) for
+            vectors. The arrays are shared with the cache, the dict is the caller's own.
+    """
+    if not isinstance(number_time_steps, int):
+        raise TypeError("number_time_steps must be an integer")
+
+    unknown = set(fields) - set(SWEEP_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields {sorted(unknown)}. Expected {tuple(SWEEP_FIELDS)}.")
+
+    parameters = normalize_parameters(parameters)
+    if parameters["PHI"].size != 1:
+        raise ValueError("The parameters of a cycle must be scalars.")
+
+    solution = _cycle_solution(
+        number_time_steps,
+        tuple((name, float(values[0])) for name, values in parameters.items()),
+        tuple(fields),
+        derivative_method,
+        order,
+        _frozen(aerodynamic_constants),
+        _frozen(force_constants),
+    )
+
+    # a copy, so that a caller changing its dict does not change the cached one
+    return dict(solution)
+
+
+def evaluate_cycles(number_cycles: int, number_time_steps: int, **options) -> dict[str, np.ndarray]:
+    """Fields of number_cycles identical wingbeats, without computing or copying more than one.
+
+    The cycle is evaluated (or taken from the cache) with evaluate_cycle and repeated along a
+    new axis with a zero stride, so 1000 wingbeats cost about the same as one.
+
+    Args:
+        number_cycles (int): Number of wingbeats C.
+        number_time_steps (int): Number of time steps N of each cycle.
+        **options: fields, derivative_method, order, constants and parameters, see evaluate_cycle.
+
+    Returns:
+        dict[str, np.ndarray]: Field -> read-only view of shape (C, N), or (3, C, N) for vectors.
+    """
+    if number_cycles < 1:
+        raise ValueError("number_cycles must be positive.")
+
+    cycles = {}
+    for name, values in evaluate_cycle(number_time_steps, **options).items():
+        shape = values.shape[:-1] + (number_cycles, number_time_steps)
+        cycles[name] = np.broadcast_to(values[..., np.newaxis, :], shape)
+
+    return cycles
+
+
+def take_cycles(values: np.ndarray, sample_indices: np.ndarray) -> np.ndarray:
+    """Values of a single cycle at samples of a multi-cycle record, by modular indexing.
+
+    Args:
+        values (np.ndarray): Single cycle of shape (N,) or (3, N), see evaluate_cycle.
+        sample_indices (np.ndarray): Indices in the record, any integer (sample i is sample i mod N of the cycle).
+
+    Returns:
+        np.ndarray: Values at the samples, of shape (len(sample_indices),) or (3, len(sample_indices)).
+    """
+    return np.take(values, np.asarray(sample_indices) % values.shape[-1], axis=-1)
+
+
+def clear_cycle_cache() -> None:
+    """Drop the cached single-cycle solutions."""
+    _cycle_solution.cache_clear()
@@ -0,0 +1,332 @@
+from dataclasses import replace
+from functools import partial
+from inspect import signature
+from itertools import product
+from bumblebee_kinematic_model import bumblebee_kinematics_model, feathering_angle, stroke_angle
+from data import KinematicsSolutionHolder
+from core import Angle, CachedVector3D, Referential, TransformationContext, time_derivative, DEFAULT_PERIODIC_ORDER
+from pipeline import run_stages, stages_for
+from result_cache import ResultCache, cache_key
+import numpy as np
+
+# Parameters of bumblebee_kinematics_model that can be swept, with their default values
+SWEEP_PARAMETERS = {
+    name: parameter.default
+    for name, parameter in signature(bumblebee_kinematics_model).parameters.items()
+    if name in ("PHI", "phi_m", "dTau", "alpha_down", "alpha_up", "tau", "theta")
+}
+
+# Fields a sweep can return and their kind. Angles are returned in degrees,
+# vectors in the GLOBAL referential with shape (P, 3, N).
+SWEEP_FIELDS = {
+    "angle_of_attack": "angle",
+    "lift_coeff": "scalar",
+    "drag_coeff": "scalar",
+    "force_TC": "vector",
+    "force_TD": "vector",
+    "force_RC": "vector",
+    "force_RD": "vector",
+    "force_AMx": "vector",
+    "force_AMz": "vector",
+    "force_QSM": "vector",
+}
+
+# Number of samples (parameter sets x time steps) evaluated at once by default
+MAX_CHUNK_SAMPLES = 2**20
+
+
+def parameter_grid(**values) -> dict[str, np.ndarray]:
+    """Cartesian product of parameter values, as flat arrays ready for sweep_kinematics.
+
+    Args:
+        **values: Parameter name -> scalar or sequence of values.
+
+    Returns:
+        dict[str, np.ndarray]: Parameter name -> array of shape (P,), P the product of the lengths.
+    """
+    names = list(values)
+    combinations = list(product(*(np.atleast_1d(values[name]) for name in names)))
+
+    return {name: np.array([c[i] for c in combinations], dtype=float) for i, name in enumerate(names)}
+
+
+def normalize_parameters(parameters: dict) -> dict[str, np.ndarray]:
+    """Complete the swept parameters with the model defaults and broadcast them to shape (P,).
+
+    Raises:
+        ValueError: If a parameter is unknown or if the parameter arrays have different lengths.
+    """
+    unknown = set(parameters) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown parameters {sorted(unknown)}. Expected {tuple(SWEEP_PARAMETERS)}.")
+
+    arrays = {name: np.atleast_1d(np.asarray(value, dtype=float)) for name, value in parameters.items()}
+
+    lengths = {array.size for array in arrays.values()}
+    max_len = max(lengths, default=1)
+
+    if not lengths <= {1, max_len}:
+        raise ValueError("Parameter arrays must either be of length 1 or same length")
+
+    return {
+        name: np.broadcast_to(arrays.get(name, default), (max_len,)).astype(float)
+        for name, default in SWEEP_PARAMETERS.items()
+    }
+
+
+def _angles_kinematics(Holder: KinematicsSolutionHolder, time: np.ndarray, parameters: dict):
+    """Vectorized bumblebee_kinematics_model for p parameter sets, flattened to p*N samples."""
+    p = parameters["PHI"].size
+    N = time.size
+    column = {name: values[:, np.newaxis] for name, values in parameters.items()}
+
+    # same circular shift of alpha as bumblebee_kinematics_model, one per parameter set
+    dt = time[1] - time[0]
+    shift = np.round(parameters["dTau"] / dt).astype(int)
+    rolled = (np.arange(N) - shift[:, np.newaxis]) % N
+
+    def alpha(order: int) -> Angle:
+        values = feathering_angle(time, column["alpha_down"], column["alpha_up"], column["tau"], order)
+        return Angle(np.take_along_axis(values, rolled, axis=1), "deg")
+
+    def phi(order: int) -> Angle:
+        return Angle(np.broadcast_to(stroke_angle(time, column["PHI"], column["phi_m"], order), (p, N)), "deg")
+
+    Holder.time = np.tile(time, p)
+    Holder.alpha, Holder.alpha_dt = alpha(0), alpha(1)
+    Holder.phi, Holder.phi_dt = phi(0), phi(1)
+    Holder.theta = Angle(np.broadcast_to(column["theta"], (p, N)), "deg")
+    Holder.theta_dt = Angle(np.zeros(p * N), "deg")
+
+
+def _accelerations(Holder: KinematicsSolutionHolder, derivative_method: str, order: int, shape: tuple):
+    """compute_accelerations with the time derivatives taken per parameter set."""
+    dt = Holder.time[1] - Holder.time[0]
+
+    for name in ("u_tip", "omega"):
+        coords = getattr(Holder, name).set_referential(Referential.GLOBAL).coords
+        derivative = time_derivative(coords.reshape(3, *shape), dt, derivative_method, order, axis=-1)
+        setattr(Holder, name + "_dt", CachedVector3D(derivative.reshape(3, -1), Referential.GLOBAL, Holder.context))
+
+
+def evaluate_sweep_chunk(
+    time: np.ndarray,
+    parameters: dict,
+    fields: tuple = tuple(SWEEP_FIELDS),
+    reduce: str = None,
+    derivative_method: str = "central",
+    order: int = DEFAULT_PERIODIC_ORDER,
+    aerodynamic_constants: dict = None,
+    force_constants: dict = None,
+    cache: ResultCache = None,
+) -> dict[str, np.ndarray]:
+    """Evaluate the kinematics pipeline for p parameter sets in one vectorized pass.
+
+    The p x N samples are flattened and go through the pipeline stages needed for fields (see
+    stages_for), only the angles are evaluated for every parameter set at once and the time
+    derivatives are taken per parameter set. The chunk uses a transformation context of its
+    own, the default one is left untouched.
+
+    With a cache, each parameter set is stored under a key of its own parameters and of the
+    options, and the parameter sets found in the cache are loaded instead of evaluated.
+
+    Args:
+        time (np.ndarray): Time vector of shape (N,)
+        parameters (dict): Complete parameter arrays of shape (p,), see normalize_parameters.
+        fields (tuple, optional): Fields to return, keys of SWEEP_FIELDS.
+        reduce (str, optional): None for time series, "mean" for cycle means.
+        derivative_method (str, optional): Method of the velocities time derivatives.
+        order (int, optional): Order of the "periodic" scheme. Defaults to DEFAULT_PERIODIC_ORDER.
+        aerodynamic_constants (dict, optional): Overrides of AERODYNAMIC_CONSTANTS.
+        force_constants (dict, optional): Overrides of FORCE_CONSTANTS.
+        cache (ResultCache, optional): Cache of the parameter sets results. Defaults to no cache.
+
+    Returns:
+        dict[str, np.ndarray]: Field -> (p, N) or (p, 3, N), or (p,) or (p, 3) if reduced.
+    """
+    options = {
+        "derivative_method": derivative_method,
+        "order": order,
+        "aerodynamic_constants": aerodynamic_constants,
+        "force_constants": force_constants,
+    }
+
+    if cache is not None:
+        return _evaluate_cached(time, parameters, tuple(fields), reduce, options, cache)
+
+    shape = (parameters["PHI"].size, time.size)
+
+    stages = []
+    for stage in stages_for(fields):
+        if stage.name == "angles":
+            stage = replace(stage, function=partial(_angles_kinematics, time=time, parameters=parameters), parameters=())
+        elif stage.name == "accelerations":
+            stage = replace(stage, function=partial(_accelerations, shape=shape))
+        stages.append(stage)
+
+    Holder = run_stages(
+        KinematicsSolutionHolder(TransformationContext()),
+        tuple(stages),
+        derivative_method=derivative_method,
+        order=order,
+        aerodynamic_constants=aerodynamic_constants,
+        force_constants=force_constants,
+    )
+
+    results = {}
+    for name in fields:
+        kind = SWEEP_FIELDS[name]
+        value = getattr(Holder, name)
+
+        if kind == "angle":
+            values = value.degrees.reshape(shape)
+        elif kind == "vector":
+            values = value.set_referential(Referential.GLOBAL).coords.reshape(3, *shape).transpose(1, 0, 2)
+        else:
+            values = np.asarray(value).reshape(shape)
+
+        results[name] = values.mean(axis=-1) if reduce == "mean" else values
+
+    return results
+
+
+def _evaluate_cached(
+    time: np.ndarray, parameters: dict, fields: tuple, reduce: str, options: dict, cache: ResultCache
+) -> dict[str, np.ndarray]:
+    """evaluate_sweep_chunk loading the parameter sets already in cache, the others are evaluated
+    together and stored, one entry per parameter set."""
+    p = parameters["PHI"].size
+    keys = [
+        cache_key(
+            "sweep",
+            time,
+            {name: float(values[index]) for name, values in parameters.items()},
+            fields,
+            reduce,
+            options,
+        )
+        for index in range(p)
+    ]
+
+    results = allocate_sweep_outputs(p, time.size, fields, reduce)
+    missing = []
+
+    for index, key in enumerate(keys):
+        stored = cache.get(key)
+        if stored is None:
+            missing.append(index)
+            continue
+
+        for name in fields:
+            results[name][index] = stored[name]
+
+    if missing:
+        evaluated = evaluate_sweep_chunk(
+            time, {name: values[missing] for name, values in parameters.items()}, fields, reduce, **options
+        )
+
+        for position, index in enumerate(missing):
+            cache.put(keys[index], {name: values[position] for name, values in evaluated.items()}, evict=False)
+        cache.evict()
+
+        for name, values in evaluated.items():
+            results[name][missing] = values
+
+    return results
+
+
+def allocate_sweep_outputs(
+    number_parameter_sets: int, number_time_steps: int, fields: tuple, reduce: str = None
+) -> dict[str, np.ndarray]:
+    """Allocate the output arrays of a sweep.
+
+    Returns:
+        dict[str, np.ndarray]: Field -> empty array of shape (P, [3,] N) or (P, [3]) if reduced.
+    """
+    return {name: np.empty(sweep_field_shape(name, number_parameter_sets, number_time_steps, reduce)) for name in fields}
+
+
+def sweep_field_shape(name: str, number_parameter_sets: int, number_time_steps: int, reduce: str = None) -> tuple:
+    """Shape of a sweep output field."""
+    shape = (number_parameter_sets,)
+
+    if SWEEP_FIELDS[name] == "vector":
+        shape += (3,)
+
+    if reduce is None:
+        shape += (number_time_steps,)
+
+    return shape
+
+
+def sweep_kinematics(
+    number_time_steps: int,
+    parameters: dict,
+    fields: tuple = tuple(SWEEP_FIELDS),
+    reduce: str = None,
+    chunk_size: int = None,
+    derivative_method: str = "central",
+    order: int = DEFAULT_PERIODIC_ORDER,
+    aerodynamic_constants: dict = None,
+    force_constants: dict = None,
+    out: dict = None,
+    cache: ResultCache = None,
+) -> dict[str, np.ndarray]:
+    """Evaluate the kinematics, aerodynamic coefficients and forces for P parameter sets.
+
+    The parameter sets are processed chunk_size at a time, each chunk in one vectorized pass,
+    so the memory stays bounded by chunk_size x number_time_steps samples.
+
+    Args:
+        number_time_steps (int): Number of time steps N of the cycle.
+        parameters (dict): Parameter name -> scalar or array of shape (P,). Missing parameters
+            take the defaults of bumblebee_kinematics_model, see parameter_grid for products.
+        fields (tuple, optional): Fields to return, keys of SWEEP_FIELDS. Defaults to all.
+        reduce (str, optional): None for time series, "mean" for cycle means. Defaults to None.
+        chunk_size (int, optional): Parameter sets per chunk. Defaults to MAX_CHUNK_SAMPLES // N.
+        derivative_method (str, optional): Method of the velocities time derivatives.
+        order (int, optional): Order of the "periodic" scheme. Defaults to DEFAULT_PERIODIC_ORDER.
+        aerodynamic_constants (dict, optional): Overrides of AERODYNAMIC_CONSTANTS.
+        force_constants (dict, optional): Overrides of FORCE_CONSTANTS.
+        out (dict, optional): Preallocated outputs, see allocate_sweep_outputs.
+        cache (ResultCache, optional): Cache of the parameter sets results, a parameter set
+            already evaluated with the same options is loaded instead. Defaults to no cache.
+
+    Raises:
+        ValueError: If a field or reduction is unknown.
+
+    Returns:
+        dict[str, np.ndarray]: Field -> array of shape (P, [3,] N), or (P, [3]) if reduced.
+    """
+    if not isinstance(number_time_steps, int):
+        raise TypeError("number_time_steps must be an integer")
+
+    unknown = set(fields) - set(SWEEP_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields {sorted(unknown)}. Expected {tuple(SWEEP_FIELDS)}.")
+
+    if reduce not in (None, "mean"):
+        raise ValueError("reduce must be None or 'mean'.")
+
+    parameters = normalize_parameters(parameters)
+    P = parameters["PHI"].size
+
+    if chunk_size is None:
+        chunk_size = max(1, MAX_CHUNK_SAMPLES // number_time_steps)
+
+    if out is None:
+        out = allocate_sweep_outputs(P, number_time_steps, fields, reduce)
+
+    time = np.linspace(0.0, 1.0, endpoint=False, num=number_time_steps)
+
+    for start in range(0, P, chunk_size):
+        stop = min(start + chunk_size, P)
+        chunk = {name: values[start:stop] for name, values in parameters.items()}
+
+        results = evaluate_sweep_chunk(
+            time, chunk, fields, reduce, derivative_method, order, aerodynamic_constants, force_constants, cache
+        )
+        for name, values in results.items():
+            out[name][start:stop] = values
+
+    return out
@@ -0,0 +1,381 @@
+from dataclasses import dataclass
+from inspect import signature
+from typing import Callable
+from data import KinematicsSolutionHolder
+from core import TransformationContext, DEFAULT_PERIODIC_ORDER
+from bumblebee_kinematic_model import bumblebee_kinematics_model
+from initialize_transformations import initialize_transformations, ATTITUDE_ANGLES
+from result_cache import ResultCache, cache_key
+from kinematics_evaluations import (
+    evaluate_angles_kinematics,
+    define_unit_vectors,
+    evaluate_angular_velocity,
+    evaluate_tip_velocity,
+    compute_angle_of_attack,
+    compute_aerodynamic_coefficients,
+    define_aero_unit_vectors,
+    define_planar_angular_velocity,
+    compute_accelerations,
+    compute_forces,
+)
+
+# Parameters of the kinematics model and their default values
+MODEL_PARAMETERS = {
+    name: parameter.default
+    for name, parameter in signature(bumblebee_kinematics_model).parameters.items()
+    if name not in ("number_time_steps", "derivatives")
+}
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One stage of the pipeline: function(Holder, **parameters) reads the inputs fields of the
+    holder and sets its outputs fields. "transformations" stands for the initialized context.
+    Stages that are not cacheable are always run, their outputs cannot be stored."""
+
+    name: str
+    function: Callable
+    inputs: tuple[str, ...]
+    outputs: tuple[str, ...]
+    parameters: tuple[str, ...] = ()
+    cacheable: bool = True
+
+
+def _angles(Holder, number_time_steps, analytic_derivatives, **model_parameters):
+    evaluate_angles_kinematics(number_time_steps, Holder, analytic_derivatives, **model_parameters)
+
+
+def _transformations(Holder, attitude):
+    initialize_transformations(Holder, **(attitude or {}))
+
+
+def _accelerations(Holder, derivative_method, order):
+    compute_accelerations(Holder, derivative_method, order)
+
+
+# Stages of the kinematics pipeline, in an order where each one comes after its inputs
+PIPELINE_STAGES = (
+    Stage(
+        "angles",
+        _angles,
+        (),
+        ("time", "phi", "alpha", "theta", "phi_dt", "alpha_dt", "theta_dt", "phi_ddt", "alpha_ddt", "theta_ddt"),
+        ("number_time_steps", "analytic_derivatives", *MODEL_PARAMETERS),
+    ),
+    Stage(
+        "transformations",
+        _transformations,
+        ("phi", "alpha", "theta"),
+        (*ATTITUDE_ANGLES, "transformations"),
+        ("attitude",),
+        cacheable=False,  # the context, cheap to initialize from the angles
+    ),
+    Stage("unit_vectors", lambda Holder: define_unit_vectors(Holder), ("transformations",), ("ex", "ey", "ez")),
+    Stage(
+        "angular_velocity",
+        lambda Holder: evaluate_angular_velocity(Holder),
+        ("time", "phi", "theta", "phi_dt", "alpha_dt", "theta_dt", *ATTITUDE_ANGLES, "transformations"),
+        ("omega",),
+    ),
+    Stage("tip_velocity", lambda Holder: evaluate_tip_velocity(Holder), ("omega", "ey"), ("u_tip",)),
+    Stage("angle_of_attack", lambda Holder: compute_angle_of_attack(Holder), ("omega",), ("angle_of_attack",)),
+    Stage(
+        "aerodynamic_coefficients",
+        lambda Holder, aerodynamic_constants: compute_aerodynamic_coefficients(Holder, aerodynamic_constants),
+        ("angle_of_attack",),
+        ("lift_coeff", "drag_coeff"),
+        ("aerodynamic_constants",),
+    ),
+    Stage(
+        "aero_unit_vectors",
+        lambda Holder: define_aero_unit_vectors(Holder),
+        ("u_tip", "ey", "alpha"),
+        ("e_drag", "e_lift"),
+    ),
+    Stage(
+        "planar_angular_velocity",
+        lambda Holder: define_planar_angular_velocity(Holder),
+        ("omega",),
+        ("omega_planar",),
+    ),
+    Stage(
+        "accelerations",
+        _accelerations,
+        ("time", "u_tip", "omega"),
+        ("u_tip_dt", "omega_dt"),
+        ("derivative_method", "order"),
+    ),
+    Stage(
+        "forces",
+        lambda Holder, force_constants: compute_forces(Holder, force_constants),
+        (
+            "omega_planar", "e_lift", "e_drag", "ex", "ez", "u_tip", "omega",
+            "u_tip_dt", "omega_dt", "lift_coeff", "drag_coeff",
+        ),
+        ("force_TD", "force_TC", "force_RC", "force_RD", "force_AMx", "force_AMz", "force_QSM"),
+        ("force_constants",),
+    ),
+)
+
+def stages_for(fields, stages: tuple[Stage, ...] = PIPELINE_STAGES) -> tuple[Stage, ...]:
+    """Stages needed to compute fields, directly or as inputs of other stages, in pipeline order.
+
+    Raises:
+        ValueError: If no stage produces one of the fields.
+    """
+    producers = {field: stage for stage in stages for field in stage.outputs}
+
+    unknown = set(fields) - set(producers)
+    if unknown:
+        raise ValueError(f"No stage produces {sorted(unknown)}.")
+
+    needed, pending = set(), list(fields)
+    while pending:
+        stage = producers[pending.pop()]
+        if stage.name not in needed:
+            needed.add(stage.name)
+            pending.extend(stage.inputs)
+
+    return tuple(stage for stage in stages if stage.name in needed)
+
+
+# Parameters of the pipeline stages and their default values
+PIPELINE_PARAMETERS = {
+    "number_time_steps": None,
+    "analytic_derivatives": True,
+    **MODEL_PARAMETERS,
+    "attitude": None,
+    "aerodynamic_constants": None,
+    "derivative_method": "central",
+    "order": DEFAULT_PERIODIC_ORDER,
+    "force_constants": None,
+}
+
+
+def run_stages(
+    Holder: KinematicsSolutionHolder, stages: tuple[Stage, ...] = PIPELINE_STAGES, **parameters
+) -> KinematicsSolutionHolder:
+    """Run stages one after the other on a holder, each with its own parameters.
+
+    Args:
+        Holder (KinematicsSolutionHolder): Holder for the kinematic solution
+        stages (tuple[Stage, ...], optional): Stages to run, in pipeline order. Defaults to PIPELINE_STAGES.
+        **parameters: Parameters of the stages, see PIPELINE_PARAMETERS for the defaults.
+
+    Raises:
+        ValueError: If a parameter is unknown.
+
+    Returns:
+        KinematicsSolutionHolder: Holder for the kinematic solution
+    """
+    unknown = set(parameters) - set(PIPELINE_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown parameters {sorted(unknown)}. Expected {tuple(PIPELINE_PARAMETERS)}.")
+
+    parameters = {**PIPELINE_PARAMETERS, **parameters}
+    for stage in stages:
+        stage.function(Holder, **{name: parameters[name] for name in stage.parameters})
+
+    return Holder
+
+
+class LazyKinematicsSolution:
+    """Kinematic solution whose fields are computed on first access.
+
+    The stages are a dependency graph over the fields of KinematicsSolutionHolder: reading a
+    field runs the stage that produces it, after its upstream stages, and nothing else. Plotting
+    the angles does not compute the forces. Changing a parameter only invalidates the stages
+    using it and their downstream stages, so new force constants do not recompute the kinematics.
+
+    It reads like a KinematicsSolutionHolder, so it can be given to the plotting functions.
+
+    With a ResultCache, the outputs of each stage are stored under a key hashing its parameters,
+    the keys of the stages it depends on and the code version. A stage found in the cache is
+    loaded instead of run, along with none of its upstream stages but the ones not cacheable.
+    """
+
+    def __init__(
+        self,
+        number_time_steps: int,
+        context: TransformationContext = None,
+        stages: tuple[Stage, ...] = PIPELINE_STAGES,
+        cache: ResultCache = None,
+        **parameters,
+    ):
+        """
+        Args:
+            number_time_steps (int): Number of time steps
+            context (TransformationContext, optional): Transformations of the solution.
+                Defaults to the shared default context.
+            stages (tuple[Stage, ...], optional): Stages of the pipeline. Defaults to PIPELINE_STAGES.
+            cache (ResultCache, optional): Cache of the stages outputs. Defaults to no cache.
+            **parameters: Parameters of the stages, see PIPELINE_PARAMETERS.
+
+        Raises:
+            ValueError: If a parameter is unknown or if two stages produce the same field.
+        """
+        self._holder = KinematicsSolutionHolder(context)
+        self._stages = {stage.name: stage for stage in stages}
+        self._computed = set()
+        self._cache = cache
+        self._keys = {}  # cache keys of the stages, until the next parameters change
+
+        self._producers = {}
+        for stage in stages:
+            for field in stage.outputs:
+                if field in self._producers:
+                    raise ValueError(f"Field '{field}' is produced by two stages.")
+                self._producers[field] = stage.name
+
+        self._parameters = {name: PIPELINE_PARAMETERS.get(name) for stage in stages for name in stage.parameters}
+        self.set_parameters(number_time_steps=number_time_steps, **parameters)
+
+    @property
+    def holder(self) -> KinematicsSolutionHolder:
+        """Holder of the fields computed so far."""
+        return self._holder
+
+    @property
+    def context(self) -> TransformationContext:
+        """Transformations of the solution."""
+        return self._holder.context
+
+    @property
+    def computed_stages(self) -> frozenset[str]:
+        """Names of the stages whose outputs are up to date."""
+        return frozenset(self._computed)
+
+    @property
+    def cache(self) -> ResultCache | None:
+        """Cache of the stages outputs, if any."""
+        return self._cache
+
+    @property
+    def parameters(self) -> dict:
+        """Current values of the parameters of the stages."""
+        return dict(self._parameters)
+
+    def _downstream(self, names: set[str]) -> set[str]:
+        """Stages in names and every stage depending on them, directly or not."""
+        stages = set(names)
+        fields = {field for name in stages for field in self._stages[name].outputs}
+
+        changed = True
+        while changed:
+            changed = False
+            for stage in self._stages.values():
+                if stage.name not in stages and fields.intersection(stage.inputs):
+                    stages.add(stage.name)
+                    fields.update(stage.outputs)
+                    changed = True
+
+        return stages
+
+    def _upstream(self, name: str) -> set[str]:
+        """Stages name depends on, directly or not."""
+        stages = set()
+        pending = [name]
+
+        while pending:
+            for field in self._stages[pending.pop()].inputs:
+                producer = self._producers[field]
+                if producer not in stages:
+                    stages.add(producer)
+                    pending.append(producer)
+
+        return stages
+
+    def key(self, name: str) -> str:
+        """Cache key of a stage, from its parameters, the keys of the stages it reads and the
+        backend and layout of the context, which change the round-off of the results."""
+        if name not in self._keys:
+            stage = self._stages[name]
+            producers = sorted({self._producers[field] for field in stage.inputs})
+
+            self._keys[name] = cache_key(
+                stage.name,
+                {parameter: self._parameters[parameter] for parameter in stage.parameters},
+                [self.key(producer) for producer in producers],
+                (self.context.backend, self.context.layout),
+            )
+
+        return self._keys[name]
+
+    def invalidate(self, *names: str) -> None:
+        """Mark stages, and the stages downstream of them, as outdated and drop their outputs.
+
+        Raises:
+            ValueError: If a stage is unknown.
+        """
+        unknown = set(names) - set(self._stages)
+        if unknown:
+            raise ValueError(f"Unknown stages {sorted(unknown)}. Expected {tuple(self._stages)}.")
+
+        self._keys = {}
+
+        for name in self._downstream(set(names)) & self._computed:
+            self._computed.discard(name)
+            for field in self._stages[name].outputs:
+                vars(self._holder).pop(field, None)
+
+    def set_parameters(self, **parameters) -> None:
+        """Change parameters of the stages, only the stages using them are recomputed on next access.
+
+        Raises:
+            ValueError: If a parameter is unknown.
+        """
+        unknown = set(parameters) - set(self._parameters)
+        if unknown:
+            raise ValueError(f"Unknown parameters {sorted(unknown)}. Expected {tuple(self._parameters)}.")
+
+        self._parameters.update(parameters)
+        self.invalidate(
+            *(stage.name for stage in self._stages.values() if set(parameters).intersection(stage.parameters))
+        )
+
+    def compute(self, name: str) -> None:
+        """Run a stage, after the stages it depends on, unless it is up to date."""
+        if name in self._computed:
+            return
+
+        stage = self._stages[name]
+        cached = self._cache is not None and stage.cacheable
+
+        if cached:
+            fields = self._cache.get(self.key(name), self.context)
+
+            if fields is not None:
+                for upstream in self._upstream(name):
+                    if not self._stages[upstream].cacheable:
+                        self.compute(upstream)
+
+                vars(self._holder).update(fields)
+                self._computed.add(name)
+                return
+
+        for field in stage.inputs:
+            self.compute(self._producers[field])
+
+        stage.function(self._holder, **{parameter: self._parameters[parameter] for parameter in stage.parameters})
+        self._computed.add(name)
+
+        if cached:
+            produced = vars(self._holder)
+            self._cache.put(self.key(name), {field: produced[field] for field in stage.outputs if field in produced})
+
+    def solve(self) -> KinematicsSolutionHolder:
+        """Compute every stage and return the holder."""
+        for name in self._stages:
+            self.compute(name)
+
+        return self._holder
+
+    def __getattr__(self, name: str):
+        # only called for the attributes not found on the instance, i.e. the fields of the holder
+        if "_holder" not in self.__dict__:
+            raise AttributeError(name)
+
+        if name in self._producers:
+            self.compute(self._producers[name])
+
+        return getattr(self._holder, name)
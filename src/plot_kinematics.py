@@ -1,8 +1,10 @@
 from data import KinematicsSolutionHolder
 import matplotlib.pyplot as plt
 from core import Referential
+from core import profile
 from pathlib import Path
 
+@profile
 def plot_kinematics(Holder: KinematicsSolutionHolder, save_fig: bool, show_fig: bool) -> None:
    
     plot_angles(Holder)
@@ -0,0 +1,240 @@
+from functools import lru_cache
+from pathlib import Path
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zipfile
+import numpy as np
+from core import Angle, Vector3D, CachedVector3D, Referential, TransformationContext
+
+# Size of a cache directory above which the least recently used entries are evicted
+DEFAULT_MAX_BYTES = 2**30
+
+# Suffix of the cache entries, files being written end with TEMPORARY_SUFFIX until they are complete
+ENTRY_SUFFIX = ".npz"
+TEMPORARY_SUFFIX = ".tmp"
+
+# Age in seconds after which a temporary file is taken as left over by a writer that died before renaming it
+STALE_TEMPORARY_SECONDS = 3600
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """Hash of the sources of the package, a change of the code invalidates every entry."""
+    digest = hashlib.sha256()
+
+    for path in sorted(Path(__file__).parent.rglob("*.py")):
+        digest.update(path.relative_to(Path(__file__).parent).as_posix().encode())
+        digest.update(path.read_bytes())
+
+    return digest.hexdigest()
+
+
+def _update(digest, value) -> None:
+    """Feed a parameter value to a hash, arrays by content and containers recursively."""
+    if isinstance(value, Angle):
+        value = value.radians
+
+    if isinstance(value, np.ndarray):
+        digest.update(f"array{value.dtype.str}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        digest.update(b"dict")
+        for key in sorted(value):
+            _update(digest, key)
+            _update(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"sequence{len(value)}".encode())
+        for item in value:
+            _update(digest, item)
+    else:
+        digest.update(repr(value).encode())
+
+
+def cache_key(*values) -> str:
+    """Content address of a set of values (parameters, keys of upstream entries, ...).
+
+    Returns:
+        str: Hexadecimal sha256 digest, including the code version.
+    """
+    digest = hashlib.sha256(code_version().encode())
+    _update(digest, values)
+    return digest.hexdigest()
+
+
+def _encode(fields: dict) -> tuple[dict[str, np.ndarray], dict]:
+    """Arrays to store and the manifest needed to rebuild the fields."""
+    arrays, manifest = {}, {}
+
+    for name, value in fields.items():
+        if isinstance(value, CachedVector3D):
+            arrays[name], manifest[name] = value.coords, ["cached_vector", value.referential.name]
+        elif isinstance(value, Vector3D):
+            arrays[name], manifest[name] = value.coords, ["vector", value.referential.name]
+        elif isinstance(value, Angle):
+            arrays[name], manifest[name] = value._values, ["angle", value._unit]
+        else:
+            arrays[name], manifest[name] = np.asarray(value), ["array", None]
+
+    return arrays, manifest
+
+
+def _decode(arrays, manifest: dict, context: TransformationContext) -> dict:
+    """Fields rebuilt from the stored arrays, the vectors are attached to context."""
+    fields = {}
+
+    # the second item of an entry is the referential of a vector or the unit of an angle
+    for name, (kind, attribute) in manifest.items():
+        values = arrays[name]
+
+        if kind == "cached_vector":
+            fields[name] = CachedVector3D(values, Referential[attribute], context)
+        elif kind == "vector":
+            fields[name] = Vector3D(values, Referential[attribute], context)
+        elif kind == "angle":
+            fields[name] = Angle(values, attribute)
+        else:
+            fields[name] = values
+
+    return fields
+
+
+class ResultCache:
+    """Content-addressed cache of pipeline results in a directory, shared between processes.
+
+    Each entry is one .npz file named after its key (see cache_key) holding the arrays of the
+    fields and a manifest to rebuild them. Entries are written to a temporary file first and
+    renamed, which is atomic, so a reader never sees a partial entry and concurrent writers of
+    the same key simply replace each other's identical result. Reading an entry updates its
+    modification time, and the least recently used entries are removed when the directory
+    exceeds max_bytes. The temporary files of the writers count toward max_bytes, the ones
+    older than STALE_TEMPORARY_SECONDS are left over by a crashed writer and removed first.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be positive.")
+
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def directory(self) -> Path:
+        """Directory of the entries."""
+        return self._directory
+
+    @property
+    def max_bytes(self) -> int:
+        """Size of the directory above which entries are evicted."""
+        return self._max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self._directory / f"{key}{ENTRY_SUFFIX}"
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def get(self, key: str, context: TransformationContext = None) -> dict | None:
+        """Fields stored under key, None if there is no such entry.
+
+        Args:
+            key (str): Key of the entry, see cache_key.
+            context (TransformationContext, optional): Context of the loaded vectors.
+
+        Returns:
+            dict | None: Field name -> np.ndarray, Angle or Vector3D.
+        """
+        path = self._path(key)
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                manifest = json.loads(str(data["__manifest__"]))
+                arrays = {name: data[name] for name in manifest}
+            os.utime(path)  # most recently used
+        except (FileNotFoundError, KeyError, ValueError, zipfile.BadZipFile):
+            # missing, evicted meanwhile by another process, or unreadable: recomputed and rewritten
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return _decode(arrays, manifest, context)
+
+    def put(self, key: str, fields: dict, evict: bool = True) -> None:
+        """Store fields under key, then evict the least recently used entries if needed.
+
+        Args:
+            key (str): Key of the entry, see cache_key.
+            fields (dict): Field name -> np.ndarray, Angle or Vector3D.
+            evict (bool, optional): Evict right away, False to call evict() once after
+                storing many entries. Defaults to True.
+        """
+        arrays, manifest = _encode(fields)
+
+        descriptor, temporary = tempfile.mkstemp(dir=self._directory, prefix=key, suffix=TEMPORARY_SUFFIX)
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                np.savez(file, __manifest__=np.array(json.dumps(manifest)), **arrays)
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+
+        if evict:
+            self.evict()
+
+    def _remove_stale_temporaries(self) -> int:
+        """Remove the temporary files of the writers that died before renaming them.
+
+        Returns:
+            int: Size of the temporary files still being written.
+        """
+        size = 0
+        stale = time.time() - STALE_TEMPORARY_SECONDS
+
+        for path in self._directory.glob(f"*{TEMPORARY_SUFFIX}"):
+            try:
+                status = path.stat()
+            except FileNotFoundError:
+                continue
+
+            if status.st_mtime < stale:
+                path.unlink(missing_ok=True)
+            else:
+                size += status.st_size
+
+        return size
+
+    def evict(self) -> None:
+        """Remove the stale temporary files, then the least recently used entries until the
+        directory fits in max_bytes."""
+        size = self._remove_stale_temporaries()
+
+        entries = []
+        for path in self._directory.glob(f"*{ENTRY_SUFFIX}"):
+            try:
+                status = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((status.st_mtime, status.st_size, path))
+
+        size += sum(entry_size for _, entry_size, _ in entries)
+
+        for _, entry_size, path in sorted(entries):
+            if size <= self._max_bytes:
+                break
+
+            # another process may have removed it already
+            path.unlink(missing_ok=True)
+            size -= entry_size
+
+    def clear(self) -> None:
+        """Remove every entry and the stale temporary files."""
+        for path in self._directory.glob(f"*{ENTRY_SUFFIX}"):
+            path.unlink(missing_ok=True)
+
+        self._remove_stale_temporaries()
@@ -0,0 +1,216 @@
+from typing import Callable, Iterator
+from pathlib import Path
+import numpy as np
+from data import KinematicsSolutionHolder
+from core import Angle, Referential, TransformationContext, angle_time_derivative, DEFAULT_PERIODIC_ORDER
+from initialize_transformations import initialize_transformations
+from parameter_sweep import SWEEP_FIELDS
+from pipeline import stages_for
+
+# Samples added on each side of a chunk: the angles are differentiated once (angular velocity),
+# then the velocities once more (accelerations), each time with a centered stencil of half-width 1.
+HALO = 2
+
+DEFAULT_CHUNK_SIZE = 2**16
+
+# Angles of the wing, required, and their time derivatives, computed if not given
+WING_ANGLES = ("phi", "alpha", "theta")
+
+
+def _evaluate_chunk(
+    time: np.ndarray,
+    angles: dict,
+    attitude: dict,
+    fields: tuple,
+    aerodynamic_constants: dict,
+    force_constants: dict,
+) -> dict[str, np.ndarray]:
+    """Run the pipeline stages needed for fields on one chunk (halo included), with a context of
+    its own. The fields no later stage reads are dropped as soon as possible."""
+    Holder = KinematicsSolutionHolder(TransformationContext())
+    Holder.time = time
+    Holder.set_angles("deg", **angles)
+
+    for name in WING_ANGLES:
+        if name + "_dt" not in angles:
+            angle = getattr(Holder, name)
+            # a constant angle (length 1) has a zero derivative, kept of length 1
+            if len(angle) == 1 and time.size != 1:
+                derivative = Angle(np.zeros(1), angle._unit)
+            else:
+                derivative = angle_time_derivative(time, angle)
+            setattr(Holder, name + "_dt", derivative)
+
+    initialize_transformations(Holder, "deg", **attitude)
+
+    parameters = {
+        "aerodynamic_constants": aerodynamic_constants,
+        "force_constants": force_constants,
+        "derivative_method": "central",
+        "order": DEFAULT_PERIODIC_ORDER,
+    }
+
+    # the angles and the transformations are set up above
+    stages = [stage for stage in stages_for(fields) if stage.name not in ("angles", "transformations")]
+
+    for index, stage in enumerate(stages):
+        stage.function(Holder, **{name: parameters[name] for name in stage.parameters})
+
+        needed = set(fields).union(*(later.inputs for later in stages[index + 1 :]))
+        for name in [name for name in vars(Holder) if name not in needed and name != "context"]:
+            delattr(Holder, name)
+
+    results = {}
+    for name in fields:
+        value = getattr(Holder, name)
+
+        if SWEEP_FIELDS[name] == "angle":
+            results[name] = value.degrees
+        elif SWEEP_FIELDS[name] == "vector":
+            results[name] = value.set_referential(Referential.GLOBAL).coords
+        else:
+            results[name] = np.asarray(value)
+
+    return results
+
+
+def _chunk_of(values, start: int, stop: int):
+    """Slice of a (N,) input, constant (scalar or length 1) inputs are returned as is."""
+    if isinstance(values, Angle):
+        values = values.degrees
+
+    values = values if np.ndim(values) == 0 or np.size(values) == 1 else values[start:stop]
+
+    # reading a memmap slice loads only that part of the file
+    return np.array(values, dtype=float)
+
+
+def stream_kinematics(
+    time: np.ndarray,
+    angles: dict | Callable[[int, int], dict],
+    fields: tuple = ("force_QSM",),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    attitude: dict = None,
+    aerodynamic_constants: dict = None,
+    force_constants: dict = None,
+) -> Iterator[tuple[int, int, dict[str, np.ndarray]]]:
+    """Evaluate the kinematics pipeline over a long record, chunk by chunk.
+
+    Each chunk is read with HALO extra samples on each side, so the time derivatives of its
+    samples are the ones of the whole record (the halo is clipped at the ends of the record,
+    where the one-sided differences of the "central" scheme apply as usual). Only the chunk
+    is held in memory, the inputs can be memory-mapped arrays.
+
+    Args:
+        time (np.ndarray): Uniformly sampled time vector of shape (N,).
+        angles (dict | Callable[[int, int], dict]): phi, alpha and theta in degrees of shape (N,)
+            or constant, and optionally their time derivatives phi_dt, alpha_dt, theta_dt (computed
+            with central differences otherwise, zero for the constant angles). Or a function giving them for the samples first to last
+            (excluded), to evaluate a model chunk by chunk instead of holding whole angles.
+        fields (tuple, optional): Fields to return, keys of SWEEP_FIELDS. Defaults to ("force_QSM",).
+        chunk_size (int, optional): Samples per chunk, halo excluded. Defaults to DEFAULT_CHUNK_SIZE.
+        attitude (dict, optional): eta, psi, beta, gamma in degrees, scalars or of shape (N,).
+        aerodynamic_constants (dict, optional): Overrides of AERODYNAMIC_CONSTANTS.
+        force_constants (dict, optional): Overrides of FORCE_CONSTANTS.
+
+    Raises:
+        ValueError: If a field or an angle is unknown, or if an angle is missing.
+
+    Yields:
+        tuple[int, int, dict[str, np.ndarray]]: start, stop and field -> (stop - start,) or
+            (3, stop - start) array, vectors in the GLOBAL referential.
+    """
+    unknown = set(fields) - set(SWEEP_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields {sorted(unknown)}. Expected {tuple(SWEEP_FIELDS)}.")
+
+    expected = set(WING_ANGLES) | {name + "_dt" for name in WING_ANGLES}
+    if not callable(angles) and not set(WING_ANGLES) <= set(angles) <= expected:
+        raise ValueError(f"angles must hold {WING_ANGLES}, and optionally their derivatives.")
+
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive.")
+
+    attitude = attitude or {}
+    N = len(time)
+
+    # every chunk uses the step of the whole record, so the derivatives do not depend on the chunking.
+    # The stages only use the step of the time vector, the chunks get it exactly from a local time.
+    dt = float(time[1] - time[0])
+
+    for start in range(0, N, chunk_size):
+        stop = min(start + chunk_size, N)
+        first, last = max(start - HALO, 0), min(stop + HALO, N)
+
+        if callable(angles):
+            chunk_angles = {name: _chunk_of(values, 0, last - first) for name, values in angles(first, last).items()}
+            if not set(WING_ANGLES) <= set(chunk_angles) <= expected:
+                raise ValueError(f"angles must hold {WING_ANGLES}, and optionally their derivatives.")
+        else:
+            chunk_angles = {name: _chunk_of(values, first, last) for name, values in angles.items()}
+
+        results = _evaluate_chunk(
+            dt * np.arange(last - first),
+            chunk_angles,
+            {name: _chunk_of(values, first, last) for name, values in attitude.items()},
+            fields,
+            aerodynamic_constants,
+            force_constants,
+        )
+
+        # drop the halo
+        inner = slice(start - first, start - first + stop - start)
+        yield start, stop, {name: values[..., inner] for name, values in results.items()}
+
+
+def allocate_record_outputs(
+    number_samples: int, fields: tuple = ("force_QSM",), directory: str | Path = None
+) -> dict[str, np.ndarray]:
+    """Allocate the outputs of a record, in memory or as <field>.npy memory-mapped files.
+
+    Returns:
+        dict[str, np.ndarray]: Field -> array of shape (N,) or (3, N) for vectors.
+    """
+    outputs = {}
+
+    for name in fields:
+        shape = (3, number_samples) if SWEEP_FIELDS[name] == "vector" else (number_samples,)
+
+        if directory is None:
+            outputs[name] = np.empty(shape)
+        else:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            outputs[name] = np.lib.format.open_memmap(Path(directory) / f"{name}.npy", mode="w+", shape=shape)
+
+    return outputs
+
+
+def evaluate_record(
+    time: np.ndarray,
+    angles: dict,
+    fields: tuple = ("force_QSM",),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    out: dict = None,
+    **options,
+) -> dict[str, np.ndarray]:
+    """Evaluate a long record with stream_kinematics and write every chunk into the outputs.
+
+    Args:
+        time (np.ndarray): Uniformly sampled time vector of shape (N,).
+        angles (dict): Wing angles and their optional derivatives, see stream_kinematics.
+        fields (tuple, optional): Fields to return, keys of SWEEP_FIELDS. Defaults to ("force_QSM",).
+        chunk_size (int, optional): Samples per chunk. Defaults to DEFAULT_CHUNK_SIZE.
+        out (dict, optional): Preallocated outputs, see allocate_record_outputs.
+        **options: attitude, aerodynamic_constants, force_constants, see stream_kinematics.
+
+    Returns:
+        dict[str, np.ndarray]: Field -> array of shape (N,) or (3, N) for vectors.
+    """
+    if out is None:
+        out = allocate_record_outputs(len(time), fields)
+
+    for start, stop, results in stream_kinematics(time, angles, fields, chunk_size, **options):
+        for name, values in results.items():
+            out[name][..., start:stop] = values
+
+    return out
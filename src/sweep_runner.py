@@ -0,0 +1,190 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import hashlib
+import json
+import os
+import numpy as np
+from parameter_sweep import (
+    SWEEP_FIELDS,
+    MAX_CHUNK_SAMPLES,
+    normalize_parameters,
+    evaluate_sweep_chunk,
+    sweep_field_shape,
+)
+from result_cache import ResultCache
+
+MANIFEST_FILE = "manifest.json"
+CHECKPOINT_DIRECTORY = "chunks"
+
+
+def _parameters_digest(parameters: dict) -> str:
+    """Hash of the parameter arrays, used to refuse resuming a different sweep."""
+    digest = hashlib.sha256()
+    for name in sorted(parameters):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(parameters[name], dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def _plain(value):
+    """Options as plain Python values for the JSON manifest (NumPy scalars and arrays as numbers and lists)."""
+    if isinstance(value, dict):
+        return {str(name): _plain(item) for name, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    return value
+
+
+def _checkpoint_path(directory: Path, index: int) -> Path:
+    return directory / CHECKPOINT_DIRECTORY / f"{index}.done"
+
+
+def completed_chunks(directory: str | Path) -> set[int]:
+    """Indices of the chunks of a sweep directory that are already written."""
+    checkpoints = Path(directory) / CHECKPOINT_DIRECTORY
+
+    if not checkpoints.is_dir():
+        return set()
+
+    return {int(path.stem) for path in checkpoints.glob("*.done")}
+
+
+def _run_chunk(
+    directory: str, index: int, start: int, stop: int, number_time_steps: int,
+    parameters: dict, fields: tuple, reduce: str, options: dict, cache: ResultCache = None,
+) -> int:
+    """Worker: evaluate one chunk and write it straight into the memory-mapped outputs."""
+    directory = Path(directory)
+    time = np.linspace(0.0, 1.0, endpoint=False, num=number_time_steps)
+
+    results = evaluate_sweep_chunk(time, parameters, fields, reduce, cache=cache, **options)
+
+    for name, values in results.items():
+        output = np.load(directory / f"{name}.npy", mmap_mode="r+")
+        output[start:stop] = values
+        output.flush()
+        del output
+
+    # the checkpoint is only written once the data is on disk
+    _checkpoint_path(directory, index).touch()
+
+    return index
+
+
+def run_sweep(
+    directory: str | Path,
+    number_time_steps: int,
+    parameters: dict,
+    fields: tuple = tuple(SWEEP_FIELDS),
+    reduce: str = None,
+    chunk_size: int = None,
+    max_workers: int = None,
+    cache: ResultCache = None,
+    **options,
+) -> dict[str, np.memmap]:
+    """Run a parameter sweep over a process pool, writing results into memory-mapped .npy files.
+
+    Each worker evaluates chunks of parameter sets with evaluate_sweep_chunk and writes them
+    into directory/<field>.npy, nothing but the chunk index is sent back to the parent.
+    A marker file is written for every finished chunk, running the same sweep again in the
+    same directory resumes it and only evaluates the missing chunks.
+
+    Args:
+        directory (str | Path): Output directory of the sweep.
+        number_time_steps (int): Number of time steps N of the cycle.
+        parameters (dict): Parameter name -> scalar or array of shape (P,).
+        fields (tuple, optional): Fields to return, keys of SWEEP_FIELDS. Defaults to all.
+        reduce (str, optional): None for time series, "mean" for cycle means. Defaults to None.
+        chunk_size (int, optional): Parameter sets per chunk. Defaults to MAX_CHUNK_SAMPLES // N.
+        max_workers (int, optional): Number of processes. Defaults to the number of CPUs.
+        cache (ResultCache, optional): Cache of the parameter sets results shared by the workers,
+            see sweep_kinematics. Defaults to no cache.
+        **options: derivative_method, order, aerodynamic_constants, force_constants,
+            forwarded to evaluate_sweep_chunk.
+
+    Raises:
+        ValueError: If the directory holds a different sweep.
+
+    Returns:
+        dict[str, np.memmap]: Field -> read-only memory-mapped array, see load_sweep.
+    """
+    if not isinstance(number_time_steps, int):
+        raise TypeError("number_time_steps must be an integer")
+
+    unknown = set(fields) - set(SWEEP_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields {sorted(unknown)}. Expected {tuple(SWEEP_FIELDS)}.")
+
+    if reduce not in (None, "mean"):
+        raise ValueError("reduce must be None or 'mean'.")
+
+    directory = Path(directory)
+    parameters = normalize_parameters(parameters)
+    P = parameters["PHI"].size
+
+    if chunk_size is None:
+        chunk_size = max(1, MAX_CHUNK_SAMPLES // number_time_steps)
+
+    # the workers are given the options as written in the manifest, so a resumed sweep computes the same
+    options = _plain(options)
+
+    manifest = {
+        "number_time_steps": number_time_steps,
+        "number_parameter_sets": P,
+        "fields": list(fields),
+        "reduce": reduce,
+        "chunk_size": chunk_size,
+        "options": options,
+        "parameters": _parameters_digest(parameters),
+    }
+
+    manifest_path = directory / MANIFEST_FILE
+    if manifest_path.exists():
+        if json.loads(manifest_path.read_text()) != json.loads(json.dumps(manifest)):
+            raise ValueError(f"{directory} holds a different sweep, it cannot be resumed.")
+    else:
+        (directory / CHECKPOINT_DIRECTORY).mkdir(parents=True, exist_ok=True)
+        for name in fields:
+            shape = sweep_field_shape(name, P, number_time_steps, reduce)
+            output = np.lib.format.open_memmap(directory / f"{name}.npy", mode="w+", shape=shape)
+            del output
+        manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    done = completed_chunks(directory)
+    chunks = [
+        (index, start, min(start + chunk_size, P))
+        for index, start in enumerate(range(0, P, chunk_size))
+        if index not in done
+    ]
+
+    if chunks:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            futures = [
+                executor.submit(
+                    _run_chunk, str(directory), index, start, stop, number_time_steps,
+                    {name: values[start:stop] for name, values in parameters.items()},
+                    tuple(fields), reduce, options, cache,
+                )
+                for index, start, stop in chunks
+            ]
+            for future in as_completed(futures):
+                future.result()  # re-raise the worker errors
+
+    return load_sweep(directory)
+
+
+def load_sweep(directory: str | Path) -> dict[str, np.memmap]:
+    """Open the results of a sweep directory as read-only memory-mapped arrays.
+
+    Args:
+        directory (str | Path): Output directory of run_sweep.
+
+    Returns:
+        dict[str, np.memmap]: Field -> array of shape (P, [3,] N), or (P, [3]) if reduced.
+    """
+    directory = Path(directory)
+    manifest = json.loads((directory / MANIFEST_FILE).read_text())
+
+    return {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in manifest["fields"]}
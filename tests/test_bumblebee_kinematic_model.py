@@ -0,0 +1,158 @@
+import pytest
+import numpy as np
+from bumblebee_kinematic_model import (
+    bumblebee_kinematics_model,
+    maneuver_kinematics_model,
+    cycle_parameter,
+    feathering_angle,
+    stroke_angle,
+)
+
+
+def test_maneuver_constant_cycles():
+    N, C = 400, 3
+    parameters = {"PHI": 100.0, "phi_m": 20.0, "dTau": 0.05, "alpha_down": 60.0, "alpha_up": -35.0, "tau": 0.25}
+    _, alpha, phi, theta = bumblebee_kinematics_model(N, **parameters)
+
+    time, maneuver_alpha, maneuver_phi, maneuver_theta = maneuver_kinematics_model(
+        N, **{name: np.full(C, value) for name, value in parameters.items()}
+    )
+
+    assert time.shape == (C * N,)
+    np.testing.assert_allclose(time[N:2 * N], 1.0 + np.linspace(0.0, 1.0, endpoint=False, num=N))
+    np.testing.assert_allclose(maneuver_alpha.degrees, np.tile(alpha.degrees, C), rtol=0, atol=1e-9)
+    np.testing.assert_allclose(maneuver_phi.degrees, np.tile(phi.degrees, C), rtol=0, atol=1e-9)
+    np.testing.assert_allclose(maneuver_theta.degrees, np.tile(theta.degrees, C), rtol=0, atol=1e-12)
+
+
+def test_cycle_parameter_blend():
+    values = np.array([1.0, 3.0, -2.0])
+    transition = 0.2
+
+    # each cycle takes its value outside of the blending windows
+    time = np.array([0.0, 0.5, 0.89, 1.11, 1.5, 1.89, 2.11, 2.99])
+    np.testing.assert_array_equal(cycle_parameter(time, values, transition), [1, 1, 1, 3, 3, 3, -2, -2])
+
+    # continuous, and continuously differentiable, at the cycle boundaries and the window edges
+    for boundary in (1.0, 2.0):
+        for point in (boundary - transition / 2, boundary, boundary + transition / 2):
+            left, right = cycle_parameter(np.array([point - 1e-9, point + 1e-9]), values, transition)
+            assert right - left == pytest.approx(0.0, abs=1e-7)
+
+            h = 1e-5
+            samples = cycle_parameter(point + np.array([-2 * h, -h, h, 2 * h]), values, transition)
+            assert (samples[1] - samples[0]) / h == pytest.approx((samples[3] - samples[2]) / h, abs=1e-3)
+
+    # the blend goes monotonically from one value to the next, through the midpoint at the boundary
+    window = np.linspace(0.9, 1.1, 101)
+    blend = cycle_parameter(window, values, transition)
+    assert np.all(np.diff(blend) >= 0) and blend[50] == pytest.approx(2.0)
+
+
+def test_maneuver_angles_continuous():
+    N = 400
+    _, alpha, phi, _ = maneuver_kinematics_model(N, transition=0.2, PHI=[100.0, 130.0, 90.0], tau=[0.2, 0.3, 0.2])
+
+    # no jump at the cycle boundaries: the steps there are of the size of the steps nearby
+    for angle in (alpha.degrees, phi.degrees):
+        steps = np.abs(np.diff(angle))
+        for boundary in (N, 2 * N):
+            assert steps[boundary - 1] <= 2 * max(steps[boundary - 3], steps[boundary + 1]) + 1e-9
+
+    with pytest.raises(ValueError, match="same length"):
+        maneuver_kinematics_model(N, PHI=[100.0, 130.0], tau=[0.2, 0.3, 0.2])
+
+
+@pytest.mark.parametrize(
+    "angle, parameters",
+    [
+        (feathering_angle, {"alpha_down": 70.0, "alpha_up": -40.0, "tau": 0.22}),
+        (feathering_angle, {"alpha_down": 45.0, "alpha_up": -10.0, "tau": 0.4}),
+        (stroke_angle, {"PHI": 115.0, "phi_m": 24.0}),
+    ],
+)
+def test_angle_derivatives(angle, parameters):
+    time = np.linspace(-0.3, 1.7, 2001)
+    h = 1e-4
+
+    def values(t, derivative=0):
+        return angle(t, **parameters, derivative=derivative)
+
+    first = (values(time + h) - values(time - h)) / (2 * h)
+    second = (values(time + h) - 2 * values(time) + values(time - h)) / h**2
+
+    # the differences are of order h where the third derivative of the ramps jumps
+    np.testing.assert_allclose(values(time, 1), first, rtol=0, atol=1e-5 * np.abs(first).max())
+    np.testing.assert_allclose(values(time, 2), second, rtol=0, atol=2e-3 * np.abs(second).max())
+
+    # the second derivative is the derivative of the first one
+    np.testing.assert_allclose(
+        values(time, 2),
+        (values(time + h, 1) - values(time - h, 1)) / (2 * h),
+        rtol=0,
+        atol=2e-3 * np.abs(second).max(),
+    )
+
+    with pytest.raises(ValueError, match="derivative"):
+        values(time, 3)
+
+
+def test_model_derivatives():
+    N = 4000
+    time, alpha, phi, theta, derivatives = bumblebee_kinematics_model(N, dTau=0.05, derivatives=True)
+
+    def periodic_difference(values):
+        return (np.roll(values, -1) - np.roll(values, 1)) * N / 2
+
+    # the angles are periodic, their derivatives at the ends of the record are the ones inside
+    for name, angle in (("alpha", alpha), ("phi", phi), ("theta", theta)):
+        first, second = derivatives[name + "_dt"].degrees, derivatives[name + "_ddt"].degrees
+
+        np.testing.assert_allclose(first, periodic_difference(angle.degrees), rtol=0, atol=1e-4 * np.abs(first).max())
+        np.testing.assert_allclose(second, periodic_difference(first), rtol=0, atol=5e-3 * np.abs(second).max())
+
+
+def piecewise_feathering_angle(time, alpha_down, alpha_up, tau):
+    """Sample by sample feathering angle, as the model computed it before being vectorized."""
+    T1 = tau / 2.0
+    T2 = 0.5 - tau / 2.0
+    T3 = T2 + tau
+    T4 = 1.0 - tau / 2.0
+    a = (alpha_up - alpha_down) / tau
+
+    alpha = np.zeros_like(time)
+    for it, t in enumerate(time):
+        if t < T1:
+            alpha[it] = alpha_down - a * (t - tau / 2.0 - (tau / 2.0 / np.pi) * np.sin(2.0 * np.pi * (t - tau / 2.0) / tau))
+        elif t < T2:
+            alpha[it] = alpha_down
+        elif t < T3:
+            alpha[it] = alpha_down + a * (t - T2 - (tau / 2 / np.pi) * np.sin(2 * np.pi * (t - T2) / tau))
+        elif t < T4:
+            alpha[it] = alpha_up
+        else:
+            alpha[it] = alpha_up - a * (t - T4 - (tau / 2 / np.pi) * np.sin(2 * np.pi * ((t - T4) / tau)))
+
+    return alpha
+
+
+@pytest.mark.parametrize(
+    "parameters",
+    [
+        {"alpha_down": 70.0, "alpha_up": -40.0, "tau": 0.22},
+        {"alpha_down": 45.0, "alpha_up": -10.0, "tau": 0.4},
+        {"alpha_down": -20.0, "alpha_up": 30.0, "tau": 0.1},
+    ],
+)
+def test_feathering_angle_matches_piecewise_loop(parameters):
+    time = np.linspace(0.0, 1.0, endpoint=False, num=400)
+
+    np.testing.assert_allclose(
+        feathering_angle(time, **parameters), piecewise_feathering_angle(time, **parameters), rtol=0, atol=1e-12
+    )
+
+    # and through the model, with the dTau shift
+    _, alpha, _, _ = bumblebee_kinematics_model(400, dTau=0.05, **parameters)
+    np.testing.assert_allclose(
+        alpha.degrees, np.roll(piecewise_feathering_angle(time, **parameters), 20), rtol=0, atol=1e-12
+    )
@@ -0,0 +1,68 @@
+import pytest
+import numpy as np
+from src.core import Angle, Referential, TransformationContext, Vector3D, CachedVector3D, tracing
+
+
+@pytest.fixture
+def context():
+    rng = np.random.default_rng(0)
+    names = ("phi", "alpha", "theta", "eta", "psi", "beta", "gamma")
+    context = TransformationContext()
+    context.initialize(**{name: Angle(rng.uniform(-np.pi, np.pi, 20), "rad") for name in names})
+    return context
+
+
+def test_tracing_counts(context):
+    vector = Vector3D(np.ones((3, 20)), Referential.GLOBAL, context)
+
+    with tracing() as trace:
+        vector.set_referential(Referential.WING)
+        vector.set_referential(Referential.WING)  # same referential, not a conversion
+        vector.set_referential(Referential.BODY)
+
+    pairs = trace.pairs()
+    assert set(pairs) == {"GLOBAL->WING", "WING->BODY"}
+    assert pairs["GLOBAL->WING"]["count"] == 1
+    assert pairs["GLOBAL->WING"]["samples"] == 20
+    assert all(entry["site"].startswith("test_conversion_trace.py:") for entry in trace.report()["sites"])
+    assert not trace.round_trips and not trace.repeats
+
+
+def test_tracing_round_trips(context):
+    vector = Vector3D(np.ones((3, 20)), Referential.GLOBAL, context)
+    cached = CachedVector3D(np.ones((3, 20)), Referential.GLOBAL, context)
+
+    with tracing() as trace:
+        vector.set_referential(Referential.WING).set_referential(Referential.GLOBAL)
+        vector.set_referential(Referential.BODY).set_referential(Referential.WING)
+        cached.set_referential(Referential.WING).set_referential(Referential.GLOBAL)
+        cached.set_referential(Referential.WING)
+
+    # the conversions served by the cache of the CachedVector3D are not flagged
+    assert sum(trace.round_trips.values()) == 1
+    assert sum(trace.repeats.values()) == 1  # back to WING
+    assert trace.pairs()["WING->GLOBAL"]["cached"] == 1
+    assert trace.pairs()["GLOBAL->WING"]["cached"] == 1
+
+
+def test_tracing_matrix_requests(context):
+    with tracing() as trace:
+        for _ in range(2):
+            context.get_matrix(Referential.GLOBAL, Referential.WING)
+
+    request, = trace.report()["matrix_requests"]
+    assert request["pair"] == "GLOBAL->WING"
+    assert request["count"] == 2
+
+
+def test_tracing_disabled(context):
+    with tracing() as trace:
+        pass
+
+    Vector3D(np.ones((3, 20)), Referential.GLOBAL, context).set_referential(Referential.WING)
+    assert not trace.conversions
+
+    with tracing():
+        with pytest.raises(ValueError):
+            with tracing():
+                pass
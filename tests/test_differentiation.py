@@ -0,0 +1,110 @@
+import pytest
+import numpy as np
+from src.core import (
+    Angle,
+    Vector3D,
+    Referential,
+    time_derivative,
+    central_difference,
+    periodic_central_difference,
+    spectral_derivative,
+    vector_time_derivative,
+    angle_time_derivative,
+    DEFAULT_PERIODIC_ORDER,
+)
+
+
+@pytest.fixture
+def periodic_signal():
+    N = 64
+    time = np.linspace(0.0, 1.0, endpoint=False, num=N)
+    values = np.sin(2 * np.pi * time) + 0.5 * np.cos(6 * np.pi * time)
+    derivative = 2 * np.pi * np.cos(2 * np.pi * time) - 3 * np.pi * np.sin(6 * np.pi * time)
+    return time, values, derivative
+
+
+def test_central_difference_matches_loop():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=(3, 20))
+    dt = 0.1
+
+    expected = np.empty_like(values)
+    expected[:, 0] = (values[:, 1] - values[:, 0]) / dt
+    for i in range(1, 19):
+        expected[:, i] = (values[:, i + 1] - values[:, i - 1]) / (2 * dt)
+    expected[:, -1] = (values[:, -1] - values[:, -2]) / dt
+
+    np.testing.assert_allclose(central_difference(values, dt), expected)
+    np.testing.assert_allclose(central_difference(values.T, dt, axis=0), expected.T)
+
+
+def test_periodic_central_difference_convergence(periodic_signal):
+    time, values, derivative = periodic_signal
+    dt = time[1] - time[0]
+
+    errors = [
+        np.max(np.abs(periodic_central_difference(values, dt, order) - derivative))
+        for order in (2, 4, 6)
+    ]
+
+    assert errors[0] > errors[1] > errors[2]
+    assert errors[2] < 1e-2
+
+
+def test_spectral_derivative_is_exact_for_resolved_modes(periodic_signal):
+    time, values, derivative = periodic_signal
+    dt = time[1] - time[0]
+
+    np.testing.assert_allclose(spectral_derivative(values, dt), derivative, atol=1e-10)
+
+    # odd number of samples and time along the first axis
+    time = np.linspace(0.0, 1.0, endpoint=False, num=33)
+    values = np.stack([np.sin(2 * np.pi * time), np.cos(2 * np.pi * time)], axis=1)
+    expected = 2 * np.pi * np.stack([np.cos(2 * np.pi * time), -np.sin(2 * np.pi * time)], axis=1)
+    np.testing.assert_allclose(spectral_derivative(values, time[1], axis=0), expected, atol=1e-10)
+
+
+def test_time_derivative_dispatch(periodic_signal):
+    time, values, _ = periodic_signal
+    dt = time[1] - time[0]
+
+    np.testing.assert_array_equal(time_derivative(values, dt), central_difference(values, dt))
+    np.testing.assert_array_equal(
+        time_derivative(values, dt, "periodic", 6), periodic_central_difference(values, dt, 6)
+    )
+    np.testing.assert_array_equal(
+        time_derivative(values, dt, "spectral"), spectral_derivative(values, dt)
+    )
+
+    # the periodic scheme has the same default order whatever the entry point
+    np.testing.assert_array_equal(
+        time_derivative(values, dt, "periodic"), periodic_central_difference(values, dt)
+    )
+    np.testing.assert_array_equal(
+        periodic_central_difference(values, dt), periodic_central_difference(values, dt, DEFAULT_PERIODIC_ORDER)
+    )
+
+
+def test_time_derivative_validation():
+    with pytest.raises(ValueError, match="Unknown method"):
+        time_derivative(np.zeros(10), 0.1, method="backward")
+
+    with pytest.raises(ValueError, match="Unsupported order"):
+        periodic_central_difference(np.zeros(10), 0.1, order=3)
+
+    with pytest.raises(ValueError, match="samples are needed"):
+        periodic_central_difference(np.zeros(5), 0.1, order=6)
+
+
+def test_vector_and_angle_time_derivative_methods(periodic_signal):
+    time, values, derivative = periodic_signal
+
+    vector = Vector3D(np.stack([values, 2 * values, np.zeros_like(values)]), Referential.GLOBAL)
+    result = vector_time_derivative(time, vector, method="spectral")
+    assert result.referential == Referential.GLOBAL
+    np.testing.assert_allclose(result.coords[1], 2 * derivative, atol=1e-10)
+
+    angle = Angle(values, "deg")
+    result = angle_time_derivative(time, angle, method="periodic", order=6)
+    assert isinstance(result, Angle)
+    np.testing.assert_allclose(result.degrees, derivative, atol=1e-2)
@@ -0,0 +1,97 @@
+import pytest
+import numpy as np
+from core import Angle, Referential, TransformationContext, Vector3D, global_to_wing_matrix
+from data import KinematicsSolutionHolder
+from initialize_transformations import initialize_transformations
+from kinematics_evaluations import solve_kinematics, solve_maneuver
+from pipeline import LazyKinematicsSolution, PIPELINE_STAGES
+
+
+def test_solve_kinematics_quaternion_backend():
+    expected = solve_kinematics(400, TransformationContext())
+    solution = solve_kinematics(400, TransformationContext(backend="quaternion"))
+
+    # e_lift and e_drag are left out, they normalize u_tip which vanishes at the stroke reversals
+    for name in ("omega", "u_tip", "omega_dt", "force_RC", "force_QSM"):
+        vector, reference = getattr(solution, name), getattr(expected, name)
+        assert isinstance(vector, Vector3D)
+        assert vector.referential == reference.referential
+        np.testing.assert_allclose(vector.coords, reference.coords, rtol=0, atol=1e-9)
+
+
+def full_length(angle, N):
+    return angle if len(angle) == N else Angle(np.full(N, angle.radians[0]), "rad")
+
+
+def test_time_varying_attitude_angular_velocity():
+    N = 4000
+    time = np.linspace(0.0, 1.0, endpoint=False, num=N)
+    attitude = {
+        "eta": 10 + 5 * np.sin(2 * np.pi * time),
+        "psi": 3 * np.cos(4 * np.pi * time),
+        "beta": 20.0,
+        "gamma": 7 * time,
+    }
+    solution = solve_kinematics(N, TransformationContext(), attitude=attitude)
+
+    # angular velocity of the wing from the rate of change of the global to wing matrix
+    names = ("phi", "alpha", "theta", "eta", "psi", "beta", "gamma")
+    matrix = global_to_wing_matrix(*(full_length(getattr(solution, name), N) for name in names))
+    skew = -np.einsum("ijn,kjn->ikn", np.gradient(matrix, time, axis=2), matrix)
+    expected = np.einsum("jin,jn->in", matrix, np.array([skew[2, 1], skew[0, 2], skew[1, 0]]))
+
+    omega = solution.omega.set_referential(Referential.GLOBAL).coords
+    np.testing.assert_allclose(omega[:, 1:-1], expected[:, 1:-1], rtol=0, atol=1e-3)
+
+
+def test_constant_and_time_varying_attitude_mix():
+    N = 400
+    time = np.linspace(0.0, 1.0, endpoint=False, num=N)
+    attitude = {"eta": 30.0, "psi": 0.0, "beta": 10 * np.sin(2 * np.pi * time), "gamma": 5.0}
+    expanded = {name: np.full(N, value) if np.ndim(value) == 0 else value for name, value in attitude.items()}
+
+    solution = solve_kinematics(N, TransformationContext(), attitude=attitude)
+    expected = solve_kinematics(N, TransformationContext(), attitude=expanded)
+
+    assert len(solution.eta) == 1 and len(solution.beta) == N
+    for name in ("omega", "u_tip", "force_QSM"):
+        np.testing.assert_allclose(
+            getattr(solution, name).set_referential(Referential.GLOBAL).coords,
+            getattr(expected, name).set_referential(Referential.GLOBAL).coords,
+            rtol=0,
+            atol=1e-9,
+        )
+
+
+def test_set_angles_lengths():
+    Holder = KinematicsSolutionHolder(TransformationContext())
+    Holder.time = np.linspace(0.0, 1.0, endpoint=False, num=10)
+
+    Holder.set_angles(eta=5.0, beta=np.zeros(10), psi=Angle(0.1, "rad"))
+    assert len(Holder.eta) == 1 and len(Holder.beta) == 10 and Holder.psi.radians[0] == 0.1
+    assert Holder.eta.degrees[0] == pytest.approx(5.0)
+
+    with pytest.raises(ValueError, match="length"):
+        Holder.set_angles(gamma=np.zeros(3))
+
+    with pytest.raises(ValueError, match="Unknown angles"):
+        initialize_transformations(Holder, zeta=1.0)
+
+
+def test_solvers_run_the_pipeline_stages():
+    # a single default wingbeat is the model with finite difference derivatives
+    maneuver = solve_maneuver(400, {}, TransformationContext())
+    expected = LazyKinematicsSolution(400, TransformationContext(), analytic_derivatives=False).solve()
+
+    for stage in PIPELINE_STAGES[2:]:
+        for name in stage.outputs:
+            value, reference = getattr(maneuver, name), getattr(expected, name)
+            if isinstance(value, Vector3D):
+                value = value.set_referential(Referential.GLOBAL).coords
+                reference = reference.set_referential(Referential.GLOBAL).coords
+            elif isinstance(value, Angle):
+                value, reference = value.radians, reference.radians
+            np.testing.assert_array_equal(value, reference, err_msg=name)
+
+    with pytest.raises(ValueError):
+        solve_kinematics(100, TransformationContext(), amplitude=1.0)
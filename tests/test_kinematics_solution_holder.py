@@ -0,0 +1,85 @@
+import json
+import mmap
+import pytest
+import numpy as np
+from core import Angle, Referential, TransformationContext, Vector3D
+from data import KinematicsSolutionHolder
+from kinematics_evaluations import solve_kinematics
+
+
+def is_memory_mapped(array) -> bool:
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+@pytest.fixture(scope="module")
+def solution():
+    return solve_kinematics(200, TransformationContext(layout="batched"), attitude={"eta": 20.0})
+
+
+@pytest.fixture
+def directory(solution, tmp_path):
+    solution.save(tmp_path)
+    return tmp_path
+
+
+def test_round_trip(solution, directory):
+    loaded = KinematicsSolutionHolder.load(directory)
+
+    for name, value in vars(solution).items():
+        if name == "context":
+            continue
+
+        stored = getattr(loaded, name)
+
+        if isinstance(value, Vector3D):
+            assert type(stored) is type(value), name
+            assert stored.referential == value.referential
+            np.testing.assert_array_equal(stored.coords, value.coords)
+        elif isinstance(value, Angle):
+            assert isinstance(stored, Angle) and stored._unit == value._unit
+            np.testing.assert_array_equal(stored._values, value._values)
+        else:
+            np.testing.assert_array_equal(stored, value)
+
+
+def test_fields_loaded_lazily(directory):
+    loaded = KinematicsSolutionHolder.load(directory)
+    assert "force_QSM" not in vars(loaded) and "phi" not in vars(loaded)
+
+    assert loaded.force_QSM.referential == Referential.GLOBAL
+    assert is_memory_mapped(loaded.force_QSM.coords)
+    assert is_memory_mapped(loaded.phi._values)
+    assert is_memory_mapped(loaded.lift_coeff)
+    assert "force_QSM" in vars(loaded) and "omega" not in vars(loaded)
+
+
+def test_vectors_attached_to_loaded_context(solution, directory):
+    loaded = KinematicsSolutionHolder.load(directory)
+    assert loaded.context.layout == "batched"
+    assert not loaded.context.is_initialized
+
+    omega = loaded.omega
+    assert omega.context is loaded.context and loaded.context.is_initialized
+
+    expected = Vector3D(solution.omega.coords, solution.omega.referential, solution.context)
+    np.testing.assert_allclose(
+        omega.set_referential(Referential.GLOBAL).coords,
+        expected.set_referential(Referential.GLOBAL).coords,
+        rtol=0,
+        atol=1e-12,
+    )
+
+
+def test_unsupported_format_version(directory):
+    manifest = json.loads((directory / "manifest.json").read_text())
+    (directory / "manifest.json").write_text(json.dumps({**manifest, "format_version": 99}))
+
+    with pytest.raises(ValueError, match="Unsupported format version 99"):
+        KinematicsSolutionHolder.load(directory)
+
+    with pytest.raises(ValueError, match="No manifest.json"):
+        KinematicsSolutionHolder.load(directory / "missing")
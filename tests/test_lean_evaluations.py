@@ -0,0 +1,61 @@
+import pytest
+import numpy as np
+from core import Referential, TransformationContext
+from kinematics_evaluations import solve_kinematics
+from lean_evaluations import STATISTICS, RunningStatistics, lean_kinematics
+
+
+def statistics_of(values, downstroke):
+    return {
+        "mean": values.mean(axis=-1),
+        "min": values.min(axis=-1),
+        "max": values.max(axis=-1),
+        "rms": np.sqrt((values**2).mean(axis=-1)),
+        "downstroke_mean": values[..., downstroke].mean(axis=-1),
+        "upstroke_mean": values[..., ~downstroke].mean(axis=-1),
+    }
+
+
+def test_lean_matches_solve_kinematics():
+    N = 1000
+    solution = solve_kinematics(N, TransformationContext())
+    summary = lean_kinematics(N, ("force_QSM", "angle_of_attack", "lift_coeff"), chunk_size=300)
+
+    downstroke = solution.phi_dt.radians < 0
+    expected = {
+        "force_QSM": statistics_of(solution.force_QSM.set_referential(Referential.GLOBAL).coords, downstroke),
+        "angle_of_attack": statistics_of(solution.angle_of_attack.degrees, downstroke),
+        "lift_coeff": statistics_of(solution.lift_coeff, downstroke),
+    }
+
+    assert summary["number_time_steps"] == N
+    for name, statistics in expected.items():
+        assert set(summary[name]) == set(STATISTICS)
+        for statistic, value in statistics.items():
+            np.testing.assert_allclose(summary[name][statistic], value, rtol=1e-12, atol=1e-10, err_msg=statistic)
+
+
+def test_running_statistics_empty_half_stroke():
+    statistics = RunningStatistics()
+    statistics.update(np.array([1.0, 3.0]), np.array([False, False]))
+    statistics.update(np.array([2.0]), np.array([False]))
+
+    result = statistics.result()
+    assert result["mean"] == pytest.approx(2.0)
+    assert result["rms"] == pytest.approx(np.sqrt(14.0 / 3))
+    assert (result["min"], result["max"]) == (1.0, 3.0)
+    assert np.isnan(result["downstroke_mean"])
+    assert result["upstroke_mean"] == pytest.approx(2.0)
+
+    # vectors, per component, with an empty upstroke
+    vectors = RunningStatistics()
+    vectors.update(np.arange(6.0).reshape(3, 2), np.array([True, True]))
+
+    result = vectors.result()
+    np.testing.assert_array_equal(result["downstroke_mean"], [0.5, 2.5, 4.5])
+    assert np.isnan(result["upstroke_mean"]).all()
+
+
+def test_lean_unknown_parameter():
+    with pytest.raises(ValueError, match="Unknown parameters"):
+        lean_kinematics(100, PSI=1.0)
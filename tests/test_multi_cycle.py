@@ -0,0 +1,55 @@
+import pytest
+import numpy as np
+from multi_cycle import _cycle_solution, clear_cycle_cache, evaluate_cycle, evaluate_cycles, take_cycles
+
+FIELDS = ("force_QSM", "lift_coeff")
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_cycle_cache()
+    yield
+    clear_cycle_cache()
+
+
+def test_evaluate_cycle_cached():
+    first = evaluate_cycle(100, FIELDS, PHI=110.0)
+    second = evaluate_cycle(100, FIELDS, PHI=110.0)
+
+    info = _cycle_solution.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    assert second["force_QSM"] is first["force_QSM"]
+    assert not first["force_QSM"].flags.writeable
+
+    evaluate_cycle(100, FIELDS, PHI=120.0)
+    assert _cycle_solution.cache_info().misses == 2
+
+
+def test_evaluate_cycle_dict_is_callers_own():
+    first = evaluate_cycle(100, FIELDS)
+    del first["force_QSM"]
+    first["lift_coeff"] = None
+
+    second = evaluate_cycle(100, FIELDS)
+    assert set(second) == set(FIELDS)
+    assert isinstance(second["lift_coeff"], np.ndarray)
+
+
+def test_evaluate_cycles_zero_stride():
+    cycle = evaluate_cycle(100, FIELDS)
+    cycles = evaluate_cycles(5, 100, fields=FIELDS)
+
+    assert cycles["force_QSM"].shape == (3, 5, 100)
+    assert cycles["force_QSM"].strides[1] == 0 and cycles["lift_coeff"].strides[0] == 0
+    assert np.shares_memory(cycles["force_QSM"], cycle["force_QSM"])
+    np.testing.assert_array_equal(cycles["lift_coeff"][3], cycle["lift_coeff"])
+
+    with pytest.raises(ValueError, match="number_cycles"):
+        evaluate_cycles(0, 100)
+
+
+def test_take_cycles():
+    values = np.arange(12.0).reshape(3, 4)
+
+    np.testing.assert_array_equal(take_cycles(values[0], [0, 3, 4, 9, -1]), [0.0, 3.0, 0.0, 1.0, 3.0])
+    np.testing.assert_array_equal(take_cycles(values, [5, 10]), values[:, [1, 2]])
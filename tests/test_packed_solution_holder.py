@@ -0,0 +1,42 @@
+import numpy as np
+from core import Angle, Referential, TransformationContext, Vector3D
+from data import PackedKinematicsSolutionHolder
+from data.packed_solution_holder import PACKED_FIELDS
+from kinematics_evaluations import solve_kinematics
+
+
+def values_of(field):
+    if isinstance(field, Vector3D):
+        return field.coords
+    if isinstance(field, Angle):
+        return field._values
+    return field
+
+
+def test_solve_into_block():
+    expected = solve_kinematics(400, TransformationContext())
+    Holder = solve_kinematics(400, Holder=PackedKinematicsSolutionHolder(400, TransformationContext()))
+
+    for name, _ in PACKED_FIELDS:
+        values = values_of(getattr(Holder, name))
+
+        assert np.shares_memory(values, Holder.block), name
+        np.testing.assert_array_equal(Holder.view(name), values)
+
+        reference = getattr(expected, name)
+        if isinstance(reference, Vector3D):
+            assert Holder.referentials[name] == reference.referential
+        np.testing.assert_array_equal(values, values_of(reference))
+
+
+def test_set_referential_writes_block():
+    Holder = solve_kinematics(400, Holder=PackedKinematicsSolutionHolder(400, TransformationContext()))
+    omega_wing = Holder.omega.set_referential(Referential.WING).coords.copy()
+
+    Holder.omega.set_referential(Referential.GLOBAL)
+    assert Holder.referentials["omega"] == Referential.GLOBAL
+    np.testing.assert_array_equal(Holder.view("omega"), Holder.omega.coords)
+
+    # the coordinates cached for the wing referential are not overwritten by the block
+    Holder.omega.set_referential(Referential.WING)
+    np.testing.assert_array_equal(Holder.view("omega"), omega_wing)
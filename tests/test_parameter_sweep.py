@@ -0,0 +1,106 @@
+import pytest
+import numpy as np
+import pipeline
+from core import Referential, TransformationContext
+from kinematics_evaluations import solve_kinematics
+from parameter_sweep import SWEEP_FIELDS, parameter_grid, sweep_kinematics
+from result_cache import ResultCache
+
+N = 100
+PARAMETERS = parameter_grid(PHI=[100.0, 115.0], dTau=[0.0, 0.08], theta=[0.0, 4.0, 8.0])  # P = 12
+
+
+def solve_each(parameters):
+    P = parameters["PHI"].size
+    solutions = [
+        solve_kinematics(N, TransformationContext(), **{name: values[index] for name, values in parameters.items()})
+        for index in range(P)
+    ]
+
+    expected = {}
+    for name, kind in SWEEP_FIELDS.items():
+        values = [getattr(solution, name) for solution in solutions]
+
+        if kind == "angle":
+            expected[name] = np.stack([value.degrees for value in values])
+        elif kind == "vector":
+            expected[name] = np.stack([value.set_referential(Referential.GLOBAL).coords for value in values])
+        else:
+            expected[name] = np.stack(values)
+
+    return expected
+
+
+@pytest.fixture(scope="module")
+def expected():
+    return solve_each(PARAMETERS)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 12, 50])
+def test_sweep_matches_solve_kinematics(expected, chunk_size):
+    results = sweep_kinematics(N, PARAMETERS, chunk_size=chunk_size)
+
+    for name in SWEEP_FIELDS:
+        assert results[name].shape == expected[name].shape
+        np.testing.assert_allclose(results[name], expected[name], rtol=1e-12, atol=1e-9, err_msg=name)
+
+
+@pytest.mark.parametrize("chunk_size", [5, 7])
+def test_sweep_mean_matches_solve_kinematics(expected, chunk_size):
+    results = sweep_kinematics(N, PARAMETERS, ("force_QSM", "lift_coeff"), reduce="mean", chunk_size=chunk_size)
+
+    assert results["force_QSM"].shape == (12, 3)
+    np.testing.assert_allclose(results["force_QSM"], expected["force_QSM"].mean(axis=-1), rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(results["lift_coeff"], expected["lift_coeff"].mean(axis=-1), rtol=1e-12, atol=1e-12)
+
+
+def test_sweep_runs_the_pipeline_stages(expected, monkeypatch):
+    calls = []
+    compute_forces = pipeline.compute_forces
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return compute_forces(*args, **kwargs)
+
+    monkeypatch.setattr(pipeline, "compute_forces", counted)
+
+    sweep_kinematics(N, PARAMETERS, ("force_QSM",), chunk_size=5)
+    assert len(calls) == 3
+
+    # only the stages needed for the fields are run
+    results = sweep_kinematics(N, PARAMETERS, ("angle_of_attack", "drag_coeff"))
+    assert len(calls) == 3
+
+    np.testing.assert_allclose(results["angle_of_attack"], expected["angle_of_attack"], rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(results["drag_coeff"], expected["drag_coeff"], rtol=1e-12, atol=1e-12)
+
+
+def test_sweep_cache(expected, tmp_path):
+    cache = ResultCache(tmp_path)
+    fields = ("force_QSM", "angle_of_attack")
+
+    first = sweep_kinematics(N, PARAMETERS, fields, chunk_size=5, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 12)
+
+    # the repeated parameter sets are loaded, only the new one is evaluated
+    parameters = {name: np.append(values[[3, 7]], 130.0 if name == "PHI" else values[0]) for name, values in PARAMETERS.items()}
+    again = sweep_kinematics(N, parameters, fields, cache=cache)
+    assert (cache.hits, cache.misses) == (2, 13)
+
+    for name in fields:
+        np.testing.assert_array_equal(first[name], sweep_kinematics(N, PARAMETERS, fields)[name])
+        np.testing.assert_array_equal(again[name][:2], first[name][[3, 7]])
+        np.testing.assert_allclose(first[name], expected[name], rtol=1e-12, atol=1e-9)
+
+    # other options are other entries
+    sweep_kinematics(N, PARAMETERS, fields, cache=cache, derivative_method="periodic")
+    assert cache.hits == 2
+
+
+def test_sweep_invalid():
+    with pytest.raises(ValueError, match="Unknown parameters"):
+        sweep_kinematics(N, {"PSI": 1.0})
+    with pytest.raises(ValueError, match="same length"):
+        sweep_kinematics(N, {"PHI": [1.0, 2.0], "tau": [0.1, 0.2, 0.3]})
+    with pytest.raises(ValueError, match="reduce"):
+        sweep_kinematics(N, PARAMETERS, reduce="max")
@@ -0,0 +1,75 @@
+from inspect import signature
+import pytest
+import numpy as np
+from core import Angle, TransformationContext, Vector3D, DEFAULT_PERIODIC_ORDER
+from kinematics_evaluations import solve_kinematics, compute_accelerations
+from multi_cycle import evaluate_cycle
+from parameter_sweep import evaluate_sweep_chunk, sweep_kinematics
+from pipeline import LazyKinematicsSolution, PIPELINE_PARAMETERS, PIPELINE_STAGES, stages_for
+
+
+def values_of(field):
+    if isinstance(field, Vector3D):
+        return field.coords
+    if isinstance(field, Angle):
+        return field._values
+    return field
+
+
+def test_reading_angles_computes_only_angles():
+    solution = LazyKinematicsSolution(400, TransformationContext())
+
+    solution.phi
+    assert solution.computed_stages == {"angles"}
+    assert "force_QSM" not in vars(solution.holder)
+
+
+def test_new_force_constants_invalidate_only_forces():
+    solution = LazyKinematicsSolution(400, TransformationContext())
+    solution.solve()
+    omega = solution.omega
+
+    solution.set_parameters(force_constants={"C_RD": 2.0})
+    assert solution.computed_stages == {stage.name for stage in PIPELINE_STAGES} - {"forces"}
+
+    solution.force_QSM
+    assert solution.omega is omega
+    assert solution.computed_stages == {stage.name for stage in PIPELINE_STAGES}
+
+
+def test_new_model_parameter_invalidates_downstream():
+    solution = LazyKinematicsSolution(400, TransformationContext())
+    solution.solve()
+
+    solution.set_parameters(theta=5.0)
+    assert solution.computed_stages == set()
+
+    with pytest.raises(ValueError, match="Unknown parameters"):
+        solution.set_parameters(C_RD=2.0)
+
+
+def test_lazy_solve_matches_solve_kinematics():
+    expected = solve_kinematics(400, TransformationContext())
+    holder = LazyKinematicsSolution(400, TransformationContext()).solve()
+
+    for name, value in vars(expected).items():
+        if name != "context":
+            reference = getattr(holder, name)
+            if isinstance(value, Vector3D):
+                reference.set_referential(value.referential)
+            np.testing.assert_array_equal(values_of(reference), values_of(value), err_msg=name)
+
+
+def test_stages_for():
+    assert [stage.name for stage in stages_for(("lift_coeff",))] == [
+        "angles", "transformations", "angular_velocity", "angle_of_attack", "aerodynamic_coefficients",
+    ]
+
+    with pytest.raises(ValueError, match="No stage produces"):
+        stages_for(("lift",))
+
+
+@pytest.mark.parametrize("function", [compute_accelerations, evaluate_sweep_chunk, sweep_kinematics, evaluate_cycle])
+def test_default_periodic_order(function):
+    assert signature(function).parameters["order"].default == DEFAULT_PERIODIC_ORDER
+    assert PIPELINE_PARAMETERS["order"] == DEFAULT_PERIODIC_ORDER
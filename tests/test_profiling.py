@@ -0,0 +1,75 @@
+import pytest
+import numpy as np
+from types import SimpleNamespace
+from src.core import Angle, profile, profiling, get_rotation_matrix_x, stroke_to_wing_matrix
+
+
+@profile(holder="holder")
+def fill(N, holder):
+    holder.values = np.ones(N)
+    holder.matrices = stroke_to_wing_matrix(*(Angle(np.zeros(N), "rad") for _ in range(3)))
+    return holder
+
+
+def test_profile_disabled():
+    angle = Angle(np.array([0.1, 0.2]), "rad")
+
+    assert np.array_equal(get_rotation_matrix_x(angle), get_rotation_matrix_x.__wrapped__(angle))
+
+
+def test_profiling_records():
+    holder = SimpleNamespace(kept=np.zeros(3))
+
+    with profiling() as profiler:
+        fill(1000, holder)
+
+    outer, = (record for record in profiler.records if record["name"] == "fill")
+    inner, = (record for record in profiler.records if record["name"] == "stroke_to_wing_matrix")
+
+    assert inner["stack"] == "fill;stroke_to_wing_matrix"
+    assert outer["produced"] == {"values": 8000, "matrices": 72000}
+    assert outer["peak_bytes"] >= inner["peak_bytes"] >= 9 * 8 * 1000
+    assert outer["wall_time"] >= inner["wall_time"]
+
+
+@profile(holder="holder")
+def replace(holder):
+    holder.values = None  # the old array is freed, the new one may get its id
+    holder.values = np.ones(1000)
+
+
+def test_profiling_replaced_field():
+    holder = SimpleNamespace(values=np.ones(1000))
+
+    with profiling(memory=False) as profiler:
+        for _ in range(5):
+            replace(holder)
+
+    assert all(record["produced"] == {"values": 8000} for record in profiler.records)
+
+
+def test_profiling_folded():
+    with profiling(memory=False) as profiler:
+        fill(10, SimpleNamespace())
+
+    stacks = dict(line.rsplit(" ", 1) for line in profiler.folded().splitlines())
+    assert set(stacks) == {"fill", "fill;stroke_to_wing_matrix"}
+    assert all(int(time) >= 0 for time in stacks.values())
+
+
+def test_profiling_nested():
+    with profiling():
+        with pytest.raises(ValueError):
+            with profiling():
+                pass
+
+
+def test_profiling_reports(tmp_path):
+    with profiling() as profiler:
+        fill(10, SimpleNamespace())
+
+    profiler.to_json(tmp_path / "profile.json")
+    profiler.to_csv(tmp_path / "profile.csv")
+
+    assert (tmp_path / "profile.csv").read_text().splitlines()[0].split(",")[0] == "stack"
+    assert "summary" in (tmp_path / "profile.json").read_text()
@@ -0,0 +1,121 @@
+import pytest
+import numpy as np
+from src.core import (
+    Angle,
+    get_rotation_matrix_x,
+    get_rotation_matrix_y,
+    get_rotation_matrix_z,
+    global_to_wing_matrix,
+    get_rotation_quaternion_x,
+    get_rotation_quaternion_y,
+    get_rotation_quaternion_z,
+    quaternion_multiply,
+    global_to_wing_quaternion,
+    quaternion_compose,
+    quaternion_conjugate,
+    quaternion_to_matrix,
+    matrix_to_quaternion,
+    rotate_vectors,
+    compose,
+    slerp,
+    interpolate_quaternions,
+)
+
+
+@pytest.fixture
+def random_angles():
+    rng = np.random.default_rng(0)
+    names = ("phi", "alpha", "theta", "eta", "psi", "beta", "gamma")
+    return {name: Angle(rng.uniform(-np.pi, np.pi, 50), "rad") for name in names}
+
+
+@pytest.mark.parametrize(
+    "quaternion_builder, matrix_builder",
+    [
+        (get_rotation_quaternion_x, get_rotation_matrix_x),
+        (get_rotation_quaternion_y, get_rotation_matrix_y),
+        (get_rotation_quaternion_z, get_rotation_matrix_z),
+    ],
+)
+def test_elementary_quaternions_match_matrices(quaternion_builder, matrix_builder):
+    angle = Angle([0, np.pi / 6, np.pi / 4, -2.0], "rad")
+
+    assert quaternion_builder(angle).shape == (4, 4)
+    assert quaternion_builder(Angle(np.pi / 6, "rad")).shape == (4,)
+    np.testing.assert_array_almost_equal(quaternion_to_matrix(quaternion_builder(angle)), matrix_builder(angle))
+
+
+def test_global_to_wing_quaternion(random_angles):
+    q = global_to_wing_quaternion(**random_angles)
+
+    np.testing.assert_array_almost_equal(np.linalg.norm(q, axis=0), 1.0)
+    np.testing.assert_array_almost_equal(quaternion_to_matrix(q), global_to_wing_matrix(**random_angles))
+
+
+def test_matrix_round_trip(random_angles):
+    q = global_to_wing_quaternion(**random_angles)
+    q = q * np.sign(q[0])  # q and -q are the same rotation
+
+    np.testing.assert_array_almost_equal(matrix_to_quaternion(quaternion_to_matrix(q)), q)
+    np.testing.assert_array_almost_equal(matrix_to_quaternion(np.eye(3)), [1.0, 0.0, 0.0, 0.0])
+
+
+def test_compose_and_conjugate(random_angles):
+    p = get_rotation_quaternion_x(random_angles["phi"])
+    q = get_rotation_quaternion_z(random_angles["theta"])
+
+    np.testing.assert_array_almost_equal(
+        quaternion_to_matrix(quaternion_compose(p, q)), compose(quaternion_to_matrix(p), quaternion_to_matrix(q))
+    )
+    np.testing.assert_array_almost_equal(
+        quaternion_compose(p, quaternion_conjugate(p)), np.tile([[1.0], [0.0], [0.0], [0.0]], (1, 50))
+    )
+
+
+def test_rotate_vectors(random_angles):
+    q = global_to_wing_quaternion(**random_angles)
+    coords = np.random.default_rng(1).normal(size=(3, 50))
+
+    expected = np.einsum("ijn,jn->in", global_to_wing_matrix(**random_angles), coords)
+    np.testing.assert_array_almost_equal(rotate_vectors(q, coords), expected)
+
+    # single quaternion and single vector are broadcast
+    assert rotate_vectors(q[:, 0], coords).shape == (3, 50)
+    assert rotate_vectors(q, coords[:, :1]).shape == (3, 50)
+
+    with pytest.raises(ValueError, match="Invalid shape"):
+        rotate_vectors(q, coords[:, :3])
+
+
+def test_slerp():
+    q0 = get_rotation_quaternion_z(Angle(0.0, "rad"))
+    q1 = get_rotation_quaternion_z(Angle(np.pi / 2, "rad"))
+
+    np.testing.assert_array_almost_equal(slerp(q0, q1, 0.0), q0)
+    np.testing.assert_array_almost_equal(slerp(q0, q1, 1.0), q1)
+    np.testing.assert_array_almost_equal(slerp(q0, q1, 0.5), get_rotation_quaternion_z(Angle(np.pi / 4, "rad")))
+
+    # the shortest arc is taken whatever the sign of q1
+    np.testing.assert_array_almost_equal(slerp(q0, -q1, 0.5), get_rotation_quaternion_z(Angle(np.pi / 4, "rad")))
+
+
+def test_interpolate_quaternions():
+    time = np.linspace(0.0, 1.0, 5)
+    new_time = np.linspace(0.0, 1.0, 17)
+    q = get_rotation_quaternion_y(Angle(time, "rad"))
+
+    np.testing.assert_array_almost_equal(
+        interpolate_quaternions(time, q, new_time), get_rotation_quaternion_y(Angle(new_time, "rad"))
+    )
+
+
+def test_multiply_mixed_lengths(random_angles):
+    p = get_rotation_quaternion_x(random_angles["phi"])
+    q = get_rotation_quaternion_z(Angle(0.3, "rad"))
+    expected_pq = quaternion_compose(p, np.tile(q[:, None], (1, 50)))
+    expected_qp = quaternion_compose(np.tile(q[:, None], (1, 50)), p)
+
+    assert quaternion_multiply(q, q).shape == (4,)
+    np.testing.assert_array_almost_equal(quaternion_multiply(p, q), expected_pq)
+    np.testing.assert_array_almost_equal(quaternion_multiply(q, p), expected_qp)
+    np.testing.assert_array_almost_equal(quaternion_multiply(p[:, :1], q), expected_pq[:, :1])
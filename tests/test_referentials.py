@@ -1,6 +1,14 @@
 import pytest
 import numpy as np
-from src.core import Referential, Transformations, Angle
+from src.core import (
+    Referential,
+    Transformations,
+    TransformationContext,
+    Angle,
+    stroke_to_wing_matrix,
+    get_rotation_matrix_y,
+)
+from src.core.referentials import frame_path
 
 
 @pytest.fixture
@@ -167,7 +175,134 @@ def test_mixed_shapes(simple_angles, array_angles):
     assert result.shape == (3, 3, 2)
 
 
-def test_unavailable_transformation(simple_angles):
+def test_composed_transformations(array_angles):
+    Transformations.initialize(**array_angles)
+
+    R_g2b = Transformations.get_matrix(Referential.GLOBAL, Referential.BODY)
+    R_b2s = Transformations.get_matrix(Referential.BODY, Referential.STROKE)
+    R_s2w = Transformations.get_matrix(Referential.STROKE, Referential.WING)
+
+    # pairs without a direct edge are composed along the frame graph
+    R_w2b = Transformations.get_matrix(Referential.WING, Referential.BODY)
+    expected = np.einsum("ijn,jkn->ikn", R_s2w, R_b2s).transpose(1, 0, 2)
+    np.testing.assert_allclose(R_w2b, expected, atol=1e-14)
+
+    R_g2s = Transformations.get_matrix(Referential.GLOBAL, Referential.STROKE)
+    np.testing.assert_allclose(R_g2s, np.einsum("ijn,jkn->ikn", R_b2s, R_g2b), atol=1e-14)
+
+    # the composed path matches the direct shortcut
+    R_g2w = Transformations.get_matrix(Referential.GLOBAL, Referential.WING)
+    np.testing.assert_allclose(R_g2w, np.einsum("ijn,jkn->ikn", R_s2w, R_g2s), atol=1e-14)
+
+
+def test_transformations_are_memoized_until_initialize(simple_angles, array_angles):
     Transformations.initialize(**simple_angles)
-    with pytest.raises(ValueError, match="Transformation not available"):
-        Transformations.get_matrix(Referential.WING, Referential.BODY)
+    first = Transformations.get_matrix(Referential.BODY, Referential.WING)
+    assert Transformations.get_matrix(Referential.BODY, Referential.WING) is first
+
+    Transformations.initialize(**array_angles)
+    assert Transformations.get_matrix(Referential.BODY, Referential.WING).shape == (3, 3, 2)
+
+
+def test_frame_path():
+    assert frame_path(Referential.WING, Referential.BODY) == (
+        Referential.WING,
+        Referential.STROKE,
+        Referential.BODY,
+    )
+    assert frame_path(Referential.GLOBAL, Referential.WING) == (Referential.GLOBAL, Referential.WING)
+
+
+def test_contexts_are_independent(simple_angles, array_angles):
+    first = TransformationContext()
+    second = TransformationContext()
+    assert not first.is_initialized
+
+    first.initialize(**simple_angles)
+    second.initialize(**array_angles)
+
+    assert first.get_matrix(Referential.STROKE, Referential.WING).shape == (3, 3)
+    assert second.get_matrix(Referential.STROKE, Referential.WING).shape == (3, 3, 2)
+
+    with pytest.raises(ValueError, match="Transformations must be initialized first"):
+        TransformationContext().get_matrix(Referential.GLOBAL, Referential.WING)
+
+
+def test_quaternion_backend_matches_matrix_backend(array_angles):
+    matrix = TransformationContext()
+    quaternion = TransformationContext(backend="quaternion")
+    matrix.initialize(**array_angles)
+    quaternion.initialize(**array_angles)
+
+    coords = np.array([[1.0, 0.5], [2.0, -1.0], [3.0, 0.25]])
+
+    for source, target in [
+        (Referential.GLOBAL, Referential.WING),
+        (Referential.WING, Referential.BODY),
+        (Referential.BODY, Referential.STROKE),
+    ]:
+        np.testing.assert_array_almost_equal(quaternion.get_matrix(source, target), matrix.get_matrix(source, target))
+        np.testing.assert_array_almost_equal(
+            quaternion.transform(coords, source, target), matrix.transform(coords, source, target)
+        )
+
+    assert quaternion.get_quaternion(Referential.GLOBAL, Referential.WING).shape == (4, 2)
+
+    with pytest.raises(ValueError, match="Unknown backend"):
+        TransformationContext(backend="euler")
+
+
+def test_batched_layout_context(array_angles):
+    stacked = TransformationContext()
+    batched = TransformationContext(layout="batched")
+    stacked.initialize(**array_angles)
+    batched.initialize(**array_angles)
+
+    coords = np.array([[1.0, 0.5], [2.0, -1.0], [3.0, 0.25]])
+
+    for source, target in [(Referential.GLOBAL, Referential.WING), (Referential.WING, Referential.BODY)]:
+        assert batched.get_matrix(source, target).shape == (2, 3, 3)
+        np.testing.assert_array_almost_equal(
+            batched.get_matrix(source, target), np.moveaxis(stacked.get_matrix(source, target), 2, 0)
+        )
+        np.testing.assert_array_almost_equal(
+            batched.transform(coords, source, target), stacked.transform(coords, source, target)
+        )
+
+
+def test_global_to_wing_memoizes_partials(array_angles):
+    context = TransformationContext()
+    context.initialize(**array_angles)
+
+    R_g2w = context.get_matrix(Referential.GLOBAL, Referential.WING)
+
+    # computed along with R_g2w, not rebuilt
+    assert (Referential.STROKE, Referential.WING) in context._transformations
+    assert (Referential.GLOBAL, Referential.STROKE) in context._transformations
+
+    R_s2w = context.get_matrix(Referential.STROKE, Referential.WING)
+    R_g2s = context.get_matrix(Referential.GLOBAL, Referential.STROKE)
+    np.testing.assert_array_almost_equal(np.einsum("ijn,jkn->ikn", R_s2w, R_g2s), R_g2w)
+
+
+def test_constant_angles_stay_single_matrices(array_angles):
+    angles = dict(array_angles)
+    for name in ("theta", "eta", "psi", "beta", "gamma"):
+        angles[name] = Angle(np.full(2, 0.3), "rad")
+
+    context = TransformationContext()
+    context.initialize(**angles)
+
+    assert context.constant_angles == {"theta", "eta", "psi", "beta", "gamma"}
+    assert context.get_matrix(Referential.GLOBAL, Referential.STROKE).shape == (3, 3)
+    assert context.get_matrix(Referential.STROKE, Referential.WING).shape == (3, 3, 2)
+
+    # same transformation as the matrices built with the angles of length N
+    R_s2w = stroke_to_wing_matrix(angles["phi"], angles["alpha"], angles["theta"])
+    R_b2s = get_rotation_matrix_y(angles["eta"])
+    expected = np.einsum("ijn,jkn->ikn", R_s2w, R_b2s).transpose(1, 0, 2)
+
+    coords = np.array([[1.0, 0.5], [2.0, -1.0], [3.0, 0.25]])
+    np.testing.assert_array_almost_equal(
+        context.transform(coords, Referential.WING, Referential.BODY), np.einsum("ijn,jn->in", expected, coords)
+    )
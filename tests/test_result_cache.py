@@ -0,0 +1,90 @@
+import os
+import numpy as np
+from core import Angle, CachedVector3D, Referential, TransformationContext, Vector3D
+from pipeline import LazyKinematicsSolution, PIPELINE_STAGES
+from result_cache import ResultCache, cache_key, STALE_TEMPORARY_SECONDS
+
+CACHEABLE = {stage.name for stage in PIPELINE_STAGES if stage.cacheable}
+
+
+def test_put_get(tmp_path):
+    cache = ResultCache(tmp_path)
+    context = TransformationContext()
+    fields = {
+        "phi": Angle(np.array([10.0, 20.0]), "deg"),
+        "omega": CachedVector3D(np.ones((3, 2)), Referential.WING),
+        "u_tip": Vector3D(np.zeros((3, 2)), Referential.GLOBAL),
+        "lift_coeff": np.array([0.5, 0.7]),
+    }
+
+    assert cache.get("missing") is None
+    cache.put("key", fields)
+    loaded = cache.get("key", context)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert loaded["phi"]._unit == "deg"
+    np.testing.assert_array_equal(loaded["phi"]._values, [10.0, 20.0])
+    assert type(loaded["omega"]) is CachedVector3D and loaded["omega"].referential == Referential.WING
+    assert type(loaded["u_tip"]) is Vector3D and loaded["u_tip"].context is context
+    np.testing.assert_array_equal(loaded["lift_coeff"], fields["lift_coeff"])
+
+
+def test_evict_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path)
+    for index in range(3):
+        cache.put(f"key{index}", {"values": np.zeros(1000)})
+        os.utime(cache.directory / f"key{index}.npz", (index, index))
+
+    size = (cache.directory / "key0.npz").stat().st_size
+    cache.get("key0")  # most recently used
+
+    ResultCache(tmp_path, max_bytes=2 * size).evict()
+    assert "key0" in cache and "key1" not in cache and "key2" in cache
+
+    cache.clear()
+    assert "key0" not in cache
+
+
+def test_evict_stale_temporary_files(tmp_path):
+    cache = ResultCache(tmp_path)
+    cache.put("key", {"values": np.zeros(1000)})
+    size = (cache.directory / "key.npz").stat().st_size
+
+    # left over by a writer that died before the rename, and one still being written
+    stale, writing = cache.directory / "key0abc.tmp", cache.directory / "key1abc.tmp"
+    stale.write_bytes(bytes(size))
+    writing.write_bytes(bytes(size))
+    old = os.stat(stale).st_mtime - 2 * STALE_TEMPORARY_SECONDS
+    os.utime(stale, (old, old))
+
+    # the file being written is kept and counts toward the size
+    ResultCache(tmp_path, max_bytes=size).evict()
+    assert not stale.exists() and writing.exists()
+    assert "key" not in cache
+
+
+def test_cache_key():
+    assert cache_key("stage", {"a": 1.0}) == cache_key("stage", {"a": 1.0})
+    assert cache_key("stage", {"a": 1.0}) != cache_key("stage", {"a": 2.0})
+    assert cache_key(np.zeros(2)) != cache_key(np.zeros(3))
+
+
+def test_pipeline_cache(tmp_path):
+    cache = ResultCache(tmp_path)
+    expected = LazyKinematicsSolution(400, TransformationContext(), cache=cache).solve()
+    assert (cache.hits, cache.misses) == (0, len(CACHEABLE))
+
+    cached = LazyKinematicsSolution(400, TransformationContext(), cache=cache)
+    force = cached.force_QSM
+    # the forces, and the angles the context is initialized from
+    assert (cache.hits, cache.misses) == (2, len(CACHEABLE))
+    np.testing.assert_array_equal(force.coords, expected.force_QSM.coords)
+
+    # new force constants only miss the forces, whose inputs are all found in the cache
+    cached.set_parameters(force_constants={"C_RD": 2.0})
+    cached.force_QSM
+    assert cache.misses == len(CACHEABLE) + 1
+
+    # another backend does not reuse the entries
+    other = LazyKinematicsSolution(400, TransformationContext(backend="quaternion"), cache=cache)
+    assert all(other.key(name) != cached.key(name) for name in CACHEABLE)
@@ -0,0 +1,43 @@
+import pytest
+import numpy as np
+from core import TransformationContext, Referential
+from kinematics_evaluations import solve_kinematics
+from streaming_evaluations import evaluate_record
+
+FIELDS = ("force_QSM", "angle_of_attack", "lift_coeff")
+
+
+@pytest.fixture(scope="module")
+def solution():
+    return solve_kinematics(1000, TransformationContext())
+
+
+def record_angles(solution, theta):
+    return {
+        "phi": solution.phi.degrees,
+        "alpha": solution.alpha.degrees,
+        "theta": theta,
+        "phi_dt": solution.phi_dt.degrees,
+        "alpha_dt": solution.alpha_dt.degrees,
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 333, 1000, 4096])
+def test_stream_matches_solve_kinematics(solution, chunk_size):
+    out = evaluate_record(solution.time, record_angles(solution, solution.theta.degrees), FIELDS, chunk_size)
+
+    np.testing.assert_array_equal(out["force_QSM"], solution.force_QSM.set_referential(Referential.GLOBAL).coords)
+    np.testing.assert_array_equal(out["angle_of_attack"], solution.angle_of_attack.degrees)
+    np.testing.assert_array_equal(out["lift_coeff"], solution.lift_coeff)
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1000])
+def test_stream_constant_theta(solution, chunk_size):
+    theta = solution.theta.degrees
+    assert np.all(theta == theta[0])
+
+    expected = evaluate_record(solution.time, record_angles(solution, theta), FIELDS, chunk_size)
+    out = evaluate_record(solution.time, record_angles(solution, float(theta[0])), FIELDS, chunk_size)
+
+    for name in FIELDS:
+        np.testing.assert_allclose(out[name], expected[name], rtol=1e-12, atol=1e-12)
@@ -0,0 +1,80 @@
+import json
+import os
+import pytest
+import numpy as np
+from parameter_sweep import sweep_kinematics
+from result_cache import ResultCache
+from sweep_runner import CHECKPOINT_DIRECTORY, MANIFEST_FILE, completed_chunks, run_sweep
+
+PARAMETERS = {"PHI": np.linspace(100.0, 120.0, 5), "tau": 0.2}
+FIELDS = ("force_QSM", "lift_coeff")
+
+
+def test_run_sweep(tmp_path):
+    results = run_sweep(tmp_path, 50, PARAMETERS, FIELDS, chunk_size=2, max_workers=2)
+    expected = sweep_kinematics(50, PARAMETERS, FIELDS)
+
+    assert completed_chunks(tmp_path) == {0, 1, 2}
+    for name in FIELDS:
+        np.testing.assert_array_equal(results[name], expected[name])
+
+
+def test_run_sweep_cache(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    expected = sweep_kinematics(50, PARAMETERS, FIELDS, cache=cache)
+
+    entries = list(cache.directory.glob("*.npz"))
+    assert len(entries) == 5
+    for path in entries:
+        os.utime(path, (0, 0))
+
+    # every parameter set is loaded by the workers, which marks it as recently used
+    results = run_sweep(tmp_path / "sweep", 50, PARAMETERS, FIELDS, chunk_size=2, max_workers=2, cache=cache)
+    for name in FIELDS:
+        np.testing.assert_array_equal(results[name], expected[name])
+
+    assert sorted(cache.directory.glob("*.npz")) == sorted(entries)
+    assert all(path.stat().st_mtime > 0 for path in entries)
+    assert json.loads((tmp_path / "sweep" / MANIFEST_FILE).read_text())["options"] == {}
+
+
+def test_run_sweep_resume(tmp_path):
+    run_sweep(tmp_path, 50, PARAMETERS, FIELDS, chunk_size=2, max_workers=2)
+    expected = {name: np.load(tmp_path / f"{name}.npy") for name in FIELDS}
+
+    # chunk 1 (rows 2 and 3) is lost, chunk 0 is done and must not be evaluated again
+    (tmp_path / CHECKPOINT_DIRECTORY / "1.done").unlink()
+    for name in FIELDS:
+        output = np.load(tmp_path / f"{name}.npy", mmap_mode="r+")
+        output[:4] = np.nan
+        output.flush()
+        del output
+
+    results = run_sweep(tmp_path, 50, PARAMETERS, FIELDS, chunk_size=2, max_workers=2)
+
+    assert completed_chunks(tmp_path) == {0, 1, 2}
+    for name in FIELDS:
+        assert np.isnan(results[name][:2]).all()
+        np.testing.assert_array_equal(results[name][2:], expected[name][2:])
+
+
+def test_run_sweep_refuses_other_sweep(tmp_path):
+    run_sweep(tmp_path, 50, PARAMETERS, FIELDS, chunk_size=2, max_workers=1)
+
+    with pytest.raises(ValueError, match="different sweep"):
+        run_sweep(tmp_path, 50, {**PARAMETERS, "tau": 0.3}, FIELDS, chunk_size=2, max_workers=1)
+    with pytest.raises(ValueError, match="different sweep"):
+        run_sweep(tmp_path, 50, PARAMETERS, FIELDS, chunk_size=3, max_workers=1)
+
+
+def test_run_sweep_numpy_constants(tmp_path):
+    constants = {"C_RD": np.float32(2.0), "C_RC": np.array(1.5)}
+    results = run_sweep(tmp_path, 50, PARAMETERS, FIELDS, max_workers=1, force_constants=constants)
+    expected = sweep_kinematics(50, PARAMETERS, FIELDS, force_constants={"C_RD": 2.0, "C_RC": 1.5})
+
+    manifest = json.loads((tmp_path / MANIFEST_FILE).read_text())
+    assert manifest["options"] == {"force_constants": {"C_RD": 2.0, "C_RC": 1.5}}
+    np.testing.assert_array_equal(results["force_QSM"], expected["force_QSM"])
+
+    # the same sweep resumes with the constants given as floats
+    run_sweep(tmp_path, 50, PARAMETERS, FIELDS, max_workers=1, force_constants={"C_RD": 2.0, "C_RC": 1.5})
@@ -9,6 +9,8 @@ from src.core import (
     global_to_body_matrix,
     global_to_wing_matrix,
     transpose,
+    compose,
+    rotate,
 )
 
 
@@ -309,3 +311,103 @@ def test_transpose_invalid_shape():
     matrix = np.array([[1, 2], [3, 4]])
     with pytest.raises(ValueError, match="Input matrix must be of shape"):
         transpose(matrix)
+
+
+def test_rotation_matrices_match_per_sample_construction():
+    values = np.linspace(-np.pi, np.pi, 50)
+    angles = Angle(values, "rad")
+
+    for builder, single in [
+        (get_rotation_matrix_x, lambda c, s: [[1, 0, 0], [0, c, s], [0, -s, c]]),
+        (get_rotation_matrix_y, lambda c, s: [[c, 0, -s], [0, 1, 0], [s, 0, c]]),
+        (get_rotation_matrix_z, lambda c, s: [[c, s, 0], [-s, c, 0], [0, 0, 1]]),
+    ]:
+        result = builder(angles)
+        expected = np.stack(
+            [np.array(single(np.cos(v), np.sin(v))) for v in values], axis=-1
+        )
+        np.testing.assert_allclose(result, expected, atol=1e-15)
+
+
+def test_composite_matrices_match_elementary_products():
+    rng = np.random.default_rng(0)
+    phi, alpha, theta, eta, psi, beta, gamma = (
+        Angle(rng.uniform(-np.pi, np.pi, 20), "rad") for _ in range(7)
+    )
+
+    Rx, Ry, Rz = get_rotation_matrix_x, get_rotation_matrix_y, get_rotation_matrix_z
+    R_s2w = np.einsum("ijn,jkn,kln->iln", Ry(alpha), Rz(theta), Rx(phi))
+    R_g2b = np.einsum("ijn,jkn,kln->iln", Rx(psi), Ry(beta), Rz(gamma))
+    R_g2w = np.einsum("ijn,jkn,kln->iln", R_s2w, Ry(eta), R_g2b)
+
+    np.testing.assert_allclose(stroke_to_wing_matrix(phi, alpha, theta), R_s2w, atol=1e-14)
+    np.testing.assert_allclose(global_to_body_matrix(psi, beta, gamma), R_g2b, atol=1e-14)
+    np.testing.assert_allclose(
+        global_to_wing_matrix(phi, alpha, theta, eta, psi, beta, gamma), R_g2w, atol=1e-14
+    )
+
+
+def test_builders_write_into_out_buffer(array_angle):
+    out = np.empty((3, 3, 3))
+    result = get_rotation_matrix_x(array_angle, out=out)
+    assert result is out
+
+    out = np.empty((3, 3, 3))
+    result = global_to_wing_matrix(*(array_angle,) * 7, out=out)
+    assert result is out
+    np.testing.assert_allclose(result, global_to_wing_matrix(*(array_angle,) * 7))
+
+
+def test_builders_invalid_out_shape(array_angle):
+    with pytest.raises(ValueError, match="out must be of shape"):
+        stroke_to_wing_matrix(array_angle, array_angle, array_angle, out=np.empty((3, 3, 2)))
+
+
+def test_batched_layout_matches_stacked_layout():
+    rng = np.random.default_rng(1)
+    angles = [Angle(rng.uniform(-np.pi, np.pi, 20), "rad") for _ in range(7)]
+    coords = rng.normal(size=(3, 20))
+
+    for builder, arguments in [
+        (get_rotation_matrix_x, angles[:1]),
+        (stroke_to_wing_matrix, angles[:3]),
+        (global_to_body_matrix, angles[:3]),
+        (global_to_wing_matrix, angles),
+    ]:
+        stacked = builder(*arguments)
+        batched = builder(*arguments, layout="batched")
+
+        assert batched.shape == (20, 3, 3)
+        assert batched.flags.c_contiguous
+        np.testing.assert_allclose(batched, np.moveaxis(stacked, 2, 0), atol=1e-14)
+        np.testing.assert_allclose(rotate(batched, coords, "batched"), rotate(stacked, coords), atol=1e-14)
+
+    stacked = global_to_wing_matrix(*angles)
+    batched = global_to_wing_matrix(*angles, layout="batched")
+    np.testing.assert_allclose(
+        compose(transpose(batched, "batched"), batched, layout="batched"), np.broadcast_to(np.eye(3), (20, 3, 3)), atol=1e-14
+    )
+    np.testing.assert_allclose(
+        rotate(batched, coords[:, :1], "batched"), rotate(stacked, coords[:, :1]), atol=1e-14
+    )
+
+    with pytest.raises(ValueError, match="Unknown layout"):
+        get_rotation_matrix_x(angles[0], layout="columns")
+
+
+def test_global_to_wing_matrix_partials():
+    rng = np.random.default_rng(2)
+    phi, alpha, theta = (Angle(rng.uniform(-np.pi, np.pi, 20), "rad") for _ in range(3))
+    eta, psi, beta, gamma = (Angle(value, "rad") for value in rng.uniform(-np.pi, np.pi, 4))
+
+    R_g2w, R_s2w, R_g2s, R_g2b = global_to_wing_matrix(
+        phi, alpha, theta, eta, psi, beta, gamma, return_partials=True
+    )
+
+    np.testing.assert_allclose(R_g2w, global_to_wing_matrix(phi, alpha, theta, eta, psi, beta, gamma), atol=1e-14)
+    np.testing.assert_allclose(R_s2w, stroke_to_wing_matrix(phi, alpha, theta), atol=1e-14)
+    np.testing.assert_allclose(R_g2s, get_rotation_matrix_y(eta) @ global_to_body_matrix(psi, beta, gamma), atol=1e-14)
+
+    # constant factors keep the shape of their own angles
+    assert R_g2s.shape == (3, 3)
+    assert R_g2b.shape == (3, 3)
@@ -1,6 +1,6 @@
 import pytest
 import numpy as np
-from src.core import Vector3D, Referential
+from src.core import Vector3D, CachedVector3D, Referential, Angle, Transformations, TransformationContext
 
 
 @pytest.fixture
@@ -143,3 +143,101 @@ def test_shape_combinations():
     result = v2 * 2
     expected = np.array([[2, 8, 14], [4, 10, 16], [6, 12, 18]])
     assert np.array_equal(result.coords, expected)
+
+
+def test_context_defaults_to_global_transformations(single_vector):
+    assert single_vector.context is Transformations
+
+    context = TransformationContext()
+    vector = Vector3D([1, 2, 3], Referential.GLOBAL, context)
+    assert vector.context is context
+    assert (vector * 2).context is context
+    assert (vector + vector).context is context
+
+    with pytest.raises(ValueError, match="Invalid TransformationContext"):
+        Vector3D([1, 2, 3], Referential.GLOBAL, "context")
+
+
+def test_set_referential_uses_own_context():
+    angles = {name: Angle(0.0, "rad") for name in ("phi", "alpha", "eta", "psi", "beta", "gamma")}
+
+    quarter_turn = TransformationContext()
+    quarter_turn.initialize(theta=Angle(np.pi / 2, "rad"), **angles)
+
+    no_turn = TransformationContext()
+    no_turn.initialize(theta=Angle(0.0, "rad"), **angles)
+
+    v1 = Vector3D([1, 0, 0], Referential.STROKE, quarter_turn).set_referential(Referential.WING)
+    v2 = Vector3D([1, 0, 0], Referential.STROKE, no_turn).set_referential(Referential.WING)
+
+    np.testing.assert_allclose(v1.coords, [[0], [-1], [0]], atol=1e-15)
+    np.testing.assert_allclose(v2.coords, [[1], [0], [0]], atol=1e-15)
+
+    with pytest.raises(ValueError, match="Transformations must be initialized first"):
+        Vector3D([1, 0, 0], Referential.STROKE, TransformationContext()).set_referential(Referential.WING)
+
+
+@pytest.fixture
+def quarter_turn_context():
+    context = TransformationContext()
+    angles = {name: Angle(0.0, "rad") for name in ("phi", "alpha", "eta", "psi", "beta", "gamma")}
+    context.initialize(theta=Angle([np.pi / 2, np.pi / 2], "rad"), **angles)
+    return context
+
+
+def test_cached_vector_reuses_coordinates(quarter_turn_context):
+    vector = CachedVector3D([[1, 2], [0, 0], [0, 0]], Referential.STROKE, quarter_turn_context)
+    stroke_coords = vector.coords
+
+    wing_coords = vector.set_referential(Referential.WING).coords
+    np.testing.assert_allclose(wing_coords, [[0, 0], [-1, -2], [0, 0]], atol=1e-15)
+
+    # back and forth without any new rotation
+    assert vector.set_referential(Referential.STROKE).coords is stroke_coords
+    assert vector.set_referential(Referential.WING).coords is wing_coords
+
+
+def test_cached_vector_invalidation(quarter_turn_context):
+    vector = CachedVector3D([[1, 2], [0, 0], [0, 0]], Referential.STROKE, quarter_turn_context)
+    vector.set_referential(Referential.WING)
+
+    # cached coordinates cannot be modified in place
+    with pytest.raises(ValueError):
+        vector.coords[0, 0] = 1.0
+
+    # new coordinates drop the other referentials
+    vector.coords = [[0, 0], [1, 1], [0, 0]]
+    np.testing.assert_allclose(vector.set_referential(Referential.STROKE).coords, [[-1, -1], [0, 0], [0, 0]], atol=1e-15)
+
+    # so does a new initialization of the context
+    angles = {name: Angle(0.0, "rad") for name in ("phi", "alpha", "theta", "eta", "psi", "beta", "gamma")}
+    quarter_turn_context.initialize(**angles)
+    np.testing.assert_allclose(vector.set_referential(Referential.WING).coords, [[-1, -1], [0, 0], [0, 0]], atol=1e-15)
+
+
+def test_vector_without_copy():
+    block = np.zeros((6, 4))
+
+    vector = Vector3D(block[3:], Referential.GLOBAL, copy=False)
+    cached = CachedVector3D(block[:3], Referential.GLOBAL, copy=False)
+    assert np.shares_memory(vector.coords, block)
+    assert np.shares_memory(cached.coords, block)
+
+    # writes to the buffer are seen by the vectors
+    block[:] = 1.0
+    assert np.all(vector.coords == 1.0) and np.all(cached.coords == 1.0)
+
+    # only the view of the cached vector is read-only
+    assert block.flags.writeable
+
+    # same with the caller's whole array
+    array = np.zeros((3, 4))
+    cached = CachedVector3D(array, Referential.GLOBAL, copy=False)
+    assert np.shares_memory(cached.coords, array)
+    assert array.flags.writeable and not cached.coords.flags.writeable
+    array[0, 0] = 1.0
+    assert cached.coords[0, 0] == 1.0
+
+    # integer arrays are still converted
+    assert not np.shares_memory(Vector3D(np.ones((3, 4), dtype=int), Referential.GLOBAL, copy=False).coords, block)
+    assert not np.shares_memory(Vector3D(block[3:], Referential.GLOBAL).coords, block)